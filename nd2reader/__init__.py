@@ -1,13 +1,43 @@
-from os import path
-from nd2reader.reader import ND2Reader
-from nd2reader.legacy import Nd2
-
-try:
-    import importlib.metadata as importlib_metadata
-except:
-    import importlib_metadata
-
-try:
-    __version__ = importlib_metadata.version(__name__)
-except:
-    print('Unable to read version number')
+"""nd2reader: read .nd2 files produced by NIS Elements
+
+The public classes are imported on first access (PEP 562), so that ``import nd2reader`` does not load pims and its
+dependencies until a reader is actually needed.
+"""
+import importlib
+import warnings
+
+__all__ = ['ND2Reader', 'Nd2', 'probe']
+
+_lazy_attributes = {
+    'ND2Reader': 'nd2reader.reader',
+    'Nd2': 'nd2reader.legacy',
+    'probe': 'nd2reader.probing',
+}
+
+
+def _get_version():
+    try:
+        import importlib.metadata as importlib_metadata
+    except ImportError:
+        import importlib_metadata
+
+    try:
+        return importlib_metadata.version(__name__)
+    except Exception:
+        warnings.warn("Unable to read the version number of %s." % __name__)
+
+
+def __getattr__(name):
+    if name == '__version__':
+        value = _get_version()
+    elif name in _lazy_attributes:
+        value = getattr(importlib.import_module(_lazy_attributes[name]), name)
+    else:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals().keys()) + list(_lazy_attributes.keys()) + ['__version__'])
@@ -0,0 +1,211 @@
+"""
+Asyncio interface to ND2Reader
+
+Frames are read and decoded on a bounded thread pool, so that reading does not block the event loop. Every worker
+thread reads through its own clone of the reader (see ND2Reader.clone), which shares the parsed index.
+
+    async with AsyncND2Reader('my_file.nd2', max_workers=4) as reader:
+        frame = await reader.aget_frame(0)
+        frames = await reader.aget_frames(range(10, 20))
+        async for frame in reader:
+            ...
+"""
+import asyncio
+import threading
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+from nd2reader.reader import ND2Reader
+
+
+class AsyncND2Reader(object):
+    """Reads frames of an ND2Reader from asyncio code.
+
+    """
+
+    def __init__(self, fh, max_workers=None, max_concurrency=None):
+        """
+        Arguments:
+            fh {str} -- path (or URL) of the .nd2 file
+            fh {ND2Reader} -- the reader to read from, it is not closed when the AsyncND2Reader is closed
+            max_workers {int} -- the number of threads that read frames (default: 4 if the reader was opened from a
+                path, otherwise 1, because only readers of a path can be cloned)
+            max_concurrency {int} -- the maximum number of reads that are submitted to the threads at the same time,
+                the other reads wait on the event loop, where they can be cancelled cheaply (default: max_workers)
+        """
+        self._owns_reader = not isinstance(fh, ND2Reader)
+        self.reader = ND2Reader(fh) if self._owns_reader else fh
+
+        if max_workers is None:
+            max_workers = 4 if self.reader._path is not None else 1
+        elif self.reader._path is None and max_workers > 1:
+            warnings.warn("Reading with multiple threads needs an ND2Reader that was opened from a path, reading with "
+                          "a single thread instead.")
+            max_workers = 1
+
+        self.max_workers = max_workers
+        self.max_concurrency = max_concurrency if max_concurrency is not None else max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="nd2reader")
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._clones = []
+        self._semaphores = {}
+        self._pending = set()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+    def __len__(self):
+        return len(self.reader)
+
+    def __aiter__(self):
+        return self.iterate()
+
+    def close(self):
+        """Cancels the pending reads, waits for the running ones and closes the clones of the reader (and the reader
+        itself, if it was opened by the AsyncND2Reader). Use aclose in a coroutine, so that the event loop is not
+        blocked while the running reads finish.
+
+        """
+        self.cancel_pending()
+        self._shutdown()
+
+    async def aclose(self):
+        """Like close, but waits for the running reads without blocking the event loop
+
+        """
+        self.cancel_pending()
+        await asyncio.get_running_loop().run_in_executor(None, self._shutdown)
+
+    def _shutdown(self):
+        self._executor.shutdown(wait=True)
+
+        for clone in self._clones:
+            clone.close()
+        self._clones = []
+
+        if self._owns_reader:
+            self.reader.close()
+
+    def cancel_pending(self):
+        """Cancels all reads that have not finished yet, for example because the frames are no longer needed. Awaiting
+        a cancelled read raises asyncio.CancelledError.
+
+        Returns:
+            int: the number of cancelled reads
+
+        """
+        pending = [task for task in self._pending if not task.done()]
+        for task in pending:
+            task.cancel()
+
+        return len(pending)
+
+    async def aget_frame(self, i):
+        """Reads a frame, using the axes settings (iter_axes, bundle_axes, default_coords) of the reader
+
+        Args:
+            i: the frame index
+
+        Returns:
+            pims.Frame: the frame
+
+        """
+        return await self._submit(_get_frame, i, self.reader._get_axes_settings())
+
+    async def aget_frame_2D(self, c=0, t=0, z=0, v=0):
+        """Reads a single 2D image
+
+        Args:
+            c: the color channel number
+            t: the frame number
+            z: the z stack number
+            v: the field of view index
+
+        Returns:
+            pims.Frame: the image
+
+        """
+        return await self._submit(_get_frame_2D, c, t, z, v)
+
+    async def aget_frames(self, indices):
+        """Reads several frames concurrently
+
+        Args:
+            indices: the frame indices
+
+        Returns:
+            list: the frames, in the order of the indices
+
+        """
+        return list(await asyncio.gather(*[self.aget_frame(i) for i in indices]))
+
+    async def iterate(self, indices=None, prefetch=None):
+        """Iterates over frames, reading ahead while the current frame is being processed
+
+        Args:
+            indices: the frame indices (default: all frames)
+            prefetch: the number of frames that are read ahead (default: max_concurrency)
+
+        Yields:
+            pims.Frame: the frames, in the order of the indices
+
+        """
+        indices = iter(range(len(self.reader)) if indices is None else indices)
+        prefetch = max(prefetch if prefetch is not None else self.max_concurrency, 1)
+
+        reads = []
+        try:
+            for i in indices:
+                reads.append(asyncio.ensure_future(self.aget_frame(i)))
+                if len(reads) >= prefetch:
+                    yield await reads.pop(0)
+
+            while reads:
+                yield await reads.pop(0)
+        finally:
+            for read in reads:
+                read.cancel()
+
+    async def _submit(self, function, *args):
+        task = asyncio.ensure_future(self._run(function, *args))
+        self._pending.add(task)
+        try:
+            return await task
+        finally:
+            self._pending.discard(task)
+
+    async def _run(self, function, *args):
+        loop = asyncio.get_running_loop()
+        async with self._get_semaphore(loop):
+            return await loop.run_in_executor(self._executor, function, self, *args)
+
+    def _get_semaphore(self, loop):
+        # semaphores are bound to the event loop they are first used in
+        if loop not in self._semaphores:
+            self._semaphores = {loop: asyncio.Semaphore(self.max_concurrency)}
+        return self._semaphores[loop]
+
+    def _get_thread_reader(self):
+        reader = getattr(self._local, "reader", None)
+        if reader is None:
+            reader = self.reader.clone() if self.reader._path is not None else self.reader
+            self._local.reader = reader
+            if reader is not self.reader:
+                with self._lock:
+                    self._clones.append(reader)
+        return reader
+
+
+def _get_frame(async_reader, i, axes_settings):
+    reader = async_reader._get_thread_reader()
+    if reader._get_axes_settings() != axes_settings:
+        reader._set_axes_settings(axes_settings)
+    return reader[i]
+
+
+def _get_frame_2D(async_reader, c, t, z, v):
+    return async_reader._get_thread_reader().get_frame_2D(c=c, t=t, z=z, v=v)
@@ -43,9 +43,29 @@ class ArtificialND2(object):
                   'metadata_item': 11,
                   }
 
-    def __init__(self, file, version=(3, 0), skip_blocks=None):
+    def __init__(self, file, version=(3, 0), skip_blocks=None, sizes=None, events=None, loop_order='tvz',
+                 loop_types=None):
+        """
+        Arguments:
+            file {str} -- path of the .nd2 file to write
+            version {tuple} -- major and minor version number of the file
+            skip_blocks {list} -- blocks that should not be written ('version', 'label_map', 'label_map_marker')
+            sizes {dict} -- axis sizes (keys 't', 'v', 'z', 'c', 'y', 'x'). If given, real image groups and the
+                per-frame metadata are written instead of placeholder values.
+            events {list} -- (time in ms, event type) tuples that are written to the file, requires sizes
+            loop_order {str} -- the nesting of the experiment loops from the outermost to the innermost loop (any order
+                of 't', 'v' and 'z'), which determines the order of the image groups, requires sizes
+            loop_types {dict} -- the loop type (uiLoopType) that is written for an axis (default: 1 for 't', 2 for 'v'
+                and 4 for 'z')
+        """
         self.version = version
+        self.sizes = self._complete_sizes(sizes)
+        self.events = events if events is not None else []
+        self.loop_order = loop_order
+        self.loop_types = {'t': 1, 'v': 2, 'z': 4}
+        self.loop_types.update(loop_types or {})
         self.raw_text, self.locations, self.data = b'', None, None
+        self.image_data, self.acquisition_times = None, None
         check_or_make_dir(path.dirname(file))
         self._fh = open(file, 'w+b', 0)
         self.write_file(skip_blocks)
@@ -118,6 +138,37 @@ class ArtificialND2(object):
 
         return locations, data
 
+    @staticmethod
+    def _complete_sizes(sizes):
+        if sizes is None:
+            return None
+
+        complete = {'t': 1, 'v': 1, 'z': 1, 'c': 1, 'y': 8, 'x': 8}
+        complete.update(sizes)
+        return complete
+
+    @property
+    def number_of_image_groups(self):
+        """The number of image groups that are written to the file
+
+        Returns:
+            int: the number of image groups
+
+        """
+        if self.sizes is None:
+            return 1
+        return self.sizes['t'] * self.sizes['v'] * self.sizes['z']
+
+    def _get_labels(self):
+        if self.sizes is None:
+            return global_labels, global_file_labels
+
+        labels = global_labels[:-1] + ['image_events'] + \
+            ['image_frame_%d' % i for i in range(self.number_of_image_groups)]
+        file_labels = global_file_labels[:-1] + ['ImageEventsLV!'] + \
+            ['ImageDataSeq|%d!' % i for i in range(self.number_of_image_groups)]
+        return labels, file_labels
+
     def create_label_map_bytes(self):
         """Construct a binary label map
 
@@ -126,8 +177,7 @@ class ArtificialND2(object):
 
         """
         raw_text = six.b('')
-        labels = global_labels
-        file_labels = global_file_labels
+        labels, file_labels = self._get_labels()
 
         file_data, file_data_dict = self._get_file_data(labels)
 
@@ -172,6 +222,10 @@ class ArtificialND2(object):
             raw_data = struct.pack('d', data)
         elif isinstance(data, str):
             raw_data = self._str_to_padded_bytes(data)
+        elif isinstance(data, bytes):
+            raw_data = data
+        elif isinstance(data, np.ndarray):
+            raw_data = data.tobytes()
 
         return raw_data
 
@@ -189,29 +243,43 @@ class ArtificialND2(object):
     def _str_to_padded_bytes(data):
         return six.b('').join([struct.pack('cx', six.b(s)) for s in data]) + struct.pack('xx')
 
+    @staticmethod
+    def _get_dict_items(data):
+        """Iterate over the items of a dictionary, lists of dictionaries are stored as repeated keys"""
+        for data_key, value in data.items():
+            if isinstance(value, list):
+                for list_value in value:
+                    yield data_key, list_value
+            else:
+                yield data_key, value
+
     def _pack_dict_with_metadata(self, data):
         raw_data = b''
 
-        for data_key in data.keys():
+        for data_key, value in self._get_dict_items(data):
+            item_start = len(raw_data)
+
             # names have always one character extra and are padded in zero bytes???
             b_data_key = self._str_to_padded_bytes(data_key)
 
             # header consists of data type and length of key name, it is represented by 2 unsigned chars
-            raw_data += struct.pack('BB', self._get_data_type(data[data_key]), len(data_key) + 1)
+            raw_data += struct.pack('BB', self._get_data_type(value), len(data_key) + 1)
             raw_data += b_data_key
 
-            sub_data = self._pack_raw_data_with_metadata(data[data_key])
+            sub_data = self._pack_raw_data_with_metadata(value)
+
+            if isinstance(value, dict):
+                number_of_items = len(list(self._get_dict_items(value)))
 
-            if isinstance(data[data_key], dict):
-                # Pack: the number of keys and the length of raw data until now, sub data
+                # Pack: the number of keys and the length of this item until now, sub data
                 # and the 12 bytes that we add now
-                raw_data += struct.pack("<IQ", len(data[data_key].keys()), len(sub_data) + len(raw_data) + 12)
+                raw_data += struct.pack("<IQ", number_of_items, len(sub_data) + len(raw_data) - item_start + 12)
 
             raw_data += sub_data
 
-            if isinstance(data[data_key], dict):
+            if isinstance(value, dict):
                 # apparently there is also a huge empty space
-                raw_data += b''.join([struct.pack('x')] * len(data[data_key].keys()) * 8)
+                raw_data += b''.join([struct.pack('x')] * number_of_items * 8)
 
         return raw_data
 
@@ -272,9 +340,96 @@ class ArtificialND2(object):
             7,  # ImageDataSeq|0!"
         ]
 
+        if self.sizes is not None:
+            file_data = self._get_sized_file_data()
+
         file_data_dict = {l: d for l, d in zip(labels, file_data)}
 
         # convert to bytes
         file_data = [self._pack_data_with_metadata(d) for d in file_data]
 
         return file_data, file_data_dict
+
+    def _get_experiment(self):
+        """Create the nested experiment loops (SLxExperiment) of the loop order
+
+        Returns:
+            dict: the experiment metadata
+
+        """
+        experiment = None
+        for axis in reversed([axis for axis in self.loop_order if self.sizes[axis] > 1]):
+            loop = {'uiLoopType': self.loop_types[axis], 'uLoopPars': {'uiCount': self.sizes[axis]}}
+            if experiment is not None:
+                loop['ppNextLevelEx'] = {'': [experiment]}
+            experiment = loop
+
+        if experiment is None:
+            return 7
+        return {'SLxExperiment': experiment}
+
+    def _get_sized_file_data(self):
+        """Create consistent metadata and image data for the requested sizes
+
+        Returns:
+            list: the file data
+
+        """
+        sizes = self.sizes
+        groups = self.number_of_image_groups
+        group_numbers = np.arange(groups)
+
+        # image groups are ordered by the experiment loops, the innermost loop varies fastest
+        coordinates = np.unravel_index(group_numbers, [sizes[axis] for axis in self.loop_order])
+        t, v, z = [coordinates[self.loop_order.index(axis)] for axis in 'tvz']
+        self.image_group_coordinates = np.stack([t, v, z], axis=1)
+
+        pixels = np.arange(sizes['y'] * sizes['x']).reshape(sizes['y'], sizes['x']) % 251 + 1
+        offsets = 256 * np.arange(groups * sizes['c']).reshape(groups, sizes['c'], 1, 1)
+        self.image_data = (pixels + offsets).astype(np.uint16)
+        self.acquisition_times = 100.0 * group_numbers
+
+        attributes = self._get_slx_img_attrib()
+        attributes.update({'uiWidth': sizes['x'], 'uiHeight': sizes['y'], 'uiWidthBytes': 2 * sizes['x'] * sizes['c'],
+                           'uiComp': sizes['c'], 'uiSequenceCount': groups})
+
+        dimensions = ' x '.join(['%s(%d)' % (name, sizes[axis]) for name, axis in [('T', 't'), ('XY', 'v'), ('Z', 'z')]
+                                 if sizes[axis] > 1])
+
+        planes = {'a%d' % c: {'sDescription': 'Channel %d' % c} for c in range(sizes['c'])}
+
+        file_data = [
+            {'SLxImageAttributes': attributes},  # ImageAttributesLV!",
+            {'SLxImageTextInfo': {'TextInfoItem_5': 'Dimensions: %s' % dimensions,
+                                  'TextInfoItem_9': '10/19/2016  10:00:00'}},  # ImageTextInfoLV!",
+            self._get_experiment(),  # ImageMetadataLV!",
+            {'SLxPictureMetadata': {'sPicturePlanes': {'sPlaneNew': planes, 'uiCount': sizes['c'],
+                                                       'uiSampleCount': sizes['c']}}},  # ImageMetadataSeqLV|0!",
+            {'SLxCalibration': {'dCalibration': 0.5}},  # ImageCalibrationLV|0!",
+            10.0 * v.astype(np.float64),  # CustomData|X!",
+            20.0 * v.astype(np.float64),  # CustomData|Y!",
+            0.5 * z.astype(np.float64),  # CustomData|Z!",
+            7,  # CustomData|RoiMetadata_v1!",
+            np.full(groups, 1, dtype=np.int32),  # CustomData|PFS_STATUS!",
+            (t + 1).astype(np.int32),  # CustomData|PFS_OFFSET!",
+            7,  # CustomData|GUIDStore!",
+            7,  # CustomData|CustomDescriptionV1_0!",
+            np.full(groups, 50.0),  # CustomData|Camera_ExposureTime1!",
+            7,  # CustomData|CameraTemp1!",
+            self.acquisition_times,  # CustomData|AcqTimesCache!",
+            [0],  # CustomData|AcqTimes2Cache!",
+            [0],  # CustomData|AcqFramesCache!",
+            7,  # CustomDataVar|LUTDataV1_0!",
+            7,  # CustomDataVar|GrabberCameraSettingsV1_0!",
+            7,  # CustomDataVar|CustomDataV2_0!",
+            six.b('<variant><NISVersion>5.20.00</NISVersion></variant>'),  # CustomDataVar|AppInfo_V1_0!",
+            {'RLxExperimentRecord': {'pEvents': {'': [{'I': index, 'T': float(time), 'M': event_type}
+                                                      for index, (time, event_type) in enumerate(self.events)]}}},
+        ]
+
+        # every image group starts with a timestamp followed by the interleaved channels
+        for group in group_numbers:
+            timestamp = struct.pack('d', self.acquisition_times[group])
+            file_data.append(timestamp + np.transpose(self.image_data[group], (1, 2, 0)).tobytes())
+
+        return file_data
@@ -0,0 +1,265 @@
+"""
+Catalog of the .nd2 files in a directory tree, stored in a SQLite database
+
+Usage from the command line:
+
+    python -m nd2reader.catalog /path/to/data --database catalog.sqlite --workers 8
+
+Rescanning only probes the files that are new or whose size or modification time changed.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from nd2reader.probing import probe
+
+COLUMNS = ["path", "size", "mtime", "version", "width", "height", "channels", "channel_names", "frames", "z_levels",
+           "fields_of_view", "pixel_microns", "date", "first_time", "last_time", "experiment", "error", "scanned_at"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER,
+    mtime REAL,
+    version TEXT,
+    width INTEGER,
+    height INTEGER,
+    channels INTEGER,
+    channel_names TEXT,
+    frames INTEGER,
+    z_levels INTEGER,
+    fields_of_view INTEGER,
+    pixel_microns REAL,
+    date TEXT,
+    first_time REAL,
+    last_time REAL,
+    experiment TEXT,
+    error TEXT,
+    scanned_at REAL
+)
+"""
+
+
+def scan_file(path):
+    """Collects the catalog entry of a single file.
+
+    Errors are stored in the entry instead of being raised, so that one corrupt file does not stop a scan.
+
+    Args:
+        path: path to the .nd2 file
+
+    Returns:
+        dict: the catalog entry, with the keys in COLUMNS, or None if the file no longer exists
+
+    """
+    entry = {column: None for column in COLUMNS}
+    entry.update({"path": path, "scanned_at": time.time()})
+
+    try:
+        stat = os.stat(path)
+        entry.update({"size": stat.st_size, "mtime": stat.st_mtime})
+        with open(path, "rb") as fh:
+            summary = probe(fh, experiment=True, timestamps=True)
+    except FileNotFoundError:
+        # the file was removed or renamed after the directory was walked
+        return None
+    except Exception as exception:
+        entry["error"] = "%s: %s" % (type(exception).__name__, exception)
+        return entry
+
+    times = summary["acquisition_times"]
+    entry.update({
+        "version": "%d.%d" % summary["version"],
+        "width": summary["sizes"]["x"],
+        "height": summary["sizes"]["y"],
+        "channels": summary["sizes"]["c"],
+        "channel_names": json.dumps(summary["channels"]),
+        "frames": summary["sizes"]["t"],
+        "z_levels": summary["sizes"]["z"],
+        "fields_of_view": summary["sizes"]["v"],
+        "pixel_microns": summary["pixel_microns"],
+        "date": summary["date"].isoformat() if summary["date"] is not None else None,
+        "first_time": float(times[0]) if len(times) > 0 else None,
+        "last_time": float(times[-1]) if len(times) > 0 else None,
+        "experiment": json.dumps(summary["experiment"]),
+    })
+
+    return entry
+
+
+def find_nd2_files(root):
+    """Walks the directory tree and yields the paths of all .nd2 files.
+
+    Args:
+        root: the directory to search
+
+    Yields:
+        str: absolute path of a .nd2 file
+
+    """
+    for directory, _, file_names in os.walk(os.path.abspath(root)):
+        for file_name in file_names:
+            if file_name.lower().endswith(".nd2"):
+                yield os.path.join(directory, file_name)
+
+
+class Catalog(object):
+    """Catalog of .nd2 files, stored in a SQLite database.
+
+    """
+
+    def __init__(self, database):
+        """
+        Arguments:
+            database {str} -- path to the SQLite database, it is created if it does not exist
+        """
+        self._connection = sqlite3.connect(database)
+        self._connection.row_factory = sqlite3.Row
+        self._connection.execute(SCHEMA)
+        self._connection.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """Closes the database connection
+        """
+        self._connection.close()
+
+    def scan(self, root, workers=None, chunksize=16, commit_every=1000):
+        """Adds all .nd2 files below root to the catalog.
+
+        Files that are already in the catalog with the same size and modification time are skipped, entries of files
+        below root that no longer exist are removed. The entries are committed in batches, so an interrupted scan
+        keeps its progress and the next scan only probes the remaining files.
+
+        Args:
+            root: the directory to scan
+            workers: the number of processes used to probe the files (default: the number of CPUs, 1 scans in this
+                process)
+            chunksize: the number of files that is sent to a worker at once
+            commit_every: the number of scanned files after which the entries are committed
+
+        Returns:
+            dict: the number of 'scanned', 'unchanged', 'removed' and 'failed' files
+
+        """
+        root = os.path.abspath(root)
+        prefix = os.path.join(root, "")
+        known = {row["path"]: (row["size"], row["mtime"]) for row in self._connection.execute(
+            "SELECT path, size, mtime FROM files WHERE substr(path, 1, ?) = ?", (len(prefix), prefix))}
+
+        to_scan = []
+        found = set()
+        for path in find_nd2_files(root):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            found.add(path)
+            if known.get(path) != (stat.st_size, stat.st_mtime):
+                to_scan.append(path)
+
+        removed = [path for path in known if path not in found]
+        self._connection.executemany("DELETE FROM files WHERE path = ?", [(path,) for path in removed])
+
+        scanned = 0
+        failed = 0
+        for number, (path, entry) in enumerate(zip(to_scan, self._scan_files(to_scan, workers, chunksize)), 1):
+            if entry is None:
+                # files that vanish during the scan are treated as removed
+                self._connection.execute("DELETE FROM files WHERE path = ?", (path,))
+                removed.append(path)
+            else:
+                scanned += 1
+                failed += entry["error"] is not None
+                self._connection.execute("INSERT OR REPLACE INTO files (%s) VALUES (%s)" % (
+                    ", ".join(COLUMNS), ", ".join("?" * len(COLUMNS))), [entry[column] for column in COLUMNS])
+
+            if number % commit_every == 0:
+                self._connection.commit()
+        self._connection.commit()
+
+        return {"scanned": scanned, "unchanged": len(found) - len(to_scan), "removed": len(removed),
+                "failed": failed}
+
+    @staticmethod
+    def _scan_files(paths, workers, chunksize):
+        if workers == 1 or len(paths) <= 1:
+            for path in paths:
+                yield scan_file(path)
+            return
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for entry in executor.map(scan_file, paths, chunksize=chunksize):
+                yield entry
+
+    def query(self, sql, parameters=()):
+        """Runs a SQL query on the catalog, the table is called 'files'.
+
+        Args:
+            sql: the SQL query
+            parameters: the query parameters
+
+        Returns:
+            list: the rows as dictionaries
+
+        """
+        return [dict(row) for row in self._connection.execute(sql, parameters)]
+
+    def find(self, channels=None, min_frames=None, min_z_levels=None, min_fields_of_view=None, date_from=None,
+             date_to=None):
+        """Finds the files that match all given criteria.
+
+        Args:
+            channels: the number of channels
+            min_frames: the minimum number of frames (time points)
+            min_z_levels: the minimum number of z levels
+            min_fields_of_view: the minimum number of fields of view
+            date_from: the earliest acquisition date (datetime or ISO string)
+            date_to: the latest acquisition date (datetime or ISO string)
+
+        Returns:
+            list: the matching rows as dictionaries
+
+        """
+        conditions = ["error IS NULL"]
+        parameters = []
+        for condition, value in [("channels = ?", channels), ("frames >= ?", min_frames),
+                                 ("z_levels >= ?", min_z_levels), ("fields_of_view >= ?", min_fields_of_view),
+                                 ("date >= ?", date_from), ("date <= ?", date_to)]:
+            if value is None:
+                continue
+            conditions.append(condition)
+            parameters.append(value.isoformat() if hasattr(value, "isoformat") else value)
+
+        return self.query("SELECT * FROM files WHERE %s ORDER BY path" % " AND ".join(conditions), parameters)
+
+
+def main(argv=None):
+    """Command line entry point to build or update a catalog
+
+    Args:
+        argv: the command line arguments (default: sys.argv)
+
+    """
+    argument_parser = argparse.ArgumentParser(description="Catalog the .nd2 files in a directory tree.")
+    argument_parser.add_argument("root", help="the directory to scan")
+    argument_parser.add_argument("--database", default="nd2catalog.sqlite", help="the SQLite database to update")
+    argument_parser.add_argument("--workers", type=int, default=None, help="the number of worker processes")
+    arguments = argument_parser.parse_args(argv)
+
+    with Catalog(arguments.database) as catalog:
+        result = catalog.scan(arguments.root, workers=arguments.workers)
+
+    print("Scanned %(scanned)d files (%(failed)d failed), %(unchanged)d unchanged, %(removed)d removed." % result)
+
+
+if __name__ == "__main__":
+    main()
@@ -44,6 +44,23 @@ def parse_version(data):
     raise InvalidVersionError("The version of the ND2 you specified is not supported.")
 
 
+def read_chunk_map(fh):
+    """Reads the raw chunk map (label map), which is stored at the end of the file.
+
+    Args:
+        fh: File handle of the .nd2 file
+
+    Returns:
+        bytes: the raw chunk map
+
+    """
+    # go 8 bytes back from file end
+    fh.seek(-8, 2)
+    chunk_map_start_location = struct.unpack("Q", fh.read(8))[0]
+    fh.seek(chunk_map_start_location)
+    return fh.read(-1)
+
+
 def read_chunk(fh, chunk_location):
     """Reads a piece of data given the location of its pointer.
 
@@ -57,16 +74,129 @@ def read_chunk(fh, chunk_location):
     """
     if chunk_location is None or fh is None:
         return None
+    data_length = _seek_chunk_data(fh, chunk_location)
+    return fh.read(data_length)
+
+
+def read_chunk_into(fh, chunk_location, buffer=None):
+    """Reads a piece of data like read_chunk, but into a reusable buffer instead of a new bytes object.
+
+    Args:
+        fh: an open file handle to the ND2
+        chunk_location (int): location to read
+        buffer: a writable buffer (e.g. a bytearray), a new bytearray is allocated if it is None or too small
+
+    Returns:
+        memoryview: the data at the chunk location, a view of the start of the buffer (the buffer that was used is
+            available as the obj attribute of the view)
+
+    """
+    if chunk_location is None or fh is None:
+        return None
+    data_length = _seek_chunk_data(fh, chunk_location)
+
+    if buffer is None or len(buffer) < data_length:
+        buffer = bytearray(data_length)
+    view = memoryview(buffer)[:data_length]
+
+    return view[:readinto(fh, view)]
+
+
+def read_chunk_view(fh, chunk_location):
+    """Reads a piece of data like read_chunk, but without copying it, from a buffer in memory.
+
+    Args:
+        fh: a file-like object with a read_view method (e.g. nd2reader.sources.SourceFile)
+        chunk_location (int): location to read
+
+    Returns:
+        memoryview: the data at the chunk location, a view of the buffer
+
+    """
+    if chunk_location is None or fh is None:
+        return None
+    data_length = _seek_chunk_data(fh, chunk_location)
+
+    return fh.read_view(data_length)
+
+
+def readinto(fh, buffer):
+    """Reads from the current position of a file handle into a buffer, until the buffer is full or the end of the file
+    is reached. Falls back to read() for file handles that do not support readinto().
+
+    Args:
+        fh: an open file handle
+        buffer: a writable buffer (e.g. a bytearray or a memoryview)
+
+    Returns:
+        int: the number of bytes read
+
+    """
+    view = memoryview(buffer).cast("B")
+    if not hasattr(fh, "readinto"):
+        data = fh.read(len(view))
+        view[:len(data)] = data
+        return len(data)
+
+    length = 0
+    while length < len(view):
+        read = fh.readinto(view[length:])
+        if not read:
+            break
+        length += read
+    return length
+
+
+def read_chunk_size(fh, chunk_location):
+    """Reads the total size of a chunk from its header.
+
+    Args:
+        fh: an open file handle to the ND2
+        chunk_location (int): location of the chunk
+
+    Returns:
+        int: the size of the chunk, including the header
+
+    """
     fh.seek(chunk_location)
-    # The chunk metadata is always 16 bytes long
-    chunk_metadata = fh.read(16)
+    header, relative_offset, data_length = parse_chunk_header(fh.read(16))
+    return 16 + relative_offset + data_length
+
+
+def parse_chunk_header(chunk_metadata):
+    """Parses the 16 byte header of a chunk.
+
+    Args:
+        chunk_metadata: the header
+
+    Returns:
+        tuple: the header signature, the offset of the data relative to the end of the header and the data length
+
+    """
     header, relative_offset, data_length = struct.unpack("IIQ", chunk_metadata)
     if header != 0xabeceda:
         raise ValueError("The ND2 file seems to be corrupted.")
+    return header, relative_offset, data_length
+
+
+def _seek_chunk_data(fh, chunk_location):
+    """Moves the file handle to the start of the data of a chunk.
+
+    Args:
+        fh: an open file handle to the ND2
+        chunk_location (int): location of the chunk
+
+    Returns:
+        int: the length of the data
+
+    """
+    fh.seek(chunk_location)
+    # The chunk metadata is always 16 bytes long
+    header, relative_offset, data_length = parse_chunk_header(fh.read(16))
     # We start at the location of the chunk metadata, skip over the metadata, and then proceed to the
     # start of the actual data field, which is at some arbitrary place after the metadata.
     fh.seek(chunk_location + 16 + relative_offset)
-    return fh.read(data_length)
+    return data_length
 
 
 def read_array(fh, kind, chunk_location):
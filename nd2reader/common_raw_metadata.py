@@ -1,5 +1,6 @@
 import six
 import warnings
+import numpy as np
 
 from nd2reader.common import get_from_dict_if_exists
 
@@ -39,6 +40,35 @@ def parse_roi_type(type_no):
     return None
 
 
+def interpolate_roi_positions(roi_table, times):
+    """Interpolates the positions of all ROIs at the given times.
+
+    Args:
+        roi_table: the structured array of ROI timepoints (metadata['roi_table'])
+        times: the times in milliseconds
+
+    Returns:
+        np.ndarray: the positions in micron, with shape (number of ROIs, number of times, 3)
+
+    """
+    times = np.atleast_1d(np.asarray(times, dtype=np.float64))
+    number_of_rois = int(roi_table['roi'].max()) + 1 if len(roi_table) > 0 else 0
+    positions = np.full((number_of_rois, len(times), 3), np.nan)
+
+    order = np.lexsort((roi_table['timepoint'], roi_table['roi']))
+    roi_table = roi_table[order]
+    bounds = np.searchsorted(roi_table['roi'], np.arange(number_of_rois + 1))
+
+    for roi in range(number_of_rois):
+        keyframes = roi_table[bounds[roi]:bounds[roi + 1]]
+        if len(keyframes) == 0:
+            continue
+        for axis in range(3):
+            positions[roi, :, axis] = np.interp(times, keyframes['timepoint'], keyframes['position'][:, axis])
+
+    return positions
+
+
 def get_loops_from_data(loop_data):
     # special ND experiment
     if six.b('pPeriod') not in loop_data:
@@ -0,0 +1,170 @@
+"""
+Bounded pool of open file handles
+
+Readers that use a handle pool do not keep their file open: at most `max_open` files of the pool are open at any time.
+When another file needs to be read, the least recently used handle is closed, and it is reopened (at the same
+position) the next time its reader reads from it.
+
+    pool = HandlePool(max_open=64)
+    readers = [ND2Reader(path, handle_pool=pool) for path in paths]
+"""
+import threading
+from collections import OrderedDict
+
+
+class HandlePool(object):
+    """Limits the number of file handles that are open at the same time.
+
+    """
+
+    def __init__(self, max_open=128):
+        """
+        Arguments:
+            max_open {int} -- the maximum number of open file handles
+        """
+        if max_open < 1:
+            raise ValueError("A handle pool needs to allow at least one open file handle.")
+
+        self.max_open = max_open
+        self._lock = threading.Lock()
+        self._open_files = OrderedDict()
+
+    def open(self, path):
+        """Opens a file for (binary) reading through the pool. The file is only actually opened when it is first read.
+
+        Args:
+            path: path to the file
+
+        Returns:
+            PooledFile: the file-like object
+
+        """
+        return PooledFile(self, path)
+
+    @property
+    def open_count(self):
+        """The number of file handles that are currently open
+
+        Returns:
+            int: the number of open file handles
+
+        """
+        return len(self._open_files)
+
+    def close_all(self):
+        """Closes all open file handles that are not being read from. They are reopened when they are read again.
+
+        """
+        with self._lock:
+            self._evict(0)
+
+    def _acquire(self, pooled_file):
+        """Gets the open file handle of a pooled file, opening it (and closing the least recently used handles) if
+        needed. Must be called while holding the lock of the pooled file.
+
+        """
+        with self._lock:
+            if pooled_file in self._open_files:
+                self._open_files.move_to_end(pooled_file)
+                return pooled_file._fh
+
+            self._evict(self.max_open - 1)
+            pooled_file._fh = open(pooled_file.name, "rb")
+            self._open_files[pooled_file] = None
+            return pooled_file._fh
+
+    def _release(self, pooled_file):
+        with self._lock:
+            self._open_files.pop(pooled_file, None)
+
+    def _evict(self, limit):
+        for victim in list(self._open_files):
+            if len(self._open_files) <= limit:
+                break
+
+            # files that are being read from right now are skipped, waiting for them could deadlock
+            if not victim._lock.acquire(False):
+                continue
+            try:
+                victim._fh.close()
+                victim._fh = None
+                del self._open_files[victim]
+            finally:
+                victim._lock.release()
+
+
+class PooledFile(object):
+    """A read-only binary file whose handle is managed by a HandlePool. It remembers its position, so reads continue
+    where they left off after the handle was closed by the pool.
+
+    """
+
+    def __init__(self, pool, path):
+        self.name = path
+        self._pool = pool
+        self._fh = None
+        self._position = 0
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def _get_handle(self):
+        if self._closed:
+            raise ValueError("I/O operation on closed file.")
+
+        reopened = self._fh is None
+        fh = self._pool._acquire(self)
+        if reopened:
+            fh.seek(self._position)
+        return fh
+
+    def seek(self, offset, whence=0):
+        with self._lock:
+            self._position = self._get_handle().seek(offset, whence)
+            return self._position
+
+    def tell(self):
+        if self._closed:
+            raise ValueError("I/O operation on closed file.")
+        return self._position
+
+    def read(self, size=-1):
+        with self._lock:
+            data = self._get_handle().read(size)
+            self._position += len(data)
+            return data
+
+    def readinto(self, buffer):
+        with self._lock:
+            length = self._get_handle().readinto(buffer)
+            self._position += length
+            return length
+
+    def close(self):
+        """Closes the file and removes it from the pool
+
+        """
+        with self._lock:
+            if self._closed:
+                return
+
+            self._closed = True
+            self._pool._release(self)
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
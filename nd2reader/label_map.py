@@ -1,6 +1,7 @@
 import six
 import struct
 import re
+import numpy as np
 
 
 class LabelMap(object):
@@ -11,6 +12,7 @@ class LabelMap(object):
     def __init__(self, raw_binary_data):
         self._data = raw_binary_data
         self._image_data = {}
+        self._image_data_lengths = {}
 
     def _get_location(self, label):
         try:
@@ -20,9 +22,12 @@ class LabelMap(object):
             return None
 
     def _parse_data_location(self, label_location):
-        location, length = struct.unpack("QQ", self._data[label_location: label_location + 16])
+        location, length = self._parse_data_location_and_length(label_location)
         return location
 
+    def _parse_data_location_and_length(self, label_location):
+        return struct.unpack("QQ", self._data[label_location: label_location + 16])
+
     @property
     def image_text_info(self):
         """Get the location of the textual image information
@@ -71,14 +76,34 @@ class LabelMap(object):
             int: The location of the image data
 
         """
-        if not self._image_data:
-            regex = re.compile(six.b("""ImageDataSeq\|(\d+)!"""))
-            for match in regex.finditer(self._data):
-                if match:
-                    location = self._parse_data_location(match.end())
-                    self._image_data[int(match.group(1))] = location
+        self._parse_image_data_locations()
         return self._image_data[index]
 
+    def get_image_data_chunks(self):
+        """Get the locations and lengths of all image data chunks
+
+        Returns:
+            tuple: NumPy arrays of the image group numbers, the chunk locations and the chunk lengths, sorted by
+                image group number
+
+        """
+        self._parse_image_data_locations()
+        numbers = np.array(sorted(self._image_data), dtype=np.int64)
+        locations = np.array([self._image_data[number] for number in numbers], dtype=np.int64)
+        lengths = np.array([self._image_data_lengths[number] for number in numbers], dtype=np.int64)
+        return numbers, locations, lengths
+
+    def _parse_image_data_locations(self):
+        if self._image_data:
+            return
+
+        regex = re.compile(six.b("""ImageDataSeq\|(\d+)!"""))
+        for match in regex.finditer(self._data):
+            if match:
+                location, length = self._parse_data_location_and_length(match.end())
+                self._image_data[int(match.group(1))] = location
+                self._image_data_lengths[int(match.group(1))] = length
+
     @property
     def image_calibration(self):
         """Get the location of the image calibration
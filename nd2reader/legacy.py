@@ -2,6 +2,7 @@
 Legacy class for backwards compatibility
 """
 
+import itertools
 import warnings
 
 from nd2reader import ND2Reader
@@ -12,12 +13,17 @@ class Nd2(object):
     nd2reader.
     """
 
-    def __init__(self, filename):
+    def __init__(self, filename, handle_pool=None):
+        """
+        Arguments:
+            filename {str} -- path to the .nd2 file
+            handle_pool {HandlePool} -- pool that limits the number of open file handles (see nd2reader.handles)
+        """
         warnings.warn(
             "The 'Nd2' class is deprecated, please consider using the new ND2Reader interface which uses pims.",
             DeprecationWarning)
 
-        self.reader = ND2Reader(filename)
+        self.reader = ND2Reader(filename, handle_pool=handle_pool)
 
     def __repr__(self):
         return "\n".join(["<Deprecated ND2 %s>" % self.reader.filename,
@@ -47,19 +53,35 @@ class Nd2(object):
 
         Args:
             fields_of_view: the fields of view
-            channels: the color channels
+            channels: the color channels (names or numbers)
             z_levels: the z levels
             start: the starting frame
             stop: the last frame
 
         Returns:
-            ND2Reader: Sliced ND2Reader which contains the frames
+            Selection: lazy view of the matching images, which are only read when they are accessed
 
         """
         if stop is None:
-            stop = len(self.frames)
-
-        return self.reader[start:stop]
+            stop = max(len(self.frames), 1)
+
+        fields_of_view = self._select_values(fields_of_view, len(self.fields_of_view))
+        z_levels = self._select_values(z_levels, len(self.z_levels))
+        if isinstance(channels, str):
+            channels = [channels]
+        channels = [self.channels.index(channel) if isinstance(channel, str) else channel
+                    for channel in self._select_values(channels, len(self.channels))]
+
+        images = list(itertools.product(range(start, stop), fields_of_view, z_levels, channels))
+        return Selection(self.reader, images)
+
+    @staticmethod
+    def _select_values(values, length):
+        if values is None:
+            return range(max(length, 1))
+        if isinstance(values, str) or not hasattr(values, "__iter__"):
+            return [values]
+        return values
 
     def get_image(self, frame_number, field_of_view, channel_name, z_level):
         """Deprecated. Returns the specified image from the ND2Reader class.
@@ -165,3 +187,33 @@ class Nd2(object):
 
         """
         return self.reader.metadata["pixel_microns"]
+
+
+class Selection(object):
+    """Lazy view of the images of an Nd2 that match the criteria of Nd2.select. Images are only read when they are
+    accessed, iterating reads them in the order in which they are stored in the file.
+
+    """
+
+    def __init__(self, reader, images):
+        """
+        Arguments:
+            reader {ND2Reader} -- the reader of the file
+            images {list} -- the (frame, field of view, z level, channel) coordinates of the selected images
+        """
+        self.reader = reader
+        self.images = images
+
+    def __len__(self):
+        return len(self.images)
+
+    def __iter__(self):
+        for i, image in self.reader._iter_frames(self.images, ordered=True):
+            yield image
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return Selection(self.reader, self.images[item])
+
+        frame_number, field_of_view, z_level, channel = self.images[item]
+        return self.reader.get_frame_2D(c=channel, t=frame_number, z=z_level, v=field_of_view)
@@ -0,0 +1,345 @@
+"""
+Virtual concatenation of several .nd2 files
+
+NIS Elements splits long experiments into several files. ND2MultiReader presents them as one reader, concatenated
+along the time axis or the fields of view:
+
+    with ND2MultiReader(['day1.nd2', 'day2.nd2'], concat_axis='t') as reader:
+        frame = reader[100]
+        frames = reader.get_frames(range(0, len(reader), 10))
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from pims import Frame
+from pims.base_frames import FramesSequenceND
+
+from nd2reader.handles import HandlePool
+from nd2reader.parser import Parser
+from nd2reader.probing import probe
+from nd2reader.reader import ND2Reader, _get_shard_range
+
+
+class ND2MultiReader(FramesSequenceND):
+    """Reads several .nd2 files with the same dimensions as one file.
+
+    Only a summary of every file is read when the reader is created (see nd2reader.probe). The index of a file is
+    parsed when its frames are first accessed, and at most max_open files are open at the same time.
+
+    """
+
+    def __init__(self, paths, concat_axis="t", max_open=16, max_workers=4):
+        """
+        Arguments:
+            paths {list} -- paths to the .nd2 files, in the order in which they are concatenated
+            concat_axis {str} -- the axis along which the files are concatenated, 't' or 'v'
+            max_open {int} -- the maximum number of files that are open at the same time
+            max_workers {int} -- the number of threads that read from different files in get_frames and prefetch
+        """
+        super(ND2MultiReader, self).__init__()
+
+        if concat_axis not in ("t", "v"):
+            raise ValueError("Files can only be concatenated along the axes 't' and 'v', not '%s'." % concat_axis)
+        if len(paths) == 0:
+            raise ValueError("At least one file is needed.")
+
+        self.paths = list(paths)
+        self.concat_axis = concat_axis
+        self._summaries = [probe(path) for path in self.paths]
+        self._readers = [None] * len(self.paths)
+        self._lock = threading.Lock()
+        # a reader (its file position and chunk buffer) must not be used by two threads at once
+        self._file_locks = [threading.Lock() for _ in self.paths]
+        self._handle_pool = HandlePool(max_open)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="nd2reader")
+        self._prefetch_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="nd2reader-prefetch")
+        self._timesteps = None
+
+        sizes = [self._get_file_sizes(summary) for summary in self._summaries]
+        for path, file_sizes in zip(self.paths[1:], sizes[1:]):
+            for axis, size in file_sizes.items():
+                if axis != concat_axis and size != sizes[0][axis]:
+                    raise ValueError("The file %s has %d %s instead of %d." % (path, size, axis, sizes[0][axis]))
+
+        # the start of every file along the concatenation axis
+        self._offsets = np.cumsum([0] + [file_sizes[concat_axis] for file_sizes in sizes])
+
+        first = self._summaries[0]
+        self.metadata = {
+            "paths": self.paths,
+            "width": first["sizes"]["x"],
+            "height": first["sizes"]["y"],
+            "channels": first["channels"],
+            "pixel_microns": first["pixel_microns"],
+            "date": first["date"],
+            "frames": range(int(self._offsets[-1])) if concat_axis == "t" else range(sizes[0]["t"]),
+            "fields_of_view": range(int(self._offsets[-1])) if concat_axis == "v" else range(sizes[0]["v"]),
+            "z_levels": range(sizes[0]["z"]),
+        }
+
+        self._setup_axes(sizes[0])
+
+    @staticmethod
+    def _get_file_sizes(summary):
+        return {axis: max(size, 1) for axis, size in summary["sizes"].items()}
+
+    def _setup_axes(self, sizes):
+        self._init_axis("x", sizes["x"])
+        self._init_axis("y", sizes["y"])
+        if sizes["c"] > 1:
+            self._init_axis("c", sizes["c"])
+        self._init_axis("t", self._offsets[-1] if self.concat_axis == "t" else sizes["t"])
+        if sizes["z"] > 1:
+            self._init_axis("z", sizes["z"])
+        if self.concat_axis == "v" or sizes["v"] > 1:
+            self._init_axis("v", self._offsets[-1] if self.concat_axis == "v" else sizes["v"])
+
+        self.iter_axes = self.concat_axis
+        self._register_get_frame(self.get_frame_2D, "yx")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """Closes all files and stops the reading threads
+
+        """
+        self._executor.shutdown(wait=True)
+        self._prefetch_executor.shutdown(wait=True)
+        for reader in self._readers:
+            if reader is not None:
+                reader.close()
+
+    @property
+    def pixel_type(self):
+        """Return the pixel data type
+
+        Returns:
+            dtype: the pixel data type
+
+        """
+        return Parser.get_dtype_from_metadata()
+
+    def get_reader(self, file_number):
+        """Gets the reader of one of the files, which is created (and its index parsed) on first use
+
+        Args:
+            file_number: the position of the file in paths
+
+        Returns:
+            ND2Reader: the reader
+
+        """
+        with self._lock:
+            if self._readers[file_number] is None:
+                self._readers[file_number] = ND2Reader(self.paths[file_number], handle_pool=self._handle_pool)
+            return self._readers[file_number]
+
+    def locate(self, coordinate):
+        """Finds the file that contains a coordinate of the concatenation axis
+
+        Args:
+            coordinate: the global coordinate along the concatenation axis
+
+        Returns:
+            tuple: the file number and the coordinate within that file
+
+        """
+        if coordinate < 0 or coordinate >= self._offsets[-1]:
+            raise IndexError("%s index %d is out of range" % (self.concat_axis, coordinate))
+
+        file_number = int(np.searchsorted(self._offsets, coordinate, side="right")) - 1
+        return file_number, int(coordinate - self._offsets[file_number])
+
+    def get_frame_2D(self, c=0, t=0, z=0, x=0, y=0, v=0):
+        """Gets a given frame from the file that contains it
+
+        Args:
+            c: The color channel number
+            t: The frame number
+            z: The z stack number
+            v: The field of view index
+
+        Returns:
+            pims.Frame: The requested frame
+
+        """
+        coords = {"t": t, "v": v}
+        file_number, coords[self.concat_axis] = self.locate(coords[self.concat_axis])
+        reader = self.get_reader(file_number)
+        with self._file_locks[file_number]:
+            frame = reader.get_frame_2D(c=c, t=coords["t"], z=z, v=coords["v"])
+
+        # frames of all files carry the same metadata, so that they can be bundled
+        return Frame(np.asarray(frame), frame_no=t, metadata=self.metadata)
+
+    def get_frames(self, indices):
+        """Reads several frames, the files are read in parallel. Reading frames of the same file at the same time (e.g.
+        while a prefetch is running) is safe, these reads wait for each other.
+
+        Args:
+            indices: the frame indices
+
+        Returns:
+            list: the frames, in the order of the indices
+
+        """
+        indices = list(indices)
+
+        # frames of the same file are read by the same thread, so that the threads do not wait for each other
+        by_file = {}
+        for position, i in enumerate(indices):
+            by_file.setdefault(self._get_file_number(i), []).append(position)
+
+        def read(positions):
+            return [(position, self[indices[position]]) for position in positions]
+
+        frames = [None] * len(indices)
+        for result in self._executor.map(read, by_file.values()):
+            for position, frame in result:
+                frames[position] = frame
+
+        return frames
+
+    def prefetch(self, indices):
+        """Starts reading frames in the background
+
+        Args:
+            indices: the frame indices
+
+        Returns:
+            concurrent.futures.Future: the future of the list of frames, in the order of the indices
+
+        """
+        return self._prefetch_executor.submit(self.get_frames, list(indices))
+
+    def shard(self, rank, world_size, axes=None, **coords):
+        """Splits the frames of all files into world_size disjoint shards and returns one of them. Every shard is a
+        contiguous part of the concatenated files with about the same number of bytes, see ND2Reader.shard.
+
+        Args:
+            rank: the number of the shard, from 0 to world_size - 1
+            world_size: the number of shards
+            axes: the axes to split (default: all axes), any of 't', 'v', 'z' and 'c'
+            **coords: restricts an axis to one coordinate or a list of coordinates, the coordinates of the
+                concatenation axis are global
+
+        Returns:
+            list: the (global) coordinates of the frames of the shard as dicts, in the order in which they are stored
+                in the files (read them with iter_frames)
+
+        """
+        axes = [axis for axis in "tvzc" if axis in self.sizes] if axes is None else list(axes)
+        for axis in "tvzc":
+            if axis not in axes and axis not in coords:
+                coords[axis] = self.default_coords.get(axis, 0)
+
+        concat_values = coords.pop(self.concat_axis, range(int(self._offsets[-1])))
+        concat_values = concat_values if np.iterable(concat_values) else [concat_values]
+
+        groups = []
+        for file_number in range(len(self.paths)):
+            start, stop = self._offsets[file_number], self._offsets[file_number + 1]
+            local_coords = dict(coords)
+            local_coords[self.concat_axis] = [value - start for value in concat_values if start <= value < stop]
+            if len(local_coords[self.concat_axis]) == 0:
+                continue
+
+            reader = self.get_reader(file_number)
+            frames = reader._select_frames([axis for axis in axes if axis != self.concat_axis], **local_coords)
+            groups.extend((file_number, group) for group in reader._get_image_group_extents(frames))
+
+        start, stop = _get_shard_range([length for file_number, (location, length, frames) in groups], rank,
+                                       world_size)
+
+        shard = []
+        for file_number, (location, length, frames) in groups[start:stop]:
+            for frame in frames:
+                frame_coords = {axis: value for axis, value in zip("tvzc", frame) if axis in self.sizes}
+                frame_coords[self.concat_axis] += int(self._offsets[file_number])
+                shard.append(frame_coords)
+        return shard
+
+    def iter_frames(self, frames):
+        """Reads frames given by their (global) coordinates, e.g. the frames of a shard. The frames of each file are
+        read in the order in which they are stored in the file (see ND2Reader.iter_frames).
+
+        Args:
+            frames: the coordinates of the frames as dicts, axes that are missing are at their default coordinate
+
+        Yields:
+            tuple: the coordinates of the frame as dict and the frame (pims.Frame)
+
+        """
+        by_file = {}
+        for coords in frames:
+            frame_coords = {axis: coords.get(axis, self.default_coords.get(axis, 0)) for axis in "tvzc"}
+            file_number, frame_coords[self.concat_axis] = self.locate(frame_coords[self.concat_axis])
+            by_file.setdefault(file_number, ([], []))
+            by_file[file_number][0].append(coords)
+            by_file[file_number][1].append(frame_coords)
+
+        for file_number, (global_coords, local_coords) in by_file.items():
+            # the clone has its own file position, so reads of other threads (e.g. prefetch) do not interfere
+            reader = self.get_reader(file_number).clone()
+            try:
+                frames = reader.iter_frames(local_coords, ordered=True)
+                for coords, (local, frame) in zip(global_coords, frames):
+                    yield coords, Frame(np.asarray(frame), frame_no=coords.get("t", 0), metadata=self.metadata)
+            finally:
+                reader.close()
+
+    def _get_file_number(self, i):
+        if self.concat_axis in self.bundle_axes:
+            return None
+
+        coordinate = self.default_coords.get(self.concat_axis, 0)
+        if self.concat_axis in self.iter_axes:
+            iter_sizes = [self.sizes[axis] for axis in self.iter_axes]
+            iter_coords = np.unravel_index(i, iter_sizes)
+            coordinate = iter_coords[self.iter_axes.index(self.concat_axis)]
+
+        return self.locate(coordinate)[0]
+
+    @property
+    def timesteps(self):
+        """Get the timesteps of all files, relative to the start of the first file. A file starts at its acquisition
+        date, unless the date is missing or is not after the end of the previous file (dates have a resolution of one
+        second), then it follows the previous file after its (median) time interval.
+
+        If the files are concatenated along 'v', they share the time axis, and the timesteps of every file are
+        returned relative to the start of that file (see ND2Reader.timesteps).
+
+        Returns:
+            np.ndarray: an array of times in milliseconds, with shape (number of files, t) if the files are
+                concatenated along 'v'.
+
+        """
+        if self._timesteps is None:
+            times = [probe(path, timestamps=True)["acquisition_times"] for path in self.paths]
+            if self.concat_axis == "v":
+                self._timesteps = np.stack(times)
+                return self._timesteps
+
+            timesteps = []
+            end, interval = None, 0.0
+            first_date = self._summaries[0]["date"]
+            for summary, file_times in zip(self._summaries, times):
+                offset = 0.0
+                if summary["date"] is not None and first_date is not None:
+                    offset = (summary["date"] - first_date).total_seconds() * 1000.0
+                if len(file_times) > 0 and end is not None and file_times[0] + offset <= end:
+                    # the date is missing or too coarse, the file follows the previous one
+                    offset = end + interval - file_times[0]
+                timesteps.append(file_times + offset)
+
+                if len(file_times) > 0:
+                    end = timesteps[-1][-1]
+                    interval = float(np.median(np.diff(file_times))) if len(file_times) > 1 else 0.0
+            self._timesteps = np.concatenate(timesteps)
+
+        return self._timesteps
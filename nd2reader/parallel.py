@@ -0,0 +1,184 @@
+"""
+Parallel processing of the frames of one or more .nd2 files
+
+    from nd2reader.parallel import map_frames
+
+    def mean_intensity(frame, coords):
+        return frame.mean()
+
+    for file_number, coords, mean in map_frames(mean_intensity, paths, axes='tc', workers=8):
+        ...
+
+    total = map_frames(count_cells, paths, workers=8, reduce=operator.add)
+"""
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from nd2reader.handles import HandlePool
+from nd2reader.processes import decode_into, split_frames
+from nd2reader.reader import ND2Reader
+
+# the task runner of a worker process, created by _init_worker
+_worker_runner = None
+
+_no_initial = object()
+
+
+def map_frames(func, paths_or_readers, axes=None, workers=None, reduce=None, initial=_no_initial, block_size=None,
+               chunk_size=64, max_pending=None, max_open=16, **coords):
+    """Applies a function to the frames of one or more .nd2 files with a pool of worker processes.
+
+    The frames of every file are sorted by their position in the file and split into tasks of consecutive image
+    groups, so that every task reads a (mostly) sequential part of one file. A worker opens every file only once (and
+    keeps at most max_open files open), the index of a file is parsed only in this process. At most max_pending tasks
+    are submitted at the same time, so results are streamed back in bounded memory.
+
+    Args:
+        func: the function, called as func(frame, coords) with a frame (pims.Frame) and its coordinates (dict), or,
+            if block_size is given, as func(block, coords) with an array of up to block_size raw (uint16) frames and
+            the list of their coordinates. It is sent to the worker processes, so it must be picklable.
+        paths_or_readers: a path or an ND2Reader, or a list of them. Readers must have been opened from a path.
+        axes: the axes to iterate over (default: all axes of a file), see ND2Reader.iter_disk_order
+        workers: the number of worker processes (default: the number of CPUs, 1 runs in this process)
+        reduce: a function that combines the results, called as reduce(accumulated, result)
+        initial: the initial value of the reduction (default: the first result)
+        block_size: the number of frames that func processes at once
+        chunk_size: the number of frames per task, if block_size is not given
+        max_pending: the maximum number of tasks that are submitted at the same time (default: twice the number of
+            workers)
+        max_open: the maximum number of files that a worker keeps open
+        **coords: restricts an axis to one coordinate or a list of coordinates, see ND2Reader.iter_disk_order
+
+    Returns:
+        the reduced result if reduce is given, otherwise a generator of (file number, coordinates, result) tuples in
+            the order of the tasks. Closing the generator before it is exhausted stops the worker processes.
+
+    """
+    if isinstance(paths_or_readers, (str, ND2Reader)):
+        paths_or_readers = [paths_or_readers]
+    workers = workers if workers is not None else (os.cpu_count() or 1)
+    max_pending = max_pending if max_pending is not None else 2 * workers
+
+    readers = []
+    opened = []
+    try:
+        for source in paths_or_readers:
+            if not isinstance(source, ND2Reader):
+                source = ND2Reader(source)
+                opened.append(source)
+            elif source._path is None:
+                raise ValueError("Only an ND2Reader that was opened from a path can be processed in parallel.")
+            readers.append(source)
+
+        tasks = []
+        for file_number, reader in enumerate(readers):
+            frames = reader._select_frames(axes, **coords)
+            for part in split_frames(reader, frames, block_size or chunk_size, exact=block_size is not None):
+                tasks.append((file_number, [frames[i] for i in part], block_size is not None))
+    finally:
+        # the tasks only need the paths and the indexes of the readers, the files are opened again to run them
+        for reader in opened:
+            reader.close()
+
+    results = _iter_results(tasks, readers, func, workers, max_pending, max_open)
+    if reduce is None:
+        return results
+
+    accumulated = initial
+    try:
+        for file_number, frame_coords, result in results:
+            accumulated = result if accumulated is _no_initial else reduce(accumulated, result)
+    finally:
+        results.close()
+    return None if accumulated is _no_initial else accumulated
+
+
+def _iter_results(tasks, readers, func, workers, max_pending, max_open):
+    """Runs the tasks of map_frames. The worker processes (or the files opened in this process) are released when the
+    generator is closed, also if it was not exhausted.
+
+    """
+    if workers == 1:
+        runner = _TaskRunner(readers, func, max_open)
+        try:
+            for task in tasks:
+                for result in runner.run(*task):
+                    yield result
+        finally:
+            runner.close()
+        return
+
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(readers, func, max_open))
+    pending = deque()
+    try:
+        for task in tasks:
+            pending.append(executor.submit(_run_task, *task))
+            while len(pending) >= max_pending:
+                for result in pending.popleft().result():
+                    yield result
+        while pending:
+            for result in pending.popleft().result():
+                yield result
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+
+class _TaskRunner(object):
+    """Runs the tasks of map_frames, it opens every file once.
+
+    """
+
+    def __init__(self, readers, func, max_open):
+        self.func = func
+        self._sources = readers
+        self._readers = {}
+        self._handle_pool = HandlePool(max_open)
+
+    def close(self):
+        for reader in self._readers.values():
+            reader.close()
+
+    def get_reader(self, file_number):
+        if file_number not in self._readers:
+            source = self._sources[file_number]
+            self._readers[file_number] = ND2Reader(source._path, index=source.index, handle_pool=self._handle_pool)
+        return self._readers[file_number]
+
+    def run(self, file_number, frames, block):
+        """Runs a task
+
+        Args:
+            file_number: the position of the file in the list of files
+            frames: the (t, v, z, c) coordinates of the frames, in the order in which they are stored in the file
+            block: whether func is called with all frames at once
+
+        Returns:
+            list: the (file number, coordinates, result) tuples
+
+        """
+        reader = self.get_reader(file_number)
+        coords = [reader._get_frame_coordinates(frame) for frame in frames]
+
+        if block:
+            out = np.empty((len(frames), reader.metadata["height"], reader.metadata["width"]), dtype=np.uint16)
+            decode_into(reader, [(i,) + tuple(frame) for i, frame in enumerate(frames)], out)
+            return [(file_number, coords, self.func(out, coords))]
+
+        results = [None] * len(frames)
+        for i, frame in reader._iter_frames(frames):
+            results[i] = (file_number, coords[i], self.func(frame, coords[i]))
+        return results
+
+
+def _init_worker(readers, func, max_open):
+    global _worker_runner
+    _worker_runner = _TaskRunner(readers, func, max_open)
+
+
+def _run_task(file_number, frames, block):
+    return _worker_runner.run(file_number, frames, block)
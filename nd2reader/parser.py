@@ -1,18 +1,41 @@
 # -*- coding: utf-8 -*-
 import struct
 
-import array
 import six
 import warnings
-from pims.base_frames import Frame
 import numpy as np
 
-from nd2reader.common import get_version, read_chunk
+from nd2reader.common import get_version, read_chunk_into, read_chunk_view, read_array, read_chunk_map, \
+    read_chunk_size, parse_chunk_header, readinto
 from nd2reader.label_map import LabelMap
 from nd2reader.raw_metadata import RawMetadata
 from nd2reader import stitched
 
 
+class ParserIndex(object):
+    """The parsed, immutable part of a Parser: the version check, the label map, the parsed metadata and the lookup
+    table from coordinates to image group numbers.
+
+    An index can be shared by several parsers of the same file (each with its own file handle) and is picklable, so
+    that the metadata does not have to be parsed again.
+
+    """
+    __slots__ = ('supported', 'label_map', 'metadata', 'image_group_lookup', 'image_group_table', '__weakref__')
+
+    def __init__(self, supported, label_map, metadata, image_group_lookup, image_group_table=None):
+        self.supported = supported
+        self.label_map = label_map
+        self.metadata = metadata
+        self.image_group_lookup = image_group_lookup
+        self.image_group_table = image_group_table
+
+    def __getstate__(self):
+        return self.supported, self.label_map, self.metadata, self.image_group_lookup, self.image_group_table
+
+    def __setstate__(self, state):
+        self.supported, self.label_map, self.metadata, self.image_group_lookup, self.image_group_table = state
+
+
 class Parser(object):
     """Parses ND2 files and creates a Metadata and driver object.
 
@@ -23,18 +46,64 @@ class Parser(object):
 
     supported_file_versions = {(3, None): True}
 
-    def __init__(self, fh):
+    # image groups that are less than this many bytes apart in the file are read at once
+    READ_GAP = 1 << 16
+    # the maximum number of bytes that is read at once when reading multiple image groups
+    MAX_READ_SIZE = 1 << 28
+
+    def __init__(self, fh, index=None):
+        """
+        Arguments:
+            fh {IO} -- input buffer handler (opened with "rb" mode), may be None if an index is given
+            index {ParserIndex} -- prebuilt index of the same file, skips the version check and metadata parsing
+        """
         self._fh = fh
         self._label_map = None
         self._raw_metadata = None
+        self._index = None
+        self._image_group_coordinates = None
+        self._chunk_buffer = None
         self.metadata = None
 
+        if index is not None:
+            self._load_index(index)
+            return
+
         # First check the file version
         self.supported = self._check_version_supported()
 
         # Parse the metadata
         self._parse_metadata()
 
+    @property
+    def index(self):
+        """The parsed index of the file, which can be used to create another parser for the same file
+
+        Returns:
+            ParserIndex: the index
+
+        """
+        return self._index
+
+    def _load_index(self, index):
+        self._index = index
+        self.supported = index.supported
+        self._label_map = index.label_map
+        self._raw_metadata = RawMetadata(self._fh, self._label_map)
+        self._raw_metadata._metadata_parsed = index.metadata
+        self.metadata = index.metadata
+        self.acquisition_times = self._raw_metadata.acquisition_times
+
+    def _set_file_handle(self, fh):
+        """Replaces the file handle, e.g. after the file has been reopened in another process
+
+        Args:
+            fh: the new file handle
+
+        """
+        self._fh = fh
+        self._raw_metadata._fh = fh
+
     def calculate_image_properties(self, index):
         """Calculate FOV, channels and z_levels
 
@@ -66,6 +135,8 @@ class Parser(object):
             Frame: the image
 
         """
+        from pims.base_frames import Frame
+
         field_of_view, channel, z_level = self.calculate_image_properties(index)
         channel_offset = index % len(self.metadata["channels"])
         image_group_number = int(index / len(self.metadata["channels"]))
@@ -92,20 +163,116 @@ class Parser(object):
         Returns:
             Frame: the requested image
 
+        """
+        from pims.base_frames import Frame
+
+        frame_number = 0 if frame_number is None else frame_number
+        image = self.get_image_data(frame_number, field_of_view, channel, z_level, height, width)
+        return Frame(image, frame_no=frame_number, metadata=self._get_frame_metadata())
+
+    def get_image_data(self, frame_number=0, field_of_view=0, channel=0, z_level=0, height=None, width=None,
+                       out=None):
+        """Gets the pixel data of an image based on its attributes, without wrapping it in a pims Frame
+
+        Args:
+            frame_number: the frame number
+            field_of_view: the field of view
+            channel: the color channel number
+            z_level: the z level
+            height: the height of the image (defaults to the height in the metadata)
+            width: the width of the image (defaults to the width in the metadata)
+            out: an array of shape (height, width) to decode the image into (e.g. a preallocated array, a np.memmap
+                or an array backed by shared memory), a new array is allocated if it is None
+
+        Returns:
+            np.ndarray: the requested image (out, if given), an empty list if the image could not be read
+
         """
         frame_number = 0 if frame_number is None else frame_number
         field_of_view = 0 if field_of_view is None else field_of_view
         channel = 0 if channel is None else channel
         z_level = 0 if z_level is None else z_level
+        height = self.metadata["height"] if height is None else height
+        width = self.metadata["width"] if width is None else width
 
         image_group_number = self._calculate_image_group_number(frame_number, field_of_view, z_level)
         try:
             timestamp, raw_image_data = self._get_raw_image_data(image_group_number, channel,
-                                                                 height, width)
+                                                                 height, width, out=out)
         except (TypeError):
-            return Frame([], frame_no=frame_number, metadata=self._get_frame_metadata())
+            return []
         else:
-            return Frame(raw_image_data, frame_no=frame_number, metadata=self._get_frame_metadata())
+            return raw_image_data
+
+    def get_image_group_data(self, frame_number=0, field_of_view=0, z_level=0, height=None, width=None, out=None):
+        """Gets the pixel data of all color channels of an image group, which are stored together in the file
+
+        Args:
+            frame_number: the frame number
+            field_of_view: the field of view
+            z_level: the z level
+            height: the height of the images (defaults to the height in the metadata)
+            width: the width of the images (defaults to the width in the metadata)
+            out: an array of shape (channels, height, width) to decode the images into, a new array is allocated if
+                it is None
+
+        Returns:
+            np.ndarray: the images of all channels (out, if given), with shape (channels, height, width)
+
+        """
+        frame_number = 0 if frame_number is None else frame_number
+        field_of_view = 0 if field_of_view is None else field_of_view
+        z_level = 0 if z_level is None else z_level
+        height = self.metadata["height"] if height is None else height
+        width = self.metadata["width"] if width is None else width
+
+        image_group_number = self._calculate_image_group_number(frame_number, field_of_view, z_level)
+        return self._get_raw_image_group_data(image_group_number, height, width, out=out)
+
+    def get_image_group_table(self):
+        """Gets the per image group metadata as NumPy arrays.
+
+        The table contains the coordinates ('t', 'v', 'z'), the acquisition time in milliseconds ('time'), the stage
+        position ('stage_x', 'stage_y', 'stage_z'), the perfect focus system status and offset ('pfs_status',
+        'pfs_offset'), the exposure time ('exposure_time'), the location and length of the image data chunk ('offset',
+        'length') and whether the image group is missing from the file ('gap'). Values that are not stored in the file
+        are NaN, missing chunks have an offset of -1.
+
+        Returns:
+            dict: a dictionary of arrays with one entry per image group
+
+        """
+        if self._index.image_group_table is not None:
+            return self._index.image_group_table
+
+        number_of_groups = self._get_number_of_image_groups()
+        frame_number, field_of_view, z_level = self._calculate_image_group_coordinates(np.arange(number_of_groups))
+
+        numbers, locations, lengths = self._label_map.get_image_data_chunks()
+        in_range = numbers < number_of_groups
+        offset = np.full(number_of_groups, -1, dtype=np.int64)
+        offset[numbers[in_range]] = locations[in_range]
+        length = np.zeros(number_of_groups, dtype=np.int64)
+        length[numbers[in_range]] = lengths[in_range]
+
+        self._index.image_group_table = {
+            't': frame_number,
+            'v': field_of_view,
+            'z': z_level,
+            'time': _fit_to_length(read_array(self._fh, 'double', self._label_map.acquisition_times),
+                                   number_of_groups),
+            'stage_x': _fit_to_length(self._raw_metadata.x_data, number_of_groups),
+            'stage_y': _fit_to_length(self._raw_metadata.y_data, number_of_groups),
+            'stage_z': _fit_to_length(self._raw_metadata.z_data, number_of_groups),
+            'pfs_status': _fit_to_length(self._raw_metadata.pfs_status, number_of_groups),
+            'pfs_offset': _fit_to_length(self._raw_metadata.pfs_offset, number_of_groups),
+            'exposure_time': _fit_to_length(self._raw_metadata.camera_exposure_time, number_of_groups),
+            'offset': offset,
+            'length': length,
+            'gap': offset < 0,
+        }
+
+        return self._index.image_group_table
 
     @staticmethod
     def get_dtype_from_metadata():
@@ -142,6 +309,23 @@ class Parser(object):
         self._raw_metadata = RawMetadata(self._fh, self._label_map)
         self.metadata = self._raw_metadata.__dict__
         self.acquisition_times = self._raw_metadata.acquisition_times
+        self._index = ParserIndex(self.supported, self._label_map, self.metadata, self._build_image_group_lookup())
+
+    def _build_image_group_lookup(self):
+        """Builds the lookup table from coordinates to image group numbers. The image groups are stored in the order of
+        the experiment loops, with the innermost loop varying fastest.
+
+        Returns:
+            np.ndarray: the image group numbers, indexed by [time index, field of view, z level]
+
+        """
+        loop_order = self._raw_metadata.get_loop_order()
+        lengths = {'t': self._get_axis_length('frames'), 'v': self._get_axis_length('fields_of_view'),
+                   'z': self._get_axis_length('z_levels')}
+
+        image_group_numbers = np.arange(lengths['t'] * lengths['v'] * lengths['z'], dtype=np.int64)
+        image_group_numbers = image_group_numbers.reshape([lengths[axis] for axis in loop_order])
+        return np.ascontiguousarray(np.transpose(image_group_numbers, [loop_order.index(axis) for axis in 'tvz']))
 
     def _build_label_map(self):
         """
@@ -153,12 +337,7 @@ class Parser(object):
             LabelMap: the computed label map
 
         """
-        # go 8 bytes back from file end
-        self._fh.seek(-8, 2)
-        chunk_map_start_location = struct.unpack("Q", self._fh.read(8))[0]
-        self._fh.seek(chunk_map_start_location)
-        raw_text = self._fh.read(-1)
-        return LabelMap(raw_text)
+        return LabelMap(read_chunk_map(self._fh))
 
     def _calculate_field_of_view(self, index):
         """Determines what field of view was being imaged for a given image.
@@ -169,8 +348,9 @@ class Parser(object):
         Returns:
             int: the field of view
         """
-        images_per_cycle = len(self.metadata["z_levels"]) * len(self.metadata["channels"])
-        return int((index - (index % images_per_cycle)) / images_per_cycle) % len(self.metadata["fields_of_view"])
+        frame_number, field_of_view, z_level = self._calculate_image_group_coordinates(
+            index // len(self.metadata["channels"]))
+        return field_of_view
 
     def _calculate_channel(self, index):
         """Determines what channel a particular image is.
@@ -196,9 +376,9 @@ class Parser(object):
             The z level
 
         """
-        return self.metadata["z_levels"][int(
-            ((index - (index % len(self.metadata["channels"]))) / len(self.metadata["channels"])) % len(
-                self.metadata["z_levels"]))]
+        frame_number, field_of_view, z_level = self._calculate_image_group_coordinates(
+            index // len(self.metadata["channels"]))
+        return self.metadata["z_levels"][z_level] if len(self.metadata["z_levels"]) > 0 else z_level
 
     def _calculate_image_group_number(self, frame_number, fov, z_level):
         """
@@ -213,12 +393,50 @@ class Parser(object):
             int: the image group number
 
         """
-        z_length = len(self.metadata['z_levels'])
-        z_length = z_length if z_length > 0 else 1
-        fields_of_view = len(self.metadata["fields_of_view"])
-        fields_of_view = fields_of_view if fields_of_view > 0 else 1
+        return int(self._index.image_group_lookup[frame_number, fov, z_level])
+
+    def calculate_image_group_numbers(self, frame_numbers, fields_of_view=0, z_levels=0):
+        """Looks up the image group numbers of many images at once. The coordinates are broadcast against each other.
+
+        Args:
+            frame_numbers: the time indices (array-like)
+            fields_of_view: the field of view numbers (array-like)
+            z_levels: the z level numbers (array-like)
+
+        Returns:
+            np.ndarray: the image group numbers
+
+        """
+        return self._index.image_group_lookup[np.asarray(frame_numbers), np.asarray(fields_of_view),
+                                              np.asarray(z_levels)]
+
+    def _calculate_image_group_coordinates(self, image_group_number):
+        """
+        Inverse of _calculate_image_group_number, also works on NumPy arrays of image group numbers.
+
+        Args:
+            image_group_number: the image group number(s)
+
+        Returns:
+            tuple: the time index, the field of view number and the z level number
+
+        """
+        if self._image_group_coordinates is None:
+            lookup = self._index.image_group_lookup
+            coordinates = np.empty((3, lookup.size), dtype=np.int64)
+            coordinates[:, lookup.ravel()] = np.indices(lookup.shape).reshape(3, -1)
+            self._image_group_coordinates = coordinates
 
-        return frame_number * fields_of_view * z_length + (fov * z_length + z_level)
+        frame_number, fov, z_level = self._image_group_coordinates[:, image_group_number]
+        return frame_number, fov, z_level
+
+    def _get_number_of_image_groups(self):
+        return self._get_axis_length('frames') * self._get_axis_length('fields_of_view') * \
+            self._get_axis_length('z_levels')
+
+    def _get_axis_length(self, key):
+        length = len(self.metadata[key])
+        return length if length > 0 else 1
 
     def _calculate_frame_number(self, image_group_number, field_of_view, z_level):
         """
@@ -232,7 +450,8 @@ class Parser(object):
         Returns:
 
         """
-        return (image_group_number - (field_of_view * len(self.metadata["z_levels"]) + z_level)) / (len(self.metadata["fields_of_view"]) * len(self.metadata["z_levels"]))
+        frame_number, fov, z = self._calculate_image_group_coordinates(image_group_number)
+        return frame_number
 
     @property
     def _channel_offset(self):
@@ -246,26 +465,75 @@ class Parser(object):
         """
         return {channel: n for n, channel in enumerate(self.metadata["channels"])}
 
-    def _get_raw_image_data(self, image_group_number, channel_offset, height, width):
-        """Reads the raw bytes and the timestamp of an image.
+    @property
+    def _reads_views(self):
+        """Whether the file is a zero-copy byte source (see nd2reader.sources.SourceFile.zero_copy), whose chunks are
+        read as views of the data of the source instead of being copied into the chunk buffer.
+
+        """
+        return getattr(self._fh, "zero_copy", False)
+
+    def _read_image_group(self, image_group_number):
+        """Reads the data chunk of an image group into the reusable chunk buffer of the parser. Chunks of zero-copy
+        byte sources are not copied, see _reads_views.
 
         Args:
             image_group_number: the image group number (see _calculate_image_group_number)
-            channel_offset: the number of the color channel
-            height: the height of the image
-            width: the width of the image
 
         Returns:
+            tuple: the timestamp and the data as uint16 array, which is a view of the chunk buffer that is overwritten
+                by the next read (or a view of the data of a zero-copy byte source)
 
         """
         chunk = self._label_map.get_image_data_location(image_group_number)
-        data = read_chunk(self._fh, chunk)
+        if self._reads_views:
+            data = read_chunk_view(self._fh, chunk)
+        else:
+            data = read_chunk_into(self._fh, chunk, self._chunk_buffer)
+            if data is not None:
+                self._chunk_buffer = data.obj
 
         # All images in the same image group share the same timestamp! So if you have complicated image data,
         # your timestamps may not be entirely accurate. Practically speaking though, they'll only be off by a few
         # seconds unless you're doing something super weird.
         timestamp = struct.unpack("d", data[:8])[0]
-        image_group_data = array.array("H", data)
+        return timestamp, np.frombuffer(data, dtype=np.uint16, count=len(data) // 2)
+
+    def _get_raw_image_data(self, image_group_number, channel_offset, height, width, out=None):
+        """Reads the raw bytes and the timestamp of an image.
+
+        Args:
+            image_group_number: the image group number (see _calculate_image_group_number)
+            channel_offset: the number of the color channel
+            height: the height of the image
+            width: the width of the image
+            out: an array of shape (height, width) to decode the image into
+
+        Returns:
+
+        """
+        if out is not None and out.shape != (height, width):
+            raise ValueError("The output array has shape %s instead of %s." % (out.shape, (height, width)))
+
+        timestamp, image_group_data = self._read_image_group(image_group_number)
+        return timestamp, self._decode_image(image_group_data, channel_offset, height, width, out=out,
+                                             copy=not self._reads_views)
+
+    def _decode_image(self, image_group_data, channel_offset, height, width, out=None, copy=True):
+        """Decodes the image of one color channel from the data of an image group.
+
+        Args:
+            image_group_data: the data of the image group as uint16 array, including the timestamp
+            channel_offset: the number of the color channel
+            height: the height of the image
+            width: the width of the image
+            out: an array of shape (height, width) to decode the image into
+            copy: whether to copy the image when out is not given, otherwise the image may be a view of image_group_data
+
+        Returns:
+            np.ndarray: the image
+
+        """
         image_data_start = 4 + channel_offset
         image_group_data = stitched.remove_parsed_unwanted_bytes(image_group_data, image_data_start, height, width)
 
@@ -279,12 +547,20 @@ class Parser(object):
             new_width = len(image_group_data[image_data_start::number_of_true_channels]) // height
             image_data = np.reshape(image_group_data[image_data_start::number_of_true_channels], (height, new_width))
 
+        # the image data is still a view of the chunk buffer
+        if out is None:
+            if copy:
+                image_data = image_data.copy()
+        else:
+            np.copyto(out, image_data)
+            image_data = out
+
         # Skip images that are all zeros! This is important, since NIS Elements creates blank "gap" images if you
         # don't have the same number of images each cycle. We discovered this because we only took GFP images every
         # other cycle to reduce phototoxicity, but NIS Elements still allocated memory as if we were going to take
         # them every cycle.
         if np.any(image_data):
-            return timestamp, image_data
+            return image_data
 
         # If a blank "gap" image is encountered, generate an array of corresponding height and width to avoid
         # errors with ND2-files with missing frames. Array is filled with nan to reflect that data is missing.
@@ -292,7 +568,162 @@ class Parser(object):
             empty_frame = np.full((height, width), np.nan)
             warnings.warn(
                 "ND2 file contains gap frames which are represented by np.nan-filled arrays; to convert to zeros use e.g. np.nan_to_num(array)")
-            return timestamp, image_data
+            return image_data
+
+    def _get_raw_image_group_data(self, image_group_number, height, width, out=None):
+        """Reads the images of all color channels of an image group.
+
+        Args:
+            image_group_number: the image group number (see _calculate_image_group_number)
+            height: the height of the images
+            width: the width of the images
+            out: an array of shape (channels, height, width) to decode the images into
+
+        Returns:
+            np.ndarray: the images, with shape (channels, height, width)
+
+        """
+        timestamp, image_group_data = self._read_image_group(image_group_number)
+        return self._decode_image_group(image_group_data, height, width, out=out)
+
+    def _decode_image_group(self, image_group_data, height, width, out=None):
+        """Decodes the images of all color channels from the data of an image group.
+
+        Args:
+            image_group_data: the data of the image group as uint16 array, including the timestamp
+            height: the height of the images
+            width: the width of the images
+            out: an array of shape (channels, height, width) to decode the images into
+
+        Returns:
+            np.ndarray: the images, with shape (channels, height, width)
+
+        """
+        number_of_true_channels = int(len(image_group_data[4:]) / (height * width))
+        shape = (number_of_true_channels, height, width)
+
+        if out is None:
+            out = np.empty(shape, dtype=np.uint16)
+        elif out.shape != shape:
+            raise ValueError("The output array has shape %s instead of %s." % (out.shape, shape))
+
+        if len(image_group_data[4:]) % (height * width):
+            # stitched images contain extra bytes, decode channel by channel
+            for channel in range(number_of_true_channels):
+                self._decode_image(image_group_data, channel, height, width, out=out[channel])
+            return out
+
+        channels = np.reshape(image_group_data[4:], (height, width, number_of_true_channels))
+        np.copyto(out, np.moveaxis(channels, 2, 0))
+        return out
+
+    def _read_image_groups(self, image_group_numbers, max_read_size=None):
+        """Reads the data of several image groups in the order in which they are stored in the file. Image groups that
+        are (nearly) adjacent in the file are fetched with a single read.
+
+        Args:
+            image_group_numbers: the image group numbers
+            max_read_size: the maximum number of bytes that is read at once (default: MAX_READ_SIZE)
+
+        Yields:
+            tuple: the position in image_group_numbers and the data of the image group as uint16 array, which is a
+                view of a buffer that is overwritten by the next read
+
+        """
+        max_read_size = self.MAX_READ_SIZE if max_read_size is None else max_read_size
+        locations = np.array([self._label_map.get_image_data_location(number) for number in image_group_numbers],
+                             dtype=np.int64)
+        if len(locations) == 0:
+            return
+
+        order = np.argsort(locations, kind="stable")
+        if self._reads_views:
+            # zero-copy byte sources do not need the coalescing below, their chunks are views
+            for i in order:
+                yield int(i), self._read_image_group(image_group_numbers[i])[1]
+            return
+
+        # all image groups of a file have the same size
+        chunk_size = read_chunk_size(self._fh, int(locations[order[0]]))
+
+        # split the image groups into runs of chunks that are close to each other
+        sorted_locations = locations[order]
+        run_starts = [0]
+        for i in range(1, len(order)):
+            gap = sorted_locations[i] - sorted_locations[i - 1] - chunk_size
+            span = sorted_locations[i] + chunk_size - sorted_locations[run_starts[-1]]
+            if gap > self.READ_GAP or span > max_read_size:
+                run_starts.append(i)
+        run_stops = run_starts[1:] + [len(order)]
+
+        buffer = None
+        for start, stop in zip(run_starts, run_stops):
+            run_location = int(sorted_locations[start])
+            run_length = int(sorted_locations[stop - 1]) + chunk_size - run_location
+            if buffer is None or len(buffer) < run_length:
+                buffer = bytearray(run_length)
+
+            self._fh.seek(run_location)
+            length = readinto(self._fh, memoryview(buffer)[:run_length])
+
+            for i in range(start, stop):
+                position = int(sorted_locations[i]) - run_location
+                header, relative_offset, data_length = parse_chunk_header(bytes(buffer[position:position + 16]))
+                data_start = position + 16 + relative_offset
+
+                if data_start + data_length > length:
+                    # this chunk is larger than expected, read it on its own
+                    timestamp, image_group_data = self._read_image_group(image_group_numbers[order[i]])
+                else:
+                    image_group_data = np.frombuffer(buffer, dtype=np.uint16, count=data_length // 2,
+                                                     offset=data_start)
+                yield int(order[i]), image_group_data
+
+    def get_volume_data(self, frame_number=0, field_of_view=0, channel=None, height=None, width=None, out=None):
+        """Gets the pixel data of all z levels at once. The image groups of a z stack are usually stored next to each
+        other, so the whole stack is read with a single (sequential) read.
+
+        Args:
+            frame_number: the frame number
+            field_of_view: the field of view
+            channel: the color channel number, or None for all channels
+            height: the height of the images (defaults to the height in the metadata)
+            width: the width of the images (defaults to the width in the metadata)
+            out: an array to decode the images into, with shape (z levels, height, width) for a single channel or
+                (channels, z levels, height, width) for all channels
+
+        Returns:
+            np.ndarray: the images (out, if given), with shape (z levels, height, width) for a single channel or
+                (channels, z levels, height, width) for all channels
+
+        """
+        frame_number = 0 if frame_number is None else frame_number
+        field_of_view = 0 if field_of_view is None else field_of_view
+        height = self.metadata["height"] if height is None else height
+        width = self.metadata["width"] if width is None else width
+
+        z_levels = self._get_axis_length('z_levels')
+        image_group_numbers = [self._calculate_image_group_number(frame_number, field_of_view, z_level)
+                               for z_level in range(z_levels)]
+
+        if channel is None:
+            shape = (max(len(self.metadata["channels"]), 1), z_levels, height, width)
+        else:
+            shape = (z_levels, height, width)
+
+        if out is None:
+            out = np.empty(shape, dtype=np.uint16)
+        elif out.shape != shape:
+            raise ValueError("The output array has shape %s instead of %s." % (out.shape, shape))
+
+        planes = np.moveaxis(out, 1, 0) if channel is None else out
+        for z_level, image_group_data in self._read_image_groups(image_group_numbers):
+            if channel is None:
+                self._decode_image_group(image_group_data, height, width, out=planes[z_level])
+            else:
+                self._decode_image(image_group_data, channel, height, width, out=planes[z_level])
+
+        return out
 
     def _get_frame_metadata(self):
         """Get the metadata for one frame
@@ -302,3 +733,21 @@ class Parser(object):
 
         """
         return self.metadata
+
+
+def _fit_to_length(values, length):
+    """Converts the values to a float array of the given length, padding with NaN if there are too few values.
+
+    Args:
+        values: the values (or None)
+        length: the length of the resulting array
+
+    Returns:
+        np.ndarray: the values as float array
+
+    """
+    result = np.full(length, np.nan)
+    if values is not None:
+        values = np.asarray(values, dtype=np.float64)[:length]
+        result[:len(values)] = values
+    return result
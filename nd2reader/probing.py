@@ -0,0 +1,77 @@
+"""
+Fast summary of .nd2 files without parsing all metadata
+"""
+import os
+import numpy as np
+
+from nd2reader.common import get_version, read_chunk_map, read_array
+from nd2reader.exceptions import InvalidFileType
+from nd2reader.label_map import LabelMap
+from nd2reader.raw_metadata import RawMetadata
+
+
+def probe(fh, experiment=False, timestamps=False):
+    """Reads the version, dimensions, channels, pixel size and acquisition date of a .nd2 file.
+
+    Only the file header, the chunk map and the metadata blocks that describe the dimensions are read. The experiment,
+    ROI and event metadata are skipped, which makes this a lot faster than opening the file with ND2Reader.
+
+    Args:
+        fh: path to the .nd2 file or an input buffer handler (opened with "rb" mode)
+        experiment: also read the experiment description and loops ('experiment')
+        timestamps: also read the acquisition times in milliseconds ('acquisition_times')
+
+    Returns:
+        dict: the summary of the file. The sizes contain all axes ('x', 'y', 'c', 't', 'z' and 'v'), axes that
+            ND2Reader omits from its sizes have size 1.
+
+    """
+    if not isinstance(fh, str):
+        return _probe_file_handle(fh, experiment, timestamps)
+
+    if not fh.endswith(".nd2"):
+        raise InvalidFileType(("The file %s you want to read with nd2reader" % fh)
+                              + " does not have extension .nd2.")
+
+    with open(fh, "rb") as file_handle:
+        summary = _probe_file_handle(file_handle, experiment, timestamps)
+    summary["path"] = os.path.abspath(fh)
+
+    return summary
+
+
+def _probe_file_handle(fh, experiment=False, timestamps=False):
+    version = get_version(fh)
+    label_map = LabelMap(read_chunk_map(fh))
+    raw_metadata = RawMetadata(fh, label_map)
+    metadata = raw_metadata.get_summary_metadata()
+
+    # like the axes of ND2Reader, an axis without coordinates has size 1
+    sizes = {
+        "x": metadata["width"] or 0,
+        "y": metadata["height"] or 0,
+        "c": max(len(metadata["channels"]), 1),
+        "t": max(len(metadata["frames"]), 1),
+        "z": max(len(metadata["z_levels"]), 1),
+        "v": max(len(metadata["fields_of_view"]), 1),
+    }
+
+    summary = {
+        "path": None,
+        "version": version,
+        "sizes": sizes,
+        "channels": metadata["channels"],
+        "pixel_microns": metadata["pixel_microns"],
+        "date": metadata["date"],
+        "total_images_per_channel": metadata["total_images_per_channel"],
+    }
+
+    if experiment:
+        summary["experiment"] = raw_metadata.get_experiment_metadata()
+
+    if timestamps:
+        acquisition_times = read_array(fh, 'double', label_map.acquisition_times)
+        summary["acquisition_times"] = np.asarray(acquisition_times if acquisition_times is not None else [],
+                                                  dtype=np.float64)
+
+    return summary
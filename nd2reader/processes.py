@@ -0,0 +1,260 @@
+"""
+Decoding frames in worker processes
+
+Decoding image data is partly Python-bound, so reading with several threads does not scale with the number of cores.
+A ProcessPoolReader decodes frames in worker processes instead. Every worker opens the file once (without parsing it
+again, the index is sent along) and decodes the frames directly into a shared memory block, which the parent process
+exposes as a NumPy array without copying it:
+
+    with ProcessPoolReader('my_file.nd2', workers=8) as reader:
+        frames = reader.get_frames(range(100))       # np.ndarray with shape (100, height, width)
+        future = reader.prefetch(range(100, 200))
+        for frame in reader.iterate(batch_size=64):
+            ...
+"""
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from nd2reader.reader import ND2Reader
+
+# the reader of a worker process, opened by _init_worker
+_worker_reader = None
+
+
+class ProcessPoolReader(object):
+    """Reads 2D frames of an .nd2 file with a pool of worker processes.
+
+    Frames are indexed like the frames of the ND2Reader in the reader attribute (see its iter_axes and
+    default_coords), but are always single 2D images of raw (uint16) pixel data.
+
+    """
+
+    def __init__(self, path, workers=None, mp_context=None):
+        """
+        Arguments:
+            path {str} -- path to the .nd2 file
+            workers {int} -- the number of worker processes (default: the number of CPUs)
+            mp_context -- the multiprocessing context of the workers (default: the default context)
+        """
+        self.reader = ND2Reader(path)
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=mp_context,
+                                             initializer=_init_worker, initargs=(self.reader,))
+        self._prefetch_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="nd2reader-prefetch")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self):
+        return len(self.reader)
+
+    def close(self):
+        """Stops the worker processes and closes the file
+
+        """
+        self._prefetch_executor.shutdown(wait=True)
+        self._executor.shutdown(wait=True)
+        self.reader.close()
+
+    @property
+    def frame_shape(self):
+        """The shape of a frame
+
+        Returns:
+            tuple: the height and the width
+
+        """
+        return self.reader.metadata["height"], self.reader.metadata["width"]
+
+    def get_frames(self, indices):
+        """Reads several frames. The frames are split in parts that are (mostly) contiguous in the file, and every
+        part is decoded by another worker.
+
+        Args:
+            indices: the frame indices
+
+        Returns:
+            np.ndarray: the frames, with shape (len(indices), height, width), backed by shared memory
+
+        """
+        return self.read([self._get_frame_coordinates(i) for i in indices])
+
+    def read(self, frames):
+        """Reads frames by their coordinates
+
+        Args:
+            frames: the (t, v, z, c) coordinates of the frames
+
+        Returns:
+            np.ndarray: the frames, with shape (len(frames), height, width), backed by shared memory
+
+        """
+        shape = (len(frames),) + self.frame_shape
+        if len(frames) == 0:
+            return np.empty(shape, dtype=np.uint16)
+
+        # frames of the same image group stay together, and the parts follow the order in the file
+        size = -(-len(frames) // self.workers)
+        tasks = [[(i,) + tuple(frames[i]) for i in part] for part in split_frames(self.reader, frames, size)]
+
+        memory = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * np.dtype(np.uint16).itemsize)
+        try:
+            futures = [self._executor.submit(_decode_frames, memory.name, shape, task) for task in tasks]
+            for future in futures:
+                future.result()
+        except BaseException:
+            memory.close()
+            memory.unlink()
+            raise
+
+        # the memory stays mapped in this process until the array is no longer used
+        memory.unlink()
+        return np.asarray(_SharedArray(memory, shape, np.uint16))
+
+    def prefetch(self, indices):
+        """Starts reading frames in the background
+
+        Args:
+            indices: the frame indices
+
+        Returns:
+            concurrent.futures.Future: the future of the frames (see get_frames)
+
+        """
+        return self._prefetch_executor.submit(self.get_frames, list(indices))
+
+    def iterate(self, indices=None, batch_size=64):
+        """Iterates over frames, the next batch is read while the frames of the current batch are processed
+
+        Args:
+            indices: the frame indices (default: all frames)
+            batch_size: the number of frames that is read at once
+
+        Yields:
+            np.ndarray: the frames, in the order of the indices
+
+        """
+        indices = list(range(len(self)) if indices is None else indices)
+        batches = [indices[start:start + batch_size] for start in range(0, len(indices), batch_size)]
+        if len(batches) == 0:
+            return
+
+        future = self.prefetch(batches[0])
+        for batch in batches[1:] + [None]:
+            frames = future.result()
+            if batch is not None:
+                future = self.prefetch(batch)
+            for frame in frames:
+                yield frame
+
+    def _get_frame_coordinates(self, i):
+        coords = {axis: self.reader._get_default(axis) for axis in "tvzc"}
+        iter_axes = self.reader.iter_axes
+        if len(iter_axes) > 0:
+            coords.update(zip(iter_axes, np.unravel_index(i, [self.reader.sizes[axis] for axis in iter_axes])))
+        return tuple(int(coords[axis]) for axis in "tvzc")
+
+
+class _SharedArray(object):
+    """Exposes a shared memory block as an array. The block is closed when the last array that uses it is gone.
+
+    """
+
+    def __init__(self, memory, shape, dtype):
+        self._memory = memory
+        self._array = np.ndarray(shape, dtype=dtype, buffer=memory.buf)
+        self.__array_interface__ = self._array.__array_interface__
+
+    def __del__(self):
+        # the array has to release the buffer before the memory can be closed
+        self._array = None
+        self._memory.close()
+
+
+def _init_worker(reader):
+    global _worker_reader
+    _worker_reader = reader
+
+
+def _attach(name):
+    # the workers share the resource tracker of the parent process, which unlinks the memory, so they must not
+    # unregister it
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name, track=False)
+    return shared_memory.SharedMemory(name)
+
+
+def split_frames(reader, frames, size, exact=False):
+    """Splits frames into parts of consecutive image groups in the order in which they are stored in the file
+
+    Args:
+        reader: the ND2Reader
+        frames: the (t, v, z, c) coordinates of the frames
+        size: the number of frames per part
+        exact: whether the parts have exactly size frames, otherwise the frames of an image group stay together (and
+            a part may have more frames)
+
+    Returns:
+        list: the parts, lists of positions in frames
+
+    """
+    parser = reader.parser
+    numbers = [parser._calculate_image_group_number(t, v, z) for t, v, z, c in frames]
+    locations = [parser._label_map.get_image_data_location(number) for number in numbers]
+    order = sorted(range(len(frames)), key=lambda i: locations[i])
+
+    parts = []
+    for position, i in enumerate(order):
+        full = len(parts) > 0 and len(parts[-1]) >= size
+        if not parts or (full and (exact or numbers[i] != numbers[order[position - 1]])):
+            parts.append([])
+        parts[-1].append(i)
+    return parts
+
+
+def _decode_frames(name, shape, frames):
+    """Decodes frames into a shared memory block, in a worker process
+
+    Args:
+        name: the name of the shared memory block
+        shape: the shape of the array in the block
+        frames: the position in the array and the (t, v, z, c) coordinates of every frame
+
+    """
+    memory = _attach(name)
+    try:
+        array = np.ndarray(shape, dtype=np.uint16, buffer=memory.buf)
+        decode_into(_worker_reader, frames, array)
+        del array
+    finally:
+        memory.close()
+
+
+def decode_into(reader, frames, out):
+    """Decodes frames into an array, reading their image groups in the order in which they are stored in the file
+
+    Args:
+        reader: the ND2Reader
+        frames: the position in out and the (t, v, z, c) coordinates of every frame
+        out: the uint16 array with shape (N, height, width) to decode the frames into
+
+    """
+    reader._ensure_open()
+    parser = reader.parser
+    height, width = out.shape[1:]
+
+    groups = {}
+    for i, t, v, z, c in frames:
+        groups.setdefault(parser._calculate_image_group_number(t, v, z), []).append((i, c))
+    image_group_numbers = list(groups)
+
+    for position, image_group_data in parser._read_image_groups(image_group_numbers):
+        for i, c in groups[image_group_numbers[position]]:
+            parser._decode_image(image_group_data, c, height, width, out=out[i])
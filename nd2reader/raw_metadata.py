@@ -1,5 +1,4 @@
 import re
-import xmltodict
 import six
 import numpy as np
 import warnings
@@ -7,6 +6,14 @@ import warnings
 from nd2reader.common import read_chunk, read_array, read_metadata, parse_date, get_from_dict_if_exists
 from nd2reader.common_raw_metadata import parse_dimension_text_line, parse_if_not_none, parse_roi_shape, parse_roi_type, get_loops_from_data, determine_sampling_interval
 
+EVENT_DTYPE = np.dtype([('index', np.int64), ('time', np.float64), ('type', np.int64)])
+XML_BLOCKS = ('lut_data', 'grabber_settings', 'custom_data', 'app_info')
+ROI_DTYPE = np.dtype([('roi', np.int64), ('timepoint', np.float64), ('position', np.float64, (3,)),
+                      ('size', np.float64, (3,))])
+# the axes of the experiment loop types (uiLoopType): time loops (1, 8, 9), XY position loops (2, 3) and z stack loops
+# (4, 10)
+LOOP_TYPE_AXES = {1: 't', 8: 't', 9: 't', 2: 'v', 3: 'v', 4: 'z', 10: 'z'}
+
 
 class RawMetadata(object):
     """RawMetadata class parses and stores the raw metadata that is read from the binary file in dict format.
@@ -16,6 +23,9 @@ class RawMetadata(object):
         self._fh = fh
         self._label_map = label_map
         self._metadata_parsed = None
+        self._metadata_blocks = {}
+        self._xml_raw = {}
+        self._xml_parsed = {}
 
     @property
     def __dict__(self):
@@ -33,11 +43,30 @@ class RawMetadata(object):
             dict: the parsed metadata
         """
 
+        if self._metadata_parsed is not None:
+            return self._metadata_parsed
+
+        self._metadata_parsed = self.get_summary_metadata()
+
+        self._parse_roi_metadata()
+        self._parse_experiment_metadata()
+        self._parse_events()
+
+        return self._metadata_parsed
+
+    def get_summary_metadata(self):
+        """Returns the part of the metadata that describes the dimensions of the file: the image size, date, fields
+        of view, frames, z levels, channels and pixel size. Only the image attributes, text info, calibration and
+        channel metadata blocks are read, which makes this a lot faster than parsing all metadata.
+
+        Returns:
+            dict: the summary metadata
+        """
         if self._metadata_parsed is not None:
             return self._metadata_parsed
 
         frames_per_channel = self._parse_total_images_per_channel()
-        self._metadata_parsed = {
+        metadata = {
             "height": parse_if_not_none(self.image_attributes, self._parse_height),
             "width": parse_if_not_none(self.image_attributes, self._parse_width),
             "date": parse_if_not_none(self.image_text_info, self._parse_date),
@@ -50,23 +79,20 @@ class RawMetadata(object):
             "pixel_microns": parse_if_not_none(self.image_calibration, self._parse_calibration)
         }
 
-        self._set_default_if_not_empty('fields_of_view')
-        self._set_default_if_not_empty('frames')
-        self._metadata_parsed['num_frames'] = len(self._metadata_parsed['frames'])
-
-        self._parse_roi_metadata()
-        self._parse_experiment_metadata()
-        self._parse_events()
+        self._set_default_if_not_empty(metadata, 'fields_of_view')
+        self._set_default_if_not_empty(metadata, 'frames')
+        metadata['num_frames'] = len(metadata['frames'])
 
-        return self._metadata_parsed
+        return metadata
 
-    def _set_default_if_not_empty(self, entry):
-        total_images = self._metadata_parsed['total_images_per_channel'] \
-            if self._metadata_parsed['total_images_per_channel'] is not None else 0
+    @staticmethod
+    def _set_default_if_not_empty(metadata, entry):
+        total_images = metadata['total_images_per_channel'] \
+            if metadata['total_images_per_channel'] is not None else 0
 
-        if len(self._metadata_parsed[entry]) == 0 and total_images > 0:
+        if len(metadata[entry]) == 0 and total_images > 0:
             # if the file is not empty, we always have one of this entry
-            self._metadata_parsed[entry] = [0]
+            metadata[entry] = [0]
 
     def _parse_width_or_height(self, key):
         try:
@@ -260,95 +286,141 @@ class RawMetadata(object):
             return
 
         number_of_rois = raw_roi_data[six.b('m_vectGlobal_Size')]
+        raw_rois = [raw_roi_data[six.b('m_vectGlobal_%d' % i)] for i in range(number_of_rois)]
+
+        roi_table = self._parse_roi_table(raw_rois)
+        bounds = np.searchsorted(roi_table['roi'], np.arange(number_of_rois + 1))
 
         roi_objects = []
-        for i in range(number_of_rois):
-            current_roi = raw_roi_data[six.b('m_vectGlobal_%d' % i)]
-            roi_objects.append(self._parse_roi(current_roi))
+        for i, current_roi in enumerate(raw_rois):
+            roi_objects.append(self._parse_roi(current_roi, roi_table[bounds[i]:bounds[i + 1]]))
 
         self._metadata_parsed['rois'] = roi_objects
+        self._metadata_parsed['roi_table'] = roi_table
 
-    def _parse_roi(self, raw_roi_dict):
-        """Extract the vector animation parameters from the ROI.
-
-        This includes the position and size at the given timepoints.
+    def _parse_roi(self, raw_roi_dict, roi_rows):
+        """Extract the shape and type of the ROI and combine them with its vector animation parameters.
 
         Args:
             raw_roi_dict: dictionary of raw roi metadata
+            roi_rows: the rows of the ROI table that belong to this ROI
 
         Returns:
             dict: the parsed ROI metadata
 
         """
-        number_of_timepoints = raw_roi_dict[six.b('m_vectAnimParams_Size')]
-
-        roi_dict = {
-            "timepoints": [],
-            "positions": [],
-            "sizes": [],
+        return {
+            "timepoints": roi_rows['timepoint'],
+            "positions": roi_rows['position'],
+            "sizes": roi_rows['size'],
             "shape": parse_roi_shape(raw_roi_dict[six.b('m_sInfo')][six.b('m_uiShapeType')]),
             "type": parse_roi_type(raw_roi_dict[six.b('m_sInfo')][six.b('m_uiInterpType')])
         }
-        for i in range(number_of_timepoints):
-            roi_dict = self._parse_vect_anim(roi_dict, raw_roi_dict[six.b('m_vectAnimParams_%d' % i)])
-
-        # convert to NumPy arrays
-        roi_dict["timepoints"] = np.array(roi_dict["timepoints"], dtype=np.float64)
-        roi_dict["positions"] = np.array(roi_dict["positions"], dtype=np.float64)
-        roi_dict["sizes"] = np.array(roi_dict["sizes"], dtype=np.float64)
 
-        return roi_dict
+    def _parse_roi_table(self, raw_rois):
+        """Extract the vector animation parameters of all ROIs at once.
 
-    def _parse_vect_anim(self, roi_dict, animation_dict):
-        """
-        Parses a ROI vector animation object and adds it to the global list of timepoints and positions.
+        This includes the position and size at the given timepoints.
 
         Args:
-            roi_dict: the raw roi dictionary
-            animation_dict: the raw animation dictionary
+            raw_rois: list of dictionaries of raw roi metadata
 
         Returns:
-            dict: the parsed metadata
+            np.ndarray: structured array with one row per ROI and timepoint, sorted by ROI
 
         """
-        roi_dict["timepoints"].append(animation_dict[six.b('m_dTimeMs')])
+        animation_keys = [six.b(key) for key in ('m_dTimeMs', 'm_dCenterX', 'm_dCenterY', 'm_dCenterZ')]
+        size_keys = [six.b(key) for key in ('m_dSizeX', 'm_dSizeY', 'm_dSizeZ')]
+        box_shape_key = six.b('m_sBoxShape')
 
-        image_width = self._metadata_parsed["width"] * self._metadata_parsed["pixel_microns"]
-        image_height = self._metadata_parsed["height"] * self._metadata_parsed["pixel_microns"]
+        roi_numbers = []
+        values = []
+        for roi_number, raw_roi_dict in enumerate(raw_rois):
+            number_of_timepoints = raw_roi_dict[six.b('m_vectAnimParams_Size')]
+            for i in range(number_of_timepoints):
+                animation_dict = raw_roi_dict[six.b('m_vectAnimParams_%d' % i)]
+                size_dict = animation_dict[box_shape_key]
+                roi_numbers.append(roi_number)
+                values.append([animation_dict[key] for key in animation_keys] + [size_dict[key] for key in size_keys])
 
-        # positions are taken from the center of the image as a fraction of the half width/height of the image
-        position = np.array((0.5 * image_width * (1 + animation_dict[six.b('m_dCenterX')]),
-                             0.5 * image_height * (1 + animation_dict[six.b('m_dCenterY')]),
-                             animation_dict[six.b('m_dCenterZ')]))
-        roi_dict["positions"].append(position)
+        values = np.array(values, dtype=np.float64).reshape(-1, 7)
+
+        roi_table = np.zeros(len(roi_numbers), dtype=ROI_DTYPE)
+        roi_table['roi'] = roi_numbers
+        roi_table['timepoint'] = values[:, 0]
+
+        image_size = np.array([self._metadata_parsed["width"], self._metadata_parsed["height"]]) * \
+            self._metadata_parsed["pixel_microns"]
 
-        size_dict = animation_dict[six.b('m_sBoxShape')]
+        # positions are taken from the center of the image as a fraction of the half width/height of the image
+        roi_table['position'][:, :2] = 0.5 * image_size * (1 + values[:, 1:3])
+        roi_table['position'][:, 2] = values[:, 3]
 
         # sizes are fractions of the half width/height of the image
-        roi_dict["sizes"].append((size_dict[six.b('m_dSizeX')] * 0.25 * image_width,
-                                  size_dict[six.b('m_dSizeY')] * 0.25 * image_height,
-                                  size_dict[six.b('m_dSizeZ')]))
-        return roi_dict
+        roi_table['size'][:, :2] = 0.25 * image_size * values[:, 4:6]
+        roi_table['size'][:, 2] = values[:, 6]
+
+        return roi_table
 
     def _parse_experiment_metadata(self):
         """Parse the metadata of the ND experiment
 
         """
-        self._metadata_parsed['experiment'] = {
+        self._metadata_parsed['experiment'] = self.get_experiment_metadata()
+
+    def get_experiment_metadata(self):
+        """Returns the description and the loops of the ND experiment.
+
+        Returns:
+            dict: the experiment metadata
+
+        """
+        experiment = {
             'description': 'unknown',
             'loops': []
         }
 
         if self.image_metadata is None or six.b('SLxExperiment') not in self.image_metadata:
-            return
+            return experiment
 
         raw_data = self.image_metadata[six.b('SLxExperiment')]
 
         if six.b('wsApplicationDesc') in raw_data:
-            self._metadata_parsed['experiment']['description'] = raw_data[six.b('wsApplicationDesc')].decode('utf8')
+            experiment['description'] = raw_data[six.b('wsApplicationDesc')].decode('utf8')
 
         if six.b('uLoopPars') in raw_data:
-            self._metadata_parsed['experiment']['loops'] = self._parse_loop_data(raw_data[six.b('uLoopPars')])
+            experiment['loops'] = self._parse_loop_data(raw_data[six.b('uLoopPars')])
+
+        return experiment
+
+    def get_loop_order(self):
+        """Determines the nesting of the experiment loops, which determines the order of the image groups in the file.
+
+        Returns:
+            list: the axes ('t', 'v' and 'z') from the outermost to the innermost loop, axes without a loop are
+                appended in the default order. If a loop has an unknown type, the default order is returned.
+
+        """
+        order = []
+        level = None
+        if isinstance(self.image_metadata, dict):
+            level = self.image_metadata.get(six.b('SLxExperiment'))
+
+        while isinstance(level, dict):
+            axis = LOOP_TYPE_AXES.get(level.get(six.b('uiLoopType')))
+            if axis is None:
+                # the position of the axes in the file is unknown
+                return ['t', 'v', 'z']
+            if axis not in order:
+                order.append(axis)
+
+            next_level = level.get(six.b('ppNextLevelEx'))
+            next_level = next_level.get(six.b('')) if isinstance(next_level, dict) else None
+            if isinstance(next_level, list):
+                next_level = next_level[0] if len(next_level) > 0 else None
+            level = next_level
+
+        return order + [axis for axis in ('t', 'v', 'z') if axis not in order]
 
     def _parse_loop_data(self, loop_data):
         """Parse the experimental loop data
@@ -444,6 +516,7 @@ class RawMetadata(object):
         }
 
         self._metadata_parsed['events'] = []
+        self._metadata_parsed['event_table'] = np.zeros(0, dtype=EVENT_DTYPE)
 
         events = read_metadata(read_chunk(self._fh, self._label_map.image_events), 1)
 
@@ -455,14 +528,25 @@ class RawMetadata(object):
         if len(events) == 0:
             return
 
-        for event in events[six.b('')]:
+        events = events[six.b('')]
+        if isinstance(events, dict):
+            # a single event is not stored as a list
+            events = [events]
+
+        index_key, time_key, type_key = six.b('I'), six.b('T'), six.b('M')
+        event_table = np.array([(event[index_key], event[time_key], event[type_key]) for event in events],
+                               dtype=EVENT_DTYPE)
+        self._metadata_parsed['event_table'] = event_table
+
+        for index, time, event_type in zip(event_table['index'].tolist(), event_table['time'].tolist(),
+                                           event_table['type'].tolist()):
             event_info = {
-                'index': event[six.b('I')],
-                'time': event[six.b('T')],
-                'type': event[six.b('M')],
+                'index': index,
+                'time': time,
+                'type': event_type,
             }
-            if event_info['type'] in event_names.keys():
-                event_info['name'] = event_names[event_info['type']]
+            if event_type in event_names:
+                event_info['name'] = event_names[event_type]
 
             self._metadata_parsed['events'].append(event_info)
 
@@ -474,7 +558,7 @@ class RawMetadata(object):
             dict: containing the textual image info
 
         """
-        return read_metadata(read_chunk(self._fh, self._label_map.image_text_info), 1)
+        return self._read_metadata_block('image_text_info')
 
     @property
     def image_metadata_sequence(self):
@@ -484,7 +568,7 @@ class RawMetadata(object):
             dict: containing the metadata
 
         """
-        return read_metadata(read_chunk(self._fh, self._label_map.image_metadata_sequence), 1)
+        return self._read_metadata_block('image_metadata_sequence')
 
     @property
     def image_calibration(self):
@@ -493,7 +577,7 @@ class RawMetadata(object):
         Returns:
             dict: pixels per micron
         """
-        return read_metadata(read_chunk(self._fh, self._label_map.image_calibration), 1)
+        return self._read_metadata_block('image_calibration')
 
     @property
     def image_attributes(self):
@@ -502,7 +586,7 @@ class RawMetadata(object):
         Returns:
             dict: containing the image attributes
         """
-        return read_metadata(read_chunk(self._fh, self._label_map.image_attributes), 1)
+        return self._read_metadata_block('image_attributes')
 
     @property
     def x_data(self):
@@ -543,7 +627,7 @@ class RawMetadata(object):
         Returns:
             dict: ROI metadata dictionary
         """
-        return read_metadata(read_chunk(self._fh, self._label_map.roi_metadata), 1)
+        return self._read_metadata_block('roi_metadata')
 
     @property
     def pfs_status(self):
@@ -575,6 +659,47 @@ class RawMetadata(object):
         """
         return read_array(self._fh, 'double', self._label_map.camera_exposure_time)
 
+    def _read_metadata_block(self, name):
+        """Reads and parses a metadata block, every block is only read once.
+
+        Args:
+            name: the name of the block in the label map
+
+        Returns:
+            dict: the parsed metadata block
+
+        """
+        if name not in self._metadata_blocks:
+            self._metadata_blocks[name] = read_metadata(read_chunk(self._fh, getattr(self._label_map, name)), 1)
+        return self._metadata_blocks[name]
+
+    def get_xml_data(self, name, parse=True):
+        """Get one of the XML blocks. The block is read and parsed on first access only.
+
+        Args:
+            name: the name of the block, one of 'lut_data', 'grabber_settings', 'custom_data' or 'app_info'
+            parse: if False, return the raw XML bytes instead of the parsed dictionary
+
+        Returns:
+            dict: the parsed XML data (bytes if parse is False), None if the block is not in the file
+
+        """
+        if name not in XML_BLOCKS:
+            raise ValueError("Unknown XML block '%s', expected one of %s." % (name, ", ".join(XML_BLOCKS)))
+
+        if name not in self._xml_raw:
+            self._xml_raw[name] = read_chunk(self._fh, getattr(self._label_map, name))
+
+        raw_data = self._xml_raw[name]
+        if not parse or raw_data is None:
+            return raw_data
+
+        if name not in self._xml_parsed:
+            import xmltodict
+            self._xml_parsed[name] = xmltodict.parse(raw_data)
+
+        return self._xml_parsed[name]
+
     @property
     def lut_data(self):
         """LUT information
@@ -583,7 +708,7 @@ class RawMetadata(object):
             dict: LUT information
 
         """
-        return xmltodict.parse(read_chunk(self._fh, self._label_map.lut_data))
+        return self.get_xml_data('lut_data')
 
     @property
     def grabber_settings(self):
@@ -593,7 +718,7 @@ class RawMetadata(object):
             dict: Acquisition settings
 
         """
-        return xmltodict.parse(read_chunk(self._fh, self._label_map.grabber_settings))
+        return self.get_xml_data('grabber_settings')
 
     @property
     def custom_data(self):
@@ -603,7 +728,7 @@ class RawMetadata(object):
             dict: custom user data
 
         """
-        return xmltodict.parse(read_chunk(self._fh, self._label_map.custom_data))
+        return self.get_xml_data('custom_data')
 
     @property
     def app_info(self):
@@ -613,7 +738,7 @@ class RawMetadata(object):
             dict: (Version) information of the NIS Elements application
 
         """
-        return xmltodict.parse(read_chunk(self._fh, self._label_map.app_info))
+        return self.get_xml_data('app_info')
 
     @property
     def camera_temp(self):
@@ -650,7 +775,7 @@ class RawMetadata(object):
 
         """
         if self._label_map.image_metadata:
-            return read_metadata(read_chunk(self._fh, self._label_map.image_metadata), 1)
+            return self._read_metadata_block('image_metadata')
 
     @property
     def image_events(self):
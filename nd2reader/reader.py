@@ -1,8 +1,14 @@
+import itertools
+import os
+from functools import partial
+
 from pims import Frame
 from pims.base_frames import FramesSequenceND
 
+from nd2reader import registry
 from nd2reader.exceptions import EmptyFileError, InvalidFileType
 from nd2reader.parser import Parser
+from nd2reader.sources import BUFFER_TYPES, BufferSource, ByteSource, HTTPSource, SourceFile
 import numpy as np
 
 
@@ -14,15 +20,43 @@ class ND2Reader(FramesSequenceND):
     _fh = None
     class_priority = 12
 
-    def __init__(self, fh):
+    # the default memory limit of the reorder buffer of iter_disk_order
+    MAX_REORDER_BUFFER = 1 << 28
+    # the default memory budget of a block of iter_blocks
+    BLOCK_MEMORY_BUDGET = 1 << 26
+
+    def __init__(self, fh, index=None, handle_pool=None):
         """
         Arguments:
             fh {str} -- absolute path to .nd2 file
             fh {IO} -- input buffer handler (opened with "rb" mode)
+            fh {str} -- URL (http:// or https://) of a .nd2 file, which is read with range requests (see
+                nd2reader.sources.HTTPSource)
+            fh {ByteSource} -- byte source of a .nd2 file (see nd2reader.sources)
+            fh {bytes} -- the contents of the .nd2 file (bytes, bytearray, memoryview or io.BytesIO), frames are read as
+                views of this buffer without copying them, so they are read-only unless the buffer is writable (see
+                nd2reader.sources.BufferSource). An io.BytesIO cannot be resized while the reader is open or frames
+                that view its data are alive.
+            index {ParserIndex} -- prebuilt index of the same file (see ND2Reader.index), skips parsing the metadata.
+                If fh is a path, the file is only opened when it is first read.
+            handle_pool {HandlePool} -- pool that limits the number of open file handles (see nd2reader.handles), only
+                if fh is a path
         """
         super(ND2Reader, self).__init__()
 
         self.filename = ""
+        self._path = None
+        self._pid = os.getpid()
+        self._handle_pool = handle_pool
+        self._closed = False
+        registry_key = None
+
+        # whether pickling the reader includes the parsed index, so that it is not parsed again after unpickling
+        self.pickle_index = True
+
+        if isinstance(fh, str) and fh.startswith(("http://", "https://")):
+            self.filename = fh
+            fh = HTTPSource(fh)
 
         if isinstance(fh, str):
             if not fh.endswith(".nd2"):
@@ -31,11 +65,26 @@ class ND2Reader(FramesSequenceND):
                     + " does not have extension .nd2."
                 )
             self.filename = fh
-            fh = open(fh, "rb")
+            self._path = os.path.abspath(fh)
+
+            if index is None and registry.is_enabled():
+                registry_key = registry.file_key(self._path)
+                index = registry.get_index(registry_key)
+
+            fh = self._open_file() if index is None else None
+        elif handle_pool is not None:
+            raise ValueError("A handle pool can only be used with an ND2Reader that was opened from a path.")
+        elif isinstance(fh, BUFFER_TYPES):
+            fh = SourceFile(BufferSource(fh))
+        elif isinstance(fh, ByteSource):
+            fh = SourceFile(fh)
 
         self._fh = fh
 
-        self._parser = Parser(self._fh)
+        self._parser = Parser(self._fh, index=index)
+
+        if registry_key is not None:
+            registry.register_index(registry_key, self._parser.index)
 
         # Setup metadata
         self.metadata = self._parser.metadata
@@ -48,6 +97,8 @@ class ND2Reader(FramesSequenceND):
 
         # Other properties
         self._timesteps = None
+        self._time_index = None
+        self._event_index = None
 
     @classmethod
     def class_exts(cls):
@@ -57,19 +108,101 @@ class ND2Reader(FramesSequenceND):
         return {"nd2"} | super(ND2Reader, cls).class_exts()
 
     def close(self):
-        """Correctly close the file handle
+        """Correctly close the file handle. Reading from the reader afterwards raises a ValueError.
+
+        """
+        self._closed = True
+        if self._fh is not None:
+            self._fh.close()
+
+    def __reduce__(self):
+        """Readers are pickled as their path, their axes settings and (optionally) their parsed index. The file is
+        reopened lazily in the process that unpickles the reader. The handle pool is not pickled.
+
+        """
+        if self._path is None:
+            raise TypeError("Only an ND2Reader that was opened from a path can be pickled.")
+
+        index = self._parser.index if self.pickle_index else None
+        return _unpickle_reader, (self.__class__, self._path, index, self._get_axes_settings(), self.pickle_index)
+
+    def clone(self):
+        """Creates a new reader for the same file that has its own file handle and axes settings, but shares the
+        parsed index (label map, image group offsets and metadata) with this reader. Use one clone per thread to read
+        from multiple threads.
+
+        Returns:
+            ND2Reader: the new reader
+
+        """
+        if self._path is None:
+            raise TypeError("Only an ND2Reader that was opened from a path can be cloned.")
+
+        clone = self.__class__(self._path, index=self._parser.index, handle_pool=self._handle_pool)
+        clone.filename = self.filename
+        clone.pickle_index = self.pickle_index
+        clone._timesteps = self._timesteps
+        clone._time_index = self._time_index
+        clone._event_index = self._event_index
+        clone._set_axes_settings(self._get_axes_settings())
+        clone._ensure_open()
+
+        return clone
+
+    def _get_axes_settings(self):
+        return self.iter_axes, self.bundle_axes, dict(self.default_coords)
+
+    def _set_axes_settings(self, settings):
+        iter_axes, bundle_axes, default_coords = settings
+        self.bundle_axes = bundle_axes
+        self.iter_axes = iter_axes
+        self.default_coords.update(default_coords)
+
+    def _ensure_open(self):
+        """Opens the file if it has not been opened yet in this process. A reader that is used after a fork (or
+        unpickled in another process) gets its own file handle, so it does not share the seek position with the
+        parent process. A reader that was closed is not reopened.
 
         """
+        if self._closed:
+            raise ValueError("I/O operation on closed reader")
+
+        if self._path is None:
+            return
+
+        if self._fh is not None and self._pid == os.getpid():
+            return
+
         if self._fh is not None:
+            # the handle was inherited from the parent process, closing it does not affect the parent
             self._fh.close()
 
+        self._fh = self._open_file()
+        self._pid = os.getpid()
+        self._parser._set_file_handle(self._fh)
+
+    def _open_file(self):
+        if self._handle_pool is not None:
+            return self._handle_pool.open(self._path)
+        return open(self._path, "rb")
+
+    @property
+    def index(self):
+        """The parsed index of the file, which can be passed to a new ND2Reader to skip parsing the metadata
+
+        Returns:
+            ParserIndex: the index
+
+        """
+        return self._parser.index
+
     def _get_default(self, coord):
         try:
             return self.default_coords[coord]
         except KeyError:
             return 0
 
-    def get_frame_2D(self, c=0, t=0, z=0, x=0, y=0, v=0):
+    def get_frame_2D(self, c=0, t=0, z=0, x=0, y=0, v=0, out=None):
         """Gets a given frame using the parser
         Args:
             x: The x-index (pims expects this)
@@ -78,15 +211,82 @@ class ND2Reader(FramesSequenceND):
             t: The frame number
             z: The z stack number
             v: The field of view index
+            out: an array of shape (height, width) to decode the frame into, e.g. a preallocated array, a np.memmap
+                or an array backed by shared memory
         Returns:
-            pims.Frame: The requested frame
+            pims.Frame: The requested frame, or out itself if it was given
         """
         # This needs to be set to width/height to return an image
         x = self.metadata["width"]
         y = self.metadata["height"]
 
+        self._ensure_open()
+        if out is not None:
+            return self._parser.get_image_data(t, v, c, z, y, x, out=out)
         return self._parser.get_image_by_attributes(t, v, c, z, y, x)
 
+    def _get_bundled_frame(self, axes, c=0, t=0, z=0, x=0, y=0, v=0):
+        """Reads the frames of the bundled 'c' and/or 'z' axes into one preallocated array. Each image group is read
+        once, including all of its channels, and z stacks are read with a single read.
+
+        Args:
+            axes: the bundled axes ('cyx', 'zyx' or 'czyx')
+            c: The color channel number (if 'c' is not bundled)
+            t: The frame number
+            z: The z stack number (if 'z' is not bundled)
+            v: The field of view index
+
+        Returns:
+            pims.Frame: the frames, with the given axes
+
+        """
+        height = self.metadata["height"]
+        width = self.metadata["width"]
+        result = np.empty([self.sizes[axis] for axis in axes], dtype=self._dtype)
+
+        self._ensure_open()
+        if "z" in axes:
+            self._parser.get_volume_data(t, v, None if "c" in axes else c, height, width, out=result)
+        else:
+            self._parser.get_image_group_data(t, v, z, height, width, out=result)
+
+        return Frame(result, frame_no=t, metadata=dict(self.metadata))
+
+    def get_volume(self, t=0, v=0, c=None, out=None):
+        """Gets the z stack at the given time point and field of view. The image groups of a z stack are usually
+        stored next to each other in the file, so the whole stack is read at once.
+
+        Args:
+            t: The frame number
+            v: The field of view index
+            c: The color channel number, or None for all channels
+            out: an array to decode the stack into, see the returned shape
+
+        Returns:
+            np.ndarray: the z stack (out, if it was given), with shape (z, height, width) for a single channel or
+                (channels, z, height, width) for all channels
+
+        """
+        self._ensure_open()
+        return self._parser.get_volume_data(t, v, c, self.metadata["height"], self.metadata["width"], out=out)
+
+    def get_image_group(self, t=0, v=0, z=0, out=None):
+        """Gets the frames of all channels at the given coordinates, which are stored together in the file and read
+        at once
+
+        Args:
+            t: The frame number
+            v: The field of view index
+            z: The z stack number
+            out: an array of shape (channels, height, width) to decode the frames into
+
+        Returns:
+            np.ndarray: the frames, with shape (channels, height, width) (out, if it was given)
+
+        """
+        self._ensure_open()
+        return self._parser.get_image_group_data(t, v, z, self.metadata["height"], self.metadata["width"], out=out)
+
     @property
     def parser(self):
         """
@@ -94,6 +294,7 @@ class ND2Reader(FramesSequenceND):
         Returns:
             Parser: the parser object
         """
+        self._ensure_open()
         return self._parser
 
     @property
@@ -150,6 +351,339 @@ class ND2Reader(FramesSequenceND):
 
         return self.metadata["num_frames"] / (total_duration / 1000.0)
 
+    def iter_disk_order(self, axes=None, ordered=False, max_buffer_bytes=None, **coords):
+        """Iterates over frames in the order in which they are stored in the file, so that the file is read
+        (mostly) sequentially, whichever axis order is requested.
+
+        Args:
+            axes: the axes to iterate over, any of 't', 'v', 'z' and 'c' (default: all axes of the file). The other
+                axes are fixed at their default coordinate (see default_coords).
+            ordered: yield the frames in the logical order of axes (the first axis changes slowest) instead of the
+                order on disk. Frames that are read before they are due are kept in a reorder buffer.
+            max_buffer_bytes: the memory limit of the reorder buffer (default: MAX_REORDER_BUFFER), when it is full the
+                next frame in logical order is read directly
+            **coords: restricts an axis to one coordinate or a list of coordinates, e.g. v=1 or t=range(0, 100, 10)
+
+        Yields:
+            tuple: the coordinates of the frame as dict and the frame (pims.Frame)
+
+        """
+        frames = self._select_frames(axes, **coords)
+        for i, frame in self._iter_frames(frames, ordered, max_buffer_bytes):
+            yield self._get_frame_coordinates(frames[i]), frame
+
+    def iter_frames(self, frames, ordered=False, max_buffer_bytes=None):
+        """Reads frames given by their coordinates in the order in which they are stored in the file, e.g. the frames
+        of a shard (see shard and iter_disk_order)
+
+        Args:
+            frames: the coordinates of the frames as dicts, axes that are missing are at their default coordinate
+            ordered: yield the frames in the order of frames instead of the order on disk
+            max_buffer_bytes: the memory limit of the reorder buffer (default: MAX_REORDER_BUFFER)
+
+        Yields:
+            tuple: the coordinates of the frame as dict and the frame (pims.Frame)
+
+        """
+        frames = [tuple(int(coords.get(axis, self._get_default(axis))) for axis in "tvzc") for coords in frames]
+        for i, frame in self._iter_frames(frames, ordered, max_buffer_bytes):
+            yield self._get_frame_coordinates(frames[i]), frame
+
+    def shard(self, rank, world_size, axes=None, **coords):
+        """Splits the frames into world_size disjoint shards and returns one of them. Every shard is a contiguous part
+        of the file with about the same number of bytes, so that the nodes of a cluster job each read their own part
+        of the file sequentially. The frames of an image group are always in the same shard.
+
+        Args:
+            rank: the number of the shard, from 0 to world_size - 1
+            world_size: the number of shards
+            axes: the axes to split (default: all axes of the file), see iter_disk_order
+            **coords: restricts an axis to one coordinate or a list of coordinates, see iter_disk_order
+
+        Returns:
+            list: the coordinates of the frames of the shard as dicts, in the order in which they are stored in the
+                file (read them with iter_frames)
+
+        """
+        self._ensure_open()
+        groups = self._get_image_group_extents(self._select_frames(axes, **coords))
+        start, stop = _get_shard_range([length for location, length, frames in groups], rank, world_size)
+
+        return [self._get_frame_coordinates(frame) for location, length, frames in groups[start:stop]
+                for frame in frames]
+
+    def _get_image_group_extents(self, frames):
+        """Groups frames by their image group, in the order in which the image groups are stored in the file
+
+        Args:
+            frames: the (t, v, z, c) coordinates of the frames
+
+        Returns:
+            list: the location and the length of the image data of every image group, and its frames
+
+        """
+        numbers, locations, lengths = self._parser._label_map.get_image_data_chunks()
+        lengths = dict(zip(numbers.tolist(), lengths.tolist()))
+
+        groups = {}
+        for frame in frames:
+            groups.setdefault(self._parser._calculate_image_group_number(*frame[:3]), []).append(frame)
+
+        return sorted([(self._parser._label_map.get_image_data_location(number), lengths[number], group_frames)
+                       for number, group_frames in groups.items()], key=lambda group: group[0])
+
+    def _select_frames(self, axes=None, **coords):
+        """Lists the frames of a selection of axes and coordinates, see iter_disk_order
+
+        Returns:
+            list: the (t, v, z, c) coordinates of the frames, in the logical order of axes
+
+        """
+        axes = [axis for axis in "tvzc" if axis in self.sizes] if axes is None else list(axes)
+        for axis in axes + list(coords):
+            if axis not in "tvzc":
+                raise ValueError("Can only iterate over the axes 't', 'v', 'z' and 'c', not '%s'." % axis)
+
+        values = {}
+        for axis in "tvzc":
+            value = coords.get(axis, range(self.sizes.get(axis, 1)) if axis in axes else self._get_default(axis))
+            values[axis] = [int(v) for v in value] if np.iterable(value) else [int(value)]
+
+        # the frames in logical order, which determines the order of the channels within an image group
+        order = ["tvzc".index(axis) for axis in axes] + [i for i in range(4) if "tvzc"[i] not in axes]
+        frames = []
+        for product in itertools.product(*[values["tvzc"[i]] for i in order]):
+            coordinate = dict(zip(["tvzc"[i] for i in order], product))
+            frames.append(tuple(coordinate[axis] for axis in "tvzc"))
+
+        return frames
+
+    def _iter_frames(self, frames, ordered=False, max_buffer_bytes=None):
+        """Reads frames in the order in which they are stored in the file, see iter_disk_order
+
+        Args:
+            frames: the (t, v, z, c) coordinates of the frames
+            ordered: yield the frames in the order of frames instead of the order on disk
+            max_buffer_bytes: the memory limit of the reorder buffer (default: MAX_REORDER_BUFFER)
+
+        Yields:
+            tuple: the position of the frame in frames and the frame (pims.Frame)
+
+        """
+        self._ensure_open()
+        image_group_numbers = [self._parser._calculate_image_group_number(t, v, z) for t, v, z, c in frames]
+        groups = {}
+        for i, number in enumerate(image_group_numbers):
+            groups.setdefault(number, []).append(i)
+        unique_numbers = list(groups)
+
+        disk_order = self._read_frames_in_disk_order(frames, groups, unique_numbers)
+        if not ordered:
+            for i, frame in disk_order:
+                yield i, frame
+            return
+
+        max_buffer_bytes = self.MAX_REORDER_BUFFER if max_buffer_bytes is None else max_buffer_bytes
+        buffer = {}
+        buffer_bytes = 0
+        next_frame = 0
+        for i, frame in disk_order:
+            if i < next_frame:
+                # already read directly because the buffer was full
+                continue
+            buffer[i] = frame
+            buffer_bytes += frame.nbytes
+
+            while next_frame < len(frames) and (next_frame in buffer or buffer_bytes > max_buffer_bytes):
+                if next_frame in buffer:
+                    frame = buffer.pop(next_frame)
+                    buffer_bytes -= frame.nbytes
+                else:
+                    t, v, z, c = frames[next_frame]
+                    frame = self.get_frame_2D(c=c, t=t, z=z, v=v)
+                yield next_frame, frame
+                next_frame += 1
+
+    def iter_blocks(self, axis="t", block_size=None, memory_budget=None, **fixed_coords):
+        """Iterates over blocks of consecutive frames along an axis, which are decoded into one reused array. This
+        avoids the per-frame overhead of iterating over the reader, and allows to vectorize the analysis along the axis.
+
+        Args:
+            axis: the axis to iterate over ('t', 'v' or 'z')
+            block_size: the number of frames per block (default: as many as fit in the memory budget)
+            memory_budget: the maximum size of a block in bytes (default: BLOCK_MEMORY_BUDGET if block_size is not
+                given, otherwise unlimited). If both are given, block_size is reduced to fit the budget.
+            **fixed_coords: the coordinates of the other axes (default: default_coords). If 'c' is given, the blocks
+                contain only that channel, otherwise all channels.
+
+        Yields:
+            np.ndarray: a block of raw (uint16) frames with shape (N, y, x) for a single channel or (N, c, y, x) for
+                all channels. The last block may be shorter. The array is overwritten by the next block, copy it to
+                keep it.
+
+        """
+        if axis not in ("t", "v", "z"):
+            raise ValueError("Can only iterate over blocks along the axes 't', 'v' and 'z', not '%s'." % axis)
+
+        height = self.metadata["height"]
+        width = self.metadata["width"]
+        channel = fixed_coords.get("c", None if "c" in self.sizes else 0)
+        frame_shape = (height, width) if channel is not None else (self.sizes["c"], height, width)
+
+        frame_bytes = int(np.prod(frame_shape)) * np.dtype(np.uint16).itemsize
+        length = self.sizes.get(axis, 1)
+        if block_size is None:
+            memory_budget = self.BLOCK_MEMORY_BUDGET if memory_budget is None else memory_budget
+            block_size = length
+        if memory_budget is not None:
+            block_size = min(block_size, max(memory_budget // frame_bytes, 1))
+
+        coords = {key: fixed_coords.get(key, self._get_default(key)) for key in ("t", "v", "z")}
+        buffer = np.empty((min(block_size, length),) + frame_shape, dtype=np.uint16)
+
+        self._ensure_open()
+        for start in range(0, length, block_size):
+            stop = min(start + block_size, length)
+            image_group_numbers = []
+            for position in range(start, stop):
+                coords[axis] = position
+                image_group_numbers.append(self._parser._calculate_image_group_number(coords["t"], coords["v"],
+                                                                                      coords["z"]))
+
+            for i, image_group_data in self._parser._read_image_groups(image_group_numbers):
+                if channel is None:
+                    self._parser._decode_image_group(image_group_data, height, width, out=buffer[i])
+                else:
+                    self._parser._decode_image(image_group_data, channel, height, width, out=buffer[i])
+
+            yield buffer[:stop - start]
+
+    def _read_frames_in_disk_order(self, frames, groups, unique_numbers):
+        height = self.metadata["height"]
+        width = self.metadata["width"]
+        metadata = self._parser._get_frame_metadata()
+
+        for position, image_group_data in self._parser._read_image_groups(unique_numbers):
+            # decode all frames of the image group before yielding them: reads while the generator is suspended (e.g.
+            # in _iter_frames) may reuse the buffer that image_group_data is a view of
+            images = [(i, self._parser._decode_image(image_group_data, frames[i][3], height, width))
+                      for i in groups[unique_numbers[position]]]
+            for i, image in images:
+                yield i, Frame(image, frame_no=frames[i][0], metadata=metadata)
+
+    def _get_frame_coordinates(self, frame):
+        return {axis: value for axis, value in zip("tvzc", frame) if axis in self.sizes}
+
+    def frame_table(self):
+        """Get the per-frame metadata as a table with one row per image group and channel
+
+        The columns are the coordinates ('t', 'v', 'z', 'c'), the acquisition time in milliseconds ('time'), the stage
+        position ('stage_x', 'stage_y', 'stage_z'), the perfect focus system status and offset ('pfs_status',
+        'pfs_offset'), the exposure time ('exposure_time'), the location and length of the image data in the file
+        ('offset', 'length') and whether the image is missing from the file ('gap').
+
+        Returns:
+            pandas.DataFrame: the frame table, or a dict of NumPy arrays if pandas is not installed
+
+        """
+        self._ensure_open()
+        image_groups = self._parser.get_image_group_table()
+        number_of_channels = max(len(self._get_metadata_property("channels", default=[])), 1)
+        number_of_groups = len(image_groups['t'])
+
+        table = {}
+        for key, values in image_groups.items():
+            table[key] = np.repeat(values, number_of_channels)
+            if key == 'z':
+                table['c'] = np.tile(np.arange(number_of_channels), number_of_groups)
+
+        try:
+            import pandas
+        except ImportError:
+            return table
+
+        return pandas.DataFrame(table)
+
+    def frames_between(self, t_start_ms, t_end_ms):
+        """Get the image groups acquired within a time window
+
+        Args:
+            t_start_ms: start of the window in milliseconds (inclusive)
+            t_end_ms: end of the window in milliseconds (inclusive)
+
+        Returns:
+            dict: NumPy arrays of the coordinates ('t', 'v', 'z') and the acquisition time ('time') of the image groups
+                in the window, sorted by acquisition time
+
+        """
+        times, order = self._get_time_index()
+        start = np.searchsorted(times, t_start_ms, side="left")
+        stop = np.searchsorted(times, t_end_ms, side="right")
+
+        return self._get_image_group_coordinates(order[start:stop])
+
+    def frames_around_event(self, event, before_ms, after_ms):
+        """Get the image groups acquired around an event
+
+        Args:
+            event: an event from `events`, the name of an event (all events with that name are used) or a time in
+                milliseconds
+            before_ms: the window length before the event in milliseconds
+            after_ms: the window length after the event in milliseconds
+
+        Returns:
+            dict: NumPy arrays of the coordinates ('t', 'v', 'z') and the acquisition time ('time') of the image groups
+                in the window(s), sorted by acquisition time
+
+        """
+        event_times = self._get_event_times(event)
+        times, order = self._get_time_index()
+        starts = np.searchsorted(times, event_times - before_ms, side="left")
+        stops = np.searchsorted(times, event_times + after_ms, side="right")
+
+        positions = [np.arange(start, stop) for start, stop in zip(starts, stops)]
+        positions = np.unique(np.concatenate(positions)) if positions else np.arange(0)
+
+        return self._get_image_group_coordinates(order[positions])
+
+    def _get_time_index(self):
+        """Get the sorted acquisition times and the corresponding image group numbers
+
+        Returns:
+            tuple: sorted acquisition times (ms), image group numbers
+
+        """
+        if self._time_index is None:
+            self._ensure_open()
+            times = self._parser.get_image_group_table()["time"]
+            order = np.argsort(times, kind="stable")
+            order = order[~np.isnan(times[order])]
+            self._time_index = times[order], order
+
+        return self._time_index
+
+    def _get_event_times(self, event):
+        if isinstance(event, dict):
+            return np.array([event["time"]], dtype=np.float64)
+
+        if not isinstance(event, str):
+            return np.array([event], dtype=np.float64)
+
+        if self._event_index is None:
+            events = self._get_metadata_property("events", default=[])
+            self._event_index = (
+                np.array([e["time"] for e in events], dtype=np.float64),
+                np.array([e.get("name", "") for e in events], dtype=object),
+            )
+
+        event_times, event_names = self._event_index
+        return event_times[event_names == event]
+
+    def _get_image_group_coordinates(self, image_groups):
+        self._ensure_open()
+        table = self._parser.get_image_group_table()
+        return {key: table[key][image_groups] for key in ("t", "v", "z", "time")}
+
     def _get_metadata_property(self, key, default=None):
         if self.metadata is None:
             return default
@@ -190,6 +724,9 @@ class ND2Reader(FramesSequenceND):
         self.iter_axes = self._guess_default_iter_axis()
 
         self._register_get_frame(self.get_frame_2D, "yx")
+        for axes in ("cyx", "zyx", "czyx"):
+            if all(axis in self.sizes for axis in axes):
+                self._register_get_frame(partial(self._get_bundled_frame, axes), axes)
 
     def _init_axis_if_exists(self, axis, size, min_size=1):
         if size >= min_size:
@@ -226,9 +763,46 @@ class ND2Reader(FramesSequenceND):
         if self._timesteps is not None and len(self._timesteps) > 0:
             return self._timesteps
 
+        self._ensure_open()
         self._timesteps = (
             np.array(list(self._parser._raw_metadata.acquisition_times), dtype=np.float64)
             * 1000.0
         )
 
         return self._timesteps
+
+
+def _get_shard_range(sizes, rank, world_size):
+    """Splits a sequence of items into world_size contiguous shards with about the same total size
+
+    Args:
+        sizes: the sizes of the items
+        rank: the number of the shard
+        world_size: the number of shards
+
+    Returns:
+        tuple: the start and the stop of the items of the shard
+
+    """
+    if world_size < 1 or not 0 <= rank < world_size:
+        raise ValueError("Shard %d does not exist, there are %d shards." % (rank, world_size))
+
+    sizes = np.asarray(sizes, dtype=np.float64)
+    starts = np.cumsum(sizes) - sizes
+    total = np.sum(sizes)
+
+    # every item belongs to the shard in which it starts
+    start = int(np.searchsorted(starts, total * rank / world_size)) if rank > 0 else 0
+    stop = int(np.searchsorted(starts, total * (rank + 1) / world_size)) if rank < world_size - 1 else len(sizes)
+    return start, stop
+
+
+def _unpickle_reader(cls, path, index, axes, pickle_index):
+    """Recreates a pickled ND2Reader, see ND2Reader.__reduce__
+
+    """
+    reader = cls(path, index=index)
+    reader.pickle_index = pickle_index
+    reader._set_axes_settings(axes)
+
+    return reader
@@ -0,0 +1,109 @@
+"""
+Process-wide registry of parsed file indexes
+
+When the registry is enabled, an ND2Reader that opens a file that is already open in another reader (and has not
+changed since) reuses the parsed index of that reader instead of parsing the metadata again. The registry only holds
+weak references: an index is dropped as soon as no reader uses it anymore.
+
+    import nd2reader.registry
+    nd2reader.registry.enable()
+"""
+import os
+import threading
+import weakref
+
+_lock = threading.Lock()
+_enabled = False
+_indexes = weakref.WeakValueDictionary()
+
+
+def enable():
+    """Enables the registry for all readers that are created from a path
+    """
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    """Disables the registry and drops all registered indexes
+    """
+    global _enabled
+    _enabled = False
+    clear()
+
+
+def is_enabled():
+    """Whether the registry is enabled
+
+    Returns:
+        bool: True if enabled
+
+    """
+    return _enabled
+
+
+def file_key(path):
+    """The registry key of a file, which changes whenever the file is modified or replaced.
+
+    Args:
+        path: path to the file
+
+    Returns:
+        tuple: the absolute path, size, modification time and inode of the file
+
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    return path, stat.st_size, stat.st_mtime_ns, stat.st_ino
+
+
+def get_index(key):
+    """Gets the registered index of a file
+
+    Args:
+        key: the key of the file (see file_key)
+
+    Returns:
+        ParserIndex: the index, or None if the registry is disabled or the file is not registered
+
+    """
+    if not _enabled:
+        return None
+
+    with _lock:
+        return _indexes.get(key)
+
+
+def register_index(key, index):
+    """Registers the index of a file, if the registry is enabled
+
+    Args:
+        key: the key of the file (see file_key)
+        index: the ParserIndex of the file
+
+    """
+    if not _enabled:
+        return
+
+    with _lock:
+        _indexes[key] = index
+
+
+def invalidate(path):
+    """Drops the registered index of a file, so that the next reader parses it again
+
+    Args:
+        path: path to the file
+
+    """
+    path = os.path.abspath(path)
+    with _lock:
+        for key in [key for key in _indexes.keys() if key[0] == path]:
+            del _indexes[key]
+
+
+def clear():
+    """Drops all registered indexes
+    """
+    with _lock:
+        _indexes.clear()
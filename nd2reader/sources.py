@@ -0,0 +1,403 @@
+"""
+Sources of .nd2 data other than files opened by ND2Reader itself
+
+A byte source reads a number of bytes at an offset (read_at) and knows its size. ND2Reader accepts byte sources and
+reads them through a SourceFile, which offers the file methods the parser needs:
+
+    reader = ND2Reader(HTTPSource('https://archive.example.org/experiment.nd2'))
+    reader = ND2Reader(MmapSource('experiment.nd2'))
+
+Data that is already in memory (bytes, a memoryview into shared memory, an io.BytesIO) is read through a BufferSource
+without copying it. ND2Reader wraps such buffers automatically.
+
+Frames of BufferSource and MmapSource readers are views of the source (see ByteSource.zero_copy): they are read-only
+unless the buffer is writable, and a single-channel frame keeps the data of its whole image group alive. Frames of all
+other sources are writable copies, like the frames of readers that were opened from a path.
+"""
+import io
+import mmap
+import os
+import threading
+from collections import OrderedDict
+
+import six
+
+# the types that ND2Reader wraps in a BufferSource
+BUFFER_TYPES = (bytes, bytearray, memoryview, io.BytesIO)
+
+
+class ByteSource(object):
+    """Base class of the byte sources. Subclasses implement read_at and size, and may be read from several threads.
+
+    """
+    # whether frames are returned as views of the data of the source instead of copies
+    zero_copy = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self):
+        return self.size()
+
+    @property
+    def closed(self):
+        return getattr(self, "_closed", False)
+
+    def read_at(self, offset, length):
+        """Reads bytes at an offset. Fewer bytes are returned at the end of the source.
+
+        Args:
+            offset: the offset of the first byte
+            length: the number of bytes
+
+        Returns:
+            bytes: the data (or another object that supports the buffer protocol, e.g. a memoryview)
+
+        """
+        raise NotImplementedError
+
+    def size(self):
+        """The size of the source
+
+        Returns:
+            int: the number of bytes
+
+        """
+        raise NotImplementedError
+
+    def close(self):
+        self._closed = True
+
+    def _check_closed(self):
+        if self.closed:
+            raise ValueError("I/O operation on closed file.")
+
+    def _clip(self, offset, length):
+        """Clips a range to the size of the source
+
+        Returns:
+            tuple: the start and the stop of the range
+
+        """
+        if offset < 0:
+            raise ValueError("negative read position %d" % offset)
+        start = min(offset, self.size())
+        return start, min(start + max(length, 0), self.size())
+
+
+class FileSource(ByteSource):
+    """Reads a local file with positional reads, so that threads do not share a seek position.
+
+    """
+
+    def __init__(self, path):
+        """
+        Arguments:
+            path {str} -- path to the file
+        """
+        self.name = path
+        self._fh = open(path, "rb")
+        self._size = os.fstat(self._fh.fileno()).st_size
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def size(self):
+        return self._size
+
+    def read_at(self, offset, length):
+        self._check_closed()
+        start, stop = self._clip(offset, length)
+        if not hasattr(os, "pread"):
+            with self._lock:
+                self._fh.seek(start)
+                return self._fh.read(stop - start)
+
+        chunks = []
+        while start < stop:
+            chunk = os.pread(self._fh.fileno(), stop - start, start)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            start += len(chunk)
+        return chunks[0] if len(chunks) == 1 else b"".join(chunks)
+
+    def close(self):
+        self._closed = True
+        self._fh.close()
+
+
+class MmapSource(ByteSource):
+    """Reads a local file through a memory map. The data is returned as views of the map, without copying it, so the
+    frames of a reader are read-only.
+
+    """
+    zero_copy = True
+
+    def __init__(self, path):
+        """
+        Arguments:
+            path {str} -- path to the file
+        """
+        self.name = path
+        with open(path, "rb") as fh:
+            self._map = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        self._closed = False
+
+    def size(self):
+        return len(self._view)
+
+    def read_at(self, offset, length):
+        self._check_closed()
+        start, stop = self._clip(offset, length)
+        return self._view[start:stop]
+
+    def close(self):
+        self._closed = True
+        try:
+            self._view.release()
+            self._map.close()
+        except BufferError:
+            # arrays that view the map keep it alive, it is unmapped when they are gone
+            pass
+
+
+class BufferSource(ByteSource):
+    """Reads a buffer in memory. The data is returned as views of the buffer, without copying it, so the frames of a
+    reader are read-only unless the buffer is writable (e.g. a bytearray).
+
+    """
+    zero_copy = True
+
+    def __init__(self, buffer):
+        """
+        Arguments:
+            buffer -- the data: bytes, bytearray, memoryview, io.BytesIO or any other object that supports the buffer
+                protocol
+        """
+        # the export of an io.BytesIO prevents it from being resized until it is released
+        self._export = buffer.getbuffer() if isinstance(buffer, io.BytesIO) else None
+
+        self._view = memoryview(self._export if self._export is not None else buffer).cast("B")
+        self._closed = False
+
+    def size(self):
+        return len(self._view)
+
+    def read_at(self, offset, length):
+        self._check_closed()
+        start, stop = self._clip(offset, length)
+        return self._view[start:stop]
+
+    def close(self):
+        """Closes the source and releases the buffer. An io.BytesIO can be written to again once the frames that view
+        its data are gone as well.
+
+        """
+        self._closed = True
+        for view in (self._view, self._export):
+            try:
+                if view is not None:
+                    view.release()
+            except BufferError:
+                # arrays that view the buffer keep it alive, it is released when they are gone
+                pass
+
+
+class HTTPSource(ByteSource):
+    """Reads a file from an HTTP server with range requests.
+
+    The file is read in blocks of block_size bytes, the most recently used blocks are cached. The missing blocks of a
+    read are fetched with as few requests as possible: runs of missing blocks that are separated by at most max_gap
+    cached bytes are fetched with a single request.
+
+    """
+
+    def __init__(self, url, block_size=1 << 20, cache_size=64 << 20, max_gap=1 << 20, headers=None, timeout=60):
+        """
+        Arguments:
+            url {str} -- the URL of the file
+            block_size {int} -- the number of bytes that are fetched and cached together
+            cache_size {int} -- the maximum number of bytes in the block cache
+            max_gap {int} -- the maximum number of cached bytes that is fetched again to merge two requests
+            headers {dict} -- additional HTTP headers, e.g. for authorization
+            timeout {float} -- the timeout of a request in seconds
+        """
+        self.name = url
+        self.url = url
+        self.block_size = block_size
+        self.max_blocks = max(cache_size // block_size, 1)
+        self.max_gap = max_gap
+        self.headers = dict(headers or {})
+        self.timeout = timeout
+        self.request_count = 0
+        self._blocks = OrderedDict()
+        self._lock = threading.Lock()
+        self._size = None
+        self._closed = False
+
+    def size(self):
+        if self._size is None:
+            with self._request("HEAD") as response:
+                self._size = int(response.headers["Content-Length"])
+        return self._size
+
+    def read_at(self, offset, length):
+        self._check_closed()
+        start, stop = self._clip(offset, length)
+        if start == stop:
+            return b""
+
+        first, last = start // self.block_size, (stop - 1) // self.block_size
+        with self._lock:
+            blocks = {number: self._blocks[number] for number in range(first, last + 1) if number in self._blocks}
+            for number in blocks:
+                self._blocks.move_to_end(number)
+
+        missing = [number for number in range(first, last + 1) if number not in blocks]
+        for run_first, run_last in self._get_runs(missing):
+            blocks.update(self._fetch(run_first, run_last))
+
+        data = b"".join(blocks[number] for number in range(first, last + 1))
+        return data[start - first * self.block_size:stop - first * self.block_size]
+
+    def _get_runs(self, missing):
+        """Groups the missing block numbers into the ranges that are fetched with a single request
+
+        """
+        runs = []
+        for number in missing:
+            if runs and (number - runs[-1][1] - 1) * self.block_size <= self.max_gap:
+                runs[-1][1] = number
+            else:
+                runs.append([number, number])
+        return runs
+
+    def _fetch(self, first, last):
+        start = first * self.block_size
+        stop = min((last + 1) * self.block_size, self.size())
+
+        with self._request("GET", {"Range": "bytes=%d-%d" % (start, stop - 1)}) as response:
+            if response.status != 206:
+                raise IOError("The server does not support range requests for %s." % self.url)
+            data = response.read()
+        if len(data) != stop - start:
+            raise IOError("Expected %d bytes from %s, but got %d." % (stop - start, self.url, len(data)))
+
+        blocks = {number: data[(number - first) * self.block_size:(number - first + 1) * self.block_size]
+                  for number in range(first, last + 1)}
+        with self._lock:
+            for number, block in blocks.items():
+                self._blocks[number] = block
+                self._blocks.move_to_end(number)
+            while len(self._blocks) > self.max_blocks:
+                self._blocks.popitem(last=False)
+
+        return blocks
+
+    def _request(self, method, headers=None):
+        request_headers = dict(self.headers)
+        request_headers.update(headers or {})
+        request = six.moves.urllib.request.Request(self.url, headers=request_headers, method=method)
+        self.request_count += 1
+        return six.moves.urllib.request.urlopen(request, timeout=self.timeout)
+
+    def close(self):
+        self._closed = True
+        with self._lock:
+            self._blocks.clear()
+
+
+class SourceFile(object):
+    """A read-only, file-like view of a byte source. Besides the usual file methods it offers read_view, which returns
+    the data of the source as a memoryview instead of copying it into a new bytes object.
+
+    """
+
+    def __init__(self, source):
+        """
+        Arguments:
+            source {ByteSource} -- the byte source, it is closed when the file is closed
+        """
+        self.source = source
+        self.name = getattr(source, "name", None)
+        self._position = 0
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def closed(self):
+        return self._closed
+
+    @property
+    def zero_copy(self):
+        return self.source.zero_copy
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def close(self):
+        """Closes the file and its source. Views that were returned before stay valid.
+
+        """
+        if not self._closed:
+            self._closed = True
+            self.source.close()
+
+    def seek(self, offset, whence=0):
+        self._check_closed()
+        if whence == 1:
+            offset += self._position
+        elif whence == 2:
+            offset += self.source.size()
+        if offset < 0:
+            raise ValueError("negative seek position %d" % offset)
+
+        self._position = offset
+        return self._position
+
+    def tell(self):
+        self._check_closed()
+        return self._position
+
+    def read(self, size=-1):
+        return bytes(self.read_view(size))
+
+    def read_view(self, size=-1):
+        """Reads without copying the data
+
+        Args:
+            size: the number of bytes to read (-1 reads until the end of the source)
+
+        Returns:
+            memoryview: the data
+
+        """
+        self._check_closed()
+        if size is None or size < 0:
+            size = max(self.source.size() - self._position, 0)
+
+        data = memoryview(self.source.read_at(self._position, size)).cast("B")
+        self._position += len(data)
+        return data
+
+    def readinto(self, buffer):
+        target = memoryview(buffer).cast("B")
+        data = self.read_view(len(target))
+        target[:len(data)] = data
+        return len(data)
+
+    def _check_closed(self):
+        if self._closed:
+            raise ValueError("I/O operation on closed file.")
@@ -12,7 +12,10 @@ if __name__ == '__main__':
             'xmltodict>=0.9.2',
             'pims>=0.3.0'
         ],
-        python_requires=">=3.6",
+        python_requires=">=3.8",
+        entry_points={
+            'console_scripts': ['nd2catalog=nd2reader.catalog:main'],
+        },
         version=VERSION,
         description='A tool for reading ND2 files produced by NIS Elements',
         author='Ruben Verweij',
@@ -25,8 +28,7 @@ if __name__ == '__main__':
                      'License :: Freely Distributable',
                      'License :: OSI Approved :: GNU General Public License v3 or later (GPLv3+)',
                      'Operating System :: POSIX :: Linux',
-                     'Programming Language :: Python :: 2.7',
-                     'Programming Language :: Python :: 3.4',
+                     'Programming Language :: Python :: 3',
                      'Topic :: Scientific/Engineering',
                      ]
     )
@@ -0,0 +1,104 @@
+import asyncio
+import time
+import unittest
+
+import numpy as np
+
+from nd2reader.aio import AsyncND2Reader
+from nd2reader.artificial import ArtificialND2
+from nd2reader.reader import ND2Reader
+
+
+class TestAsyncND2Reader(unittest.TestCase):
+    sizes = {'t': 4, 'z': 2, 'y': 4, 'x': 5}
+
+    def test_read(self):
+        async def read(artificial):
+            async with AsyncND2Reader('test_data/test_nd2_aio.nd2', max_workers=2) as reader:
+                self.assertEqual(len(reader), 4)
+                np.testing.assert_array_equal(await reader.aget_frame(2), artificial.image_data[4, 0])
+                np.testing.assert_array_equal(await reader.aget_frame_2D(t=1, z=1), artificial.image_data[3, 0])
+
+                frames = await reader.aget_frames([3, 0])
+                np.testing.assert_array_equal(frames[0], artificial.image_data[6, 0])
+                np.testing.assert_array_equal(frames[1], artificial.image_data[0, 0])
+
+                reader.reader.iter_axes = 'z'
+                np.testing.assert_array_equal(await reader.aget_frame(1), artificial.image_data[1, 0])
+                reader.reader.iter_axes = 't'
+
+                frames = [frame async for frame in reader]
+                self.assertEqual(len(frames), 4)
+                for t, frame in enumerate(frames):
+                    np.testing.assert_array_equal(frame, artificial.image_data[2 * t, 0])
+
+        with ArtificialND2('test_data/test_nd2_aio.nd2', sizes=self.sizes) as artificial:
+            asyncio.run(read(artificial))
+
+    def test_cancel_pending(self):
+        async def cancel(artificial, reader):
+            reads = [asyncio.ensure_future(reader.aget_frame(t % 4)) for t in range(8)]
+            await asyncio.sleep(0)
+            self.assertGreaterEqual(reader.cancel_pending(), 7)
+
+            results = await asyncio.gather(*reads, return_exceptions=True)
+            self.assertGreaterEqual(sum(isinstance(r, asyncio.CancelledError) for r in results), 7)
+
+            np.testing.assert_array_equal(await reader.aget_frame(1), artificial.image_data[2, 0])
+
+        with ArtificialND2('test_data/test_nd2_aio.nd2', sizes=self.sizes) as artificial:
+            with ND2Reader('test_data/test_nd2_aio.nd2') as nd2:
+                reader = AsyncND2Reader(nd2, max_workers=1)
+                asyncio.run(cancel(artificial, reader))
+                reader.close()
+                self.assertFalse(nd2._fh.closed)
+
+            with open('test_data/test_nd2_aio.nd2', 'rb') as fh:
+                with ND2Reader(fh) as nd2:
+                    # readers without a path cannot be cloned, so they are read with a single thread
+                    reader = AsyncND2Reader(nd2)
+                    self.assertEqual(reader.max_workers, 1)
+                    reader.close()
+                    with self.assertWarns(UserWarning):
+                        reader = AsyncND2Reader(nd2, max_workers=2)
+                    self.assertEqual(reader.max_workers, 1)
+                    np.testing.assert_array_equal(asyncio.run(reader.aget_frame(1)), artificial.image_data[2, 0])
+                    reader.close()
+
+            with ND2Reader('test_data/test_nd2_aio.nd2') as nd2:
+                reader = AsyncND2Reader(nd2)
+                self.assertEqual(reader.max_workers, 4)
+                reader.close()
+
+    def test_exit_does_not_block_loop(self):
+        async def exit_while_reading():
+            ticks = []
+
+            async def tick():
+                while True:
+                    ticks.append(None)
+                    await asyncio.sleep(0.01)
+
+            async with AsyncND2Reader('test_data/test_nd2_aio.nd2', max_workers=1) as reader:
+                read = asyncio.ensure_future(reader._submit(slow_read))
+                await asyncio.sleep(0.05)
+                ticker = asyncio.ensure_future(tick())
+                await asyncio.sleep(0)
+                ticks.clear()
+
+            # exiting waited for the running read, and the loop kept running meanwhile
+            self.assertTrue(finished)
+            self.assertGreater(len(ticks), 5)
+            self.assertRaises(asyncio.CancelledError, read.result)
+            ticker.cancel()
+
+        with ArtificialND2('test_data/test_nd2_aio.nd2', sizes=self.sizes):
+            asyncio.run(exit_while_reading())
+
+
+finished = []
+
+
+def slow_read(async_reader):
+    time.sleep(0.3)
+    finished.append(True)
@@ -0,0 +1,107 @@
+import json
+import os
+import shutil
+import unittest
+from os import path
+
+from nd2reader.artificial import ArtificialND2
+from nd2reader import catalog as catalog_module
+from nd2reader.catalog import Catalog, main, scan_file
+from nd2reader.common import check_or_make_dir
+
+
+class TestCatalog(unittest.TestCase):
+    def setUp(self):
+        dir_path = path.dirname(path.realpath(__file__))
+        self.root = path.join(dir_path, 'test_data/catalog/')
+        shutil.rmtree(self.root, ignore_errors=True)
+        check_or_make_dir(path.join(self.root, 'day1/'))
+        self.database = path.join(dir_path, 'test_data/catalog.sqlite')
+        if path.exists(self.database):
+            os.remove(self.database)
+
+        self.create_nd2('day1/a.nd2', {'t': 3, 'c': 2})
+        self.create_nd2('b.nd2', {'t': 1, 'z': 4, 'c': 1})
+        with open(path.join(self.root, 'corrupt.nd2'), 'wb') as fh:
+            fh.write(b'not an nd2 file')
+
+    def create_nd2(self, name, sizes):
+        with ArtificialND2(path.join(self.root, name), sizes=sizes) as artificial:
+            artificial.close()
+
+    def test_scan_and_rescan(self):
+        with Catalog(self.database) as catalog:
+            result = catalog.scan(self.root, workers=1)
+            self.assertEqual(result, {'scanned': 3, 'unchanged': 0, 'removed': 0, 'failed': 1})
+
+            rows = catalog.find(channels=2, min_frames=2)
+            self.assertEqual(len(rows), 1)
+            self.assertTrue(rows[0]['path'].endswith('a.nd2'))
+            self.assertEqual(json.loads(rows[0]['channel_names']), ['Channel 0', 'Channel 1'])
+            self.assertEqual(rows[0]['last_time'], 200.0)
+            self.assertEqual(rows[0]['date'], '2016-10-19T10:00:00')
+            self.assertEqual(len(catalog.find(date_from='2016-10-01', date_to='2016-11-01')), 2)
+
+            result = catalog.scan(self.root, workers=1)
+            self.assertEqual(result, {'scanned': 0, 'unchanged': 3, 'removed': 0, 'failed': 0})
+
+            self.create_nd2('b.nd2', {'t': 1, 'z': 5, 'c': 1})
+            os.remove(path.join(self.root, 'day1/a.nd2'))
+            result = catalog.scan(self.root, workers=1)
+            self.assertEqual(result, {'scanned': 1, 'unchanged': 1, 'removed': 1, 'failed': 0})
+            self.assertEqual(catalog.query('SELECT z_levels FROM files WHERE error IS NULL'), [{'z_levels': 5}])
+
+    def test_vanished_files(self):
+        self.assertIsNone(scan_file(path.join(self.root, 'missing.nd2')))
+
+        def find_nd2_files(root):
+            for file_path in original_find(root):
+                yield file_path
+            # a file that is removed between the walk and the stat
+            yield path.join(self.root, 'missing.nd2')
+
+        def scan_file_after_removal(file_path):
+            # a file that is removed between the walk and the probe
+            if file_path.endswith('b.nd2'):
+                os.remove(file_path)
+            return original_scan_file(file_path)
+
+        original_find, original_scan_file = catalog_module.find_nd2_files, catalog_module.scan_file
+        catalog_module.find_nd2_files, catalog_module.scan_file = find_nd2_files, scan_file_after_removal
+        try:
+            with Catalog(self.database) as catalog:
+                result = catalog.scan(self.root, workers=1)
+                self.assertEqual(result, {'scanned': 2, 'unchanged': 0, 'removed': 1, 'failed': 1})
+                self.assertEqual(len(catalog.query('SELECT * FROM files')), 2)
+        finally:
+            catalog_module.find_nd2_files, catalog_module.scan_file = original_find, original_scan_file
+
+    def test_interrupted_scan(self):
+        def scan_file_until_interrupted(file_path):
+            if len(scanned) == 2:
+                raise KeyboardInterrupt
+            scanned.append(file_path)
+            return original_scan_file(file_path)
+
+        scanned = []
+        original_scan_file = catalog_module.scan_file
+        catalog_module.scan_file = scan_file_until_interrupted
+        try:
+            with Catalog(self.database) as catalog:
+                self.assertRaises(KeyboardInterrupt, catalog.scan, self.root, workers=1, commit_every=1)
+        finally:
+            catalog_module.scan_file = original_scan_file
+
+        # the files that were scanned before the interruption are kept
+        with Catalog(self.database) as catalog:
+            self.assertEqual(sorted(row['path'] for row in catalog.query('SELECT path FROM files')), sorted(scanned))
+            result = catalog.scan(self.root, workers=1)
+            failed = int(not any(file_path.endswith('corrupt.nd2') for file_path in scanned))
+            self.assertEqual(result, {'scanned': 1, 'unchanged': 2, 'removed': 0, 'failed': failed})
+
+    def test_process_pool_and_command_line(self):
+        main([self.root, '--database', self.database, '--workers', '2'])
+
+        with Catalog(self.database) as catalog:
+            self.assertEqual(len(catalog.query('SELECT * FROM files')), 3)
+            self.assertEqual(len(catalog.find()), 2)
@@ -8,7 +8,7 @@ import struct
 from nd2reader.artificial import ArtificialND2
 from nd2reader.common import get_version, parse_version, parse_date, _add_to_metadata, _parse_unsigned_char, \
     _parse_unsigned_int, _parse_unsigned_long, _parse_double, check_or_make_dir, _parse_string, _parse_char_array, \
-    get_from_dict_if_exists, read_chunk
+    get_from_dict_if_exists, read_chunk, read_chunk_into
 from nd2reader.exceptions import InvalidVersionError
 
 
@@ -144,6 +144,26 @@ class TestCommon(unittest.TestCase):
 
             self.assertEqual(real_chunk, chunk_read)
 
+    def test_read_chunk_into(self):
+        with ArtificialND2(self.test_file) as artificial:
+            fh = artificial.file_handle
+            chunk_location = artificial.locations['image_attributes'][0]
+            expected = read_chunk(fh, chunk_location)
+
+            data = read_chunk_into(fh, chunk_location)
+            self.assertEqual(bytes(data), expected)
+
+            # a large enough buffer is reused, a too small one is replaced
+            buffer = bytearray(len(expected) + 10)
+            data = read_chunk_into(fh, chunk_location, buffer)
+            self.assertIs(data.obj, buffer)
+            self.assertEqual(bytes(data), expected)
+
+            data = read_chunk_into(fh, chunk_location, bytearray(1))
+            self.assertEqual(len(data.obj), len(expected))
+
+            self.assertIsNone(read_chunk_into(fh, None))
+
     def test_read_chunk_fail_bad_header(self):
         with ArtificialND2(self.test_file) as artificial:
             fh = artificial.file_handle
@@ -0,0 +1,81 @@
+import unittest
+import warnings
+
+import numpy as np
+
+from nd2reader.artificial import ArtificialND2
+from nd2reader.handles import HandlePool
+from nd2reader.legacy import Nd2
+from nd2reader.reader import ND2Reader
+
+
+class TestHandlePool(unittest.TestCase):
+    def test_pooled_file(self):
+        with ArtificialND2('test_data/test_nd2_handles.nd2'):
+            with open('test_data/test_nd2_handles.nd2', 'rb') as fh:
+                expected = fh.read()
+
+        pool = HandlePool(max_open=1)
+        first = pool.open('test_data/test_nd2_handles.nd2')
+        second = pool.open('test_data/test_nd2_handles.nd2')
+
+        first.seek(10)
+        self.assertEqual(first.read(5), expected[10:15])
+        self.assertEqual(pool.open_count, 1)
+
+        # opening the second file closes the first one, which continues at the same position afterwards
+        self.assertEqual(second.read(3), expected[:3])
+        self.assertIsNone(first._fh)
+        self.assertEqual(first.tell(), 15)
+        self.assertEqual(first.read(5), expected[15:20])
+        self.assertEqual(pool.open_count, 1)
+
+        buffer = bytearray(4)
+        self.assertEqual(second.readinto(buffer), 4)
+        self.assertEqual(bytes(buffer), expected[3:7])
+        self.assertEqual(second.seek(-8, 2), len(expected) - 8)
+
+        first.close()
+        second.close()
+        self.assertEqual(pool.open_count, 0)
+        self.assertRaises(ValueError, first.read)
+        self.assertRaises(ValueError, HandlePool, 0)
+
+    def test_readers(self):
+        sizes = {'t': 2, 'y': 4, 'x': 5}
+        pool = HandlePool(max_open=2)
+        readers = []
+        for i in range(4):
+            with ArtificialND2('test_data/test_nd2_handles_%d.nd2' % i, sizes=sizes) as artificial:
+                pass
+            readers.append(ND2Reader('test_data/test_nd2_handles_%d.nd2' % i, handle_pool=pool))
+            self.assertLessEqual(pool.open_count, 2)
+
+        for _ in range(2):
+            for reader in readers:
+                np.testing.assert_array_equal(reader[1], artificial.image_data[1, 0])
+                self.assertLessEqual(pool.open_count, 2)
+
+        pool.close_all()
+        self.assertEqual(pool.open_count, 0)
+        np.testing.assert_array_equal(readers[0][0], artificial.image_data[0, 0])
+
+        with readers[0].clone() as clone:
+            self.assertIs(clone._handle_pool, pool)
+
+        for reader in readers:
+            reader.close()
+        self.assertEqual(pool.open_count, 0)
+
+        with open('test_data/test_nd2_handles_0.nd2', 'rb') as fh:
+            self.assertRaises(ValueError, ND2Reader, fh, handle_pool=pool)
+
+    def test_legacy(self):
+        pool = HandlePool(max_open=1)
+        with ArtificialND2('test_data/test_nd2_handles.nd2'):
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                with Nd2('test_data/test_nd2_handles.nd2', handle_pool=pool) as nd2:
+                    self.assertIs(nd2.reader._handle_pool, pool)
+                    self.assertEqual(pool.open_count, 1)
+        self.assertEqual(pool.open_count, 0)
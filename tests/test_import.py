@@ -0,0 +1,53 @@
+import subprocess
+import sys
+import unittest
+
+
+def get_imported_modules(statement):
+    """Runs the statement in a fresh interpreter and returns the import time of each imported module
+
+    Returns:
+        dict: cumulative import time in microseconds by module name
+
+    """
+    output = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], check=True,
+                            stderr=subprocess.PIPE, universal_newlines=True).stderr
+
+    modules = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_time, cumulative, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(cumulative)
+    return modules
+
+
+class TestImport(unittest.TestCase):
+    heavy_modules = ["pims", "xmltodict", "nd2reader.legacy", "nd2reader.reader", "importlib.metadata"]
+
+    def test_import_is_lazy(self):
+        modules = get_imported_modules("import nd2reader")
+
+        self.assertIn("nd2reader", modules)
+        for heavy_module in self.heavy_modules:
+            self.assertNotIn(heavy_module, modules)
+
+        # the package itself should not do any work on import
+        self.assertLess(modules["nd2reader"], 100000)
+
+    def test_parser_does_not_import_pims(self):
+        modules = get_imported_modules("from nd2reader.parser import Parser")
+
+        self.assertIn("nd2reader.parser", modules)
+        self.assertNotIn("pims", modules)
+        self.assertNotIn("xmltodict", modules)
+
+    def test_lazy_attributes(self):
+        import nd2reader
+        from nd2reader.reader import ND2Reader
+        from nd2reader.legacy import Nd2
+
+        self.assertIs(nd2reader.ND2Reader, ND2Reader)
+        self.assertIs(nd2reader.Nd2, Nd2)
+        self.assertIn("ND2Reader", dir(nd2reader))
+        self.assertRaises(AttributeError, getattr, nd2reader, "does_not_exist")
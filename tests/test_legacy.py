@@ -1,6 +1,8 @@
 import unittest
 import warnings
 
+import numpy as np
+
 from nd2reader.legacy import Nd2
 from nd2reader.reader import ND2Reader
 from nd2reader.artificial import ArtificialND2
@@ -36,3 +38,28 @@ class TestLegacy(unittest.TestCase):
                 self.assertEquals(reader.pixel_microns, None)
 
                 self.assertEquals(len(reader), 1)
+
+    def test_select(self):
+        sizes = {'t': 3, 'v': 2, 'z': 2, 'c': 2, 'y': 4, 'x': 5}
+        with ArtificialND2('test_data/legacy_select.nd2', sizes=sizes) as artificial:
+            groups = artificial.image_data.reshape(3, 2, 2, 2, 4, 5)
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                nd2 = Nd2('test_data/legacy_select.nd2')
+
+            with nd2:
+                selection = nd2.select(fields_of_view=1, channels='Channel 1', start=1)
+                self.assertEqual(len(selection), 4)
+                self.assertEqual(selection.images, [(1, 1, 0, 1), (1, 1, 1, 1), (2, 1, 0, 1), (2, 1, 1, 1)])
+
+                images = list(selection)
+                for image, (t, v, z, c) in zip(images, selection.images):
+                    np.testing.assert_array_equal(image, groups[t, v, z, c])
+
+                np.testing.assert_array_equal(selection[2], groups[2, 1, 0, 1])
+                sliced = selection[1::2]
+                self.assertEqual(sliced.images, [(1, 1, 1, 1), (2, 1, 1, 1)])
+                np.testing.assert_array_equal(list(sliced)[1], groups[2, 1, 1, 1])
+
+                self.assertEqual(len(nd2.select()), 24)
+                self.assertEqual(len(nd2.select(z_levels=[1], channels=[0, 1], stop=2)), 8)
@@ -0,0 +1,89 @@
+import unittest
+
+import numpy as np
+
+from nd2reader.artificial import ArtificialND2
+from nd2reader.multi import ND2MultiReader
+
+
+class TestND2MultiReader(unittest.TestCase):
+    def setUp(self):
+        self.image_data = []
+        for i, t in enumerate([2, 3]):
+            with ArtificialND2('test_data/test_nd2_multi_%d.nd2' % i, sizes={'t': t, 'c': 2, 'y': 4, 'x': 5}) \
+                    as artificial:
+                self.image_data.append(artificial.image_data)
+        self.paths = ['test_data/test_nd2_multi_0.nd2', 'test_data/test_nd2_multi_1.nd2']
+
+    def test_concat_t(self):
+        with ND2MultiReader(self.paths, concat_axis='t', max_open=1) as reader:
+            self.assertEqual(reader.sizes, {'x': 5, 'y': 4, 'c': 2, 't': 5})
+            self.assertEqual(len(reader), 5)
+            self.assertEqual(reader.locate(3), (1, 1))
+            self.assertEqual(reader._readers, [None, None])
+
+            np.testing.assert_array_equal(reader[1], self.image_data[0][1, 0])
+            np.testing.assert_array_equal(reader[2], self.image_data[1][0, 0])
+            self.assertLessEqual(reader._handle_pool.open_count, 1)
+
+            reader.default_coords['c'] = 1
+            frames = reader.get_frames([4, 0, 3])
+            np.testing.assert_array_equal(frames[0], self.image_data[1][2, 1])
+            np.testing.assert_array_equal(frames[1], self.image_data[0][0, 1])
+            np.testing.assert_array_equal(frames[2], self.image_data[1][1, 1])
+
+            frames = reader.prefetch(range(5)).result()
+            self.assertEqual(len(frames), 5)
+
+            reader.bundle_axes = 'tyx'
+            reader.iter_axes = 'c'
+            np.testing.assert_array_equal(reader.get_frames([0])[0][3], self.image_data[1][1, 0])
+
+            # both files were written at the same time, so the second file follows the first one
+            np.testing.assert_array_equal(reader.timesteps, [0, 100, 200, 300, 400])
+            self.assertTrue(np.all(np.diff(reader.timesteps) > 0))
+            self.assertRaises(IndexError, reader.locate, 5)
+
+    def test_prefetch_while_reading(self):
+        image_data = []
+        for i in range(2):
+            with ArtificialND2('test_data/test_nd2_multi_prefetch_%d.nd2' % i,
+                               sizes={'t': 100, 'c': 2, 'y': 64, 'x': 64}) as artificial:
+                image_data.append(artificial.image_data.reshape(100, 2, 64, 64))
+        expected = np.concatenate(image_data)[:, 0]
+        paths = ['test_data/test_nd2_multi_prefetch_%d.nd2' % i for i in range(2)]
+
+        with ND2MultiReader(paths, concat_axis='t') as reader:
+            for _ in range(5):
+                future = reader.prefetch(range(200))
+                for i in range(200):
+                    np.testing.assert_array_equal(reader[i], expected[i])
+                for i, frame in enumerate(future.result()):
+                    np.testing.assert_array_equal(frame, expected[i])
+
+    def test_shard(self):
+        with ND2MultiReader(self.paths, concat_axis='t') as reader:
+            shards = [reader.shard(rank, 2) for rank in range(2)]
+            self.assertEqual(shards[0], [{'t': t, 'c': c} for t in range(3) for c in range(2)])
+            self.assertEqual(sum(shards, []), [{'t': t, 'c': c} for t in range(5) for c in range(2)])
+
+            shard = reader.shard(0, 1, axes='t', t=[1, 2, 4], c=1)
+            self.assertEqual(shard, [{'t': 1, 'c': 1}, {'t': 2, 'c': 1}, {'t': 4, 'c': 1}])
+            frames = list(reader.iter_frames(shard))
+            self.assertEqual([coords for coords, frame in frames], shard)
+            np.testing.assert_array_equal(frames[0][1], self.image_data[0][1, 1])
+            np.testing.assert_array_equal(frames[1][1], self.image_data[1][0, 1])
+            np.testing.assert_array_equal(frames[2][1], self.image_data[1][2, 1])
+
+    def test_concat_v(self):
+        with ND2MultiReader(self.paths[:1] * 2, concat_axis='v') as reader:
+            self.assertEqual(reader.sizes['v'], 2)
+            self.assertEqual(reader.sizes['t'], 2)
+            reader.iter_axes = 'tv'
+            np.testing.assert_array_equal(reader[3], self.image_data[0][1, 0])
+
+            # the files share the time axis
+            np.testing.assert_array_equal(reader.timesteps, [[0, 100], [0, 100]])
+
+        self.assertRaises(ValueError, ND2MultiReader, self.paths, concat_axis='v')
+        self.assertRaises(ValueError, ND2MultiReader, self.paths, concat_axis='z')
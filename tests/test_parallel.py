@@ -0,0 +1,85 @@
+import multiprocessing
+import operator
+import os
+import unittest
+
+import numpy as np
+
+from nd2reader.artificial import ArtificialND2
+from nd2reader.parallel import map_frames
+from nd2reader.reader import ND2Reader
+
+
+def frame_sum(frame, coords):
+    return int(frame.sum())
+
+
+def block_sums(block, coords):
+    return [int(frame.sum()) for frame in block]
+
+
+def fail_on_channel_1(frame, coords):
+    if coords['c'] == 1:
+        raise RuntimeError('analysis failed')
+    return 0
+
+
+def open_files(path):
+    path = os.path.abspath(path)
+    fd_dir = '/proc/self/fd'
+    return [fd for fd in os.listdir(fd_dir) if os.path.realpath(os.path.join(fd_dir, fd)) == path]
+
+
+class TestMapFrames(unittest.TestCase):
+    def setUp(self):
+        self.groups = []
+        self.paths = []
+        for i, t in enumerate([3, 4]):
+            path = 'test_data/test_nd2_parallel_%d.nd2' % i
+            with ArtificialND2(path, sizes={'t': t, 'c': 2, 'y': 4, 'x': 5}) as artificial:
+                self.groups.append(artificial.image_data.reshape(t, 2, 4, 5).astype(np.int64))
+            self.paths.append(path)
+
+    def test_frames(self):
+        for workers in [1, 2]:
+            results = list(map_frames(frame_sum, self.paths, workers=workers, chunk_size=3, max_pending=1))
+            self.assertEqual(len(results), 14)
+            for file_number, coords, result in results:
+                self.assertEqual(result, self.groups[file_number][coords['t'], coords['c']].sum())
+
+            # the tasks follow the order of the files and the order within a file
+            self.assertEqual([(file_number, coords['t'], coords['c']) for file_number, coords, result in results[:4]],
+                             [(0, 0, 0), (0, 0, 1), (0, 1, 0), (0, 1, 1)])
+
+    def test_reduce(self):
+        with ND2Reader(self.paths[1]) as reader:
+            total = map_frames(frame_sum, [self.paths[0], reader], axes='t', c=1, workers=2, reduce=operator.add)
+            self.assertEqual(total, self.groups[0][:, 1].sum() + self.groups[1][:, 1].sum())
+
+        self.assertEqual(map_frames(frame_sum, self.paths[0], axes='t', t=[], workers=1, reduce=operator.add), None)
+        self.assertEqual(map_frames(frame_sum, self.paths[0], axes='t', t=[], workers=1, reduce=operator.add,
+                                    initial=0), 0)
+
+    def test_blocks(self):
+        results = list(map_frames(block_sums, self.paths[1], axes='t', c=0, workers=2, block_size=3))
+        self.assertEqual([len(coords) for file_number, coords, result in results], [3, 1])
+        sums = sum([result for file_number, coords, result in results], [])
+        self.assertEqual(sums, [self.groups[1][t, 0].sum() for t in range(4)])
+
+    @unittest.skipUnless(os.path.isdir('/proc/self/fd'), 'needs /proc to list open files')
+    def test_release(self):
+        for workers in [1, 2]:
+            results = map_frames(frame_sum, self.paths, workers=workers, chunk_size=2)
+            self.assertEqual(open_files(self.paths[0]), [])
+            for file_number, coords, result in results:
+                break
+            results.close()
+
+            # the files and the worker processes are released when the loop is left early
+            self.assertEqual(open_files(self.paths[0]), [])
+            self.assertEqual(multiprocessing.active_children(), [])
+
+            self.assertRaises(RuntimeError, map_frames, fail_on_channel_1, self.paths, workers=workers,
+                              reduce=operator.add)
+            self.assertEqual(open_files(self.paths[0]), [])
+            self.assertEqual(multiprocessing.active_children(), [])
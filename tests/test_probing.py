@@ -0,0 +1,42 @@
+import unittest
+
+from nd2reader import probe
+from nd2reader.artificial import ArtificialND2
+from nd2reader.exceptions import InvalidFileType
+from nd2reader.reader import ND2Reader
+
+
+class TestProbing(unittest.TestCase):
+    def test_invalid_file_extension(self):
+        self.assertRaises(InvalidFileType, lambda: probe('test_data/invalid_extension_file.inv'))
+
+    def test_probe(self):
+        sizes = {'t': 3, 'v': 2, 'z': 4, 'c': 2, 'y': 6, 'x': 5}
+        with ArtificialND2('test_data/test_nd2_probe.nd2', sizes=sizes):
+            summary = probe('test_data/test_nd2_probe.nd2')
+
+            self.assertEqual(summary['version'], (3, 0))
+            self.assertEqual(summary['sizes'], sizes)
+            self.assertEqual(summary['channels'], ['Channel 0', 'Channel 1'])
+            self.assertEqual(summary['pixel_microns'], 0.5)
+            self.assertTrue(summary['path'].endswith('test_nd2_probe.nd2'))
+
+            with ND2Reader('test_data/test_nd2_probe.nd2') as reader:
+                self.assertEqual(summary['date'], reader.metadata['date'])
+                self.assertEqual(summary['sizes'], reader.sizes)
+
+    def test_probe_sizes(self):
+        with ArtificialND2('test_data/test_nd2_probe.nd2', sizes={'t': 3, 'y': 4, 'x': 5}):
+            summary = probe('test_data/test_nd2_probe.nd2')
+
+            with ND2Reader('test_data/test_nd2_probe.nd2') as reader:
+                self.assertEqual(reader.sizes, {'t': 3, 'y': 4, 'x': 5})
+                self.assertEqual(summary['sizes'], dict({'c': 1, 'z': 1, 'v': 1}, **reader.sizes))
+
+    def test_probe_file_handle(self):
+        with ArtificialND2('test_data/test_nd2_probe.nd2') as artificial:
+            summary = probe(artificial.file_handle)
+
+            self.assertIsNone(summary['path'])
+            self.assertEqual(summary['sizes']['x'], 128)
+            self.assertEqual(summary['channels'], ['TRITC'])
@@ -0,0 +1,62 @@
+import multiprocessing
+import unittest
+
+import numpy as np
+
+from nd2reader.artificial import ArtificialND2
+from nd2reader.processes import ProcessPoolReader, split_frames
+from nd2reader.reader import ND2Reader
+
+
+class TestProcessPoolReader(unittest.TestCase):
+    def setUp(self):
+        sizes = {'t': 5, 'z': 2, 'c': 2, 'y': 4, 'x': 5}
+        with ArtificialND2('test_data/test_nd2_processes.nd2', sizes=sizes) as artificial:
+            self.groups = artificial.image_data.reshape(5, 2, 2, 4, 5)
+
+    def test_get_frames(self):
+        with ProcessPoolReader('test_data/test_nd2_processes.nd2', workers=2) as reader:
+            self.assertEqual(len(reader), 5)
+            frames = reader.get_frames([4, 0, 2])
+            self.assertEqual(frames.shape, (3, 4, 5))
+            self.assertEqual(frames.dtype, np.uint16)
+            for frame, t in zip(frames, [4, 0, 2]):
+                np.testing.assert_array_equal(frame, self.groups[t, 0, 0])
+
+            reader.reader.default_coords['c'] = 1
+            reader.reader.iter_axes = 'zt'
+            frames = reader.prefetch(range(10)).result()
+            for i, frame in enumerate(frames):
+                np.testing.assert_array_equal(frame, self.groups[i % 5, i // 5, 1])
+
+            frame = frames[3]
+            del frames
+            np.testing.assert_array_equal(frame, self.groups[3, 0, 1])
+
+            frames = list(reader.iterate(batch_size=3))
+            self.assertEqual(len(frames), 10)
+            for i, frame in enumerate(frames):
+                np.testing.assert_array_equal(frame, self.groups[i % 5, i // 5, 1])
+
+            self.assertEqual(reader.get_frames([]).shape, (0, 4, 5))
+            self.assertRaises(ValueError, reader.get_frames, [10])
+
+    def test_split_frames(self):
+        with ND2Reader('test_data/test_nd2_processes.nd2') as reader:
+            frames = reader._select_frames('tzc')
+            parts = split_frames(reader, frames, 3)
+
+            # the channels of an image group are never split over two parts
+            groups = [set(frames[i][:3] for i in part) for part in parts]
+            for first in range(len(groups)):
+                for second in range(first + 1, len(groups)):
+                    self.assertFalse(groups[first] & groups[second])
+            self.assertEqual(sorted(sum(parts, [])), list(range(20)))
+            self.assertEqual([len(part) for part in parts], [4] * 5)
+
+            self.assertEqual([len(part) for part in split_frames(reader, frames, 3, exact=True)], [3] * 6 + [2])
+
+    def test_spawn(self):
+        with ProcessPoolReader('test_data/test_nd2_processes.nd2', workers=2,
+                               mp_context=multiprocessing.get_context('spawn')) as reader:
+            np.testing.assert_array_equal(reader.read([(1, 0, 1, 1)])[0], self.groups[1, 1, 1])
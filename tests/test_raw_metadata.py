@@ -1,10 +1,12 @@
 import unittest
+import numpy as np
 import six
 
 from nd2reader.artificial import ArtificialND2
 from nd2reader.label_map import LabelMap
 from nd2reader.raw_metadata import RawMetadata
-from nd2reader.common_raw_metadata import parse_roi_shape, parse_roi_type, parse_dimension_text_line
+from nd2reader.common_raw_metadata import parse_roi_shape, parse_roi_type, parse_dimension_text_line, \
+    interpolate_roi_positions
 
 
 class TestRawMetadata(unittest.TestCase):
@@ -79,3 +81,69 @@ class TestRawMetadata(unittest.TestCase):
         parsed_channels = self.metadata.get_parsed_metadata()['channels']
 
         self.assertEquals(parsed_channels, ['TRITC'])
+
+    @staticmethod
+    def _raw_roi(*keyframes):
+        raw_roi = {six.b('m_vectAnimParams_Size'): len(keyframes)}
+        for i, (time, center_x, size_x) in enumerate(keyframes):
+            raw_roi[six.b('m_vectAnimParams_%d' % i)] = {
+                six.b('m_dTimeMs'): time, six.b('m_dCenterX'): center_x, six.b('m_dCenterY'): 0.0,
+                six.b('m_dCenterZ'): 1.0,
+                six.b('m_sBoxShape'): {six.b('m_dSizeX'): size_x, six.b('m_dSizeY'): 1.0, six.b('m_dSizeZ'): 2.0}
+            }
+        return raw_roi
+
+    def test_roi_table(self):
+        self.metadata.get_parsed_metadata()
+        self.metadata._metadata_parsed.update({'width': 100, 'height': 50, 'pixel_microns': 2.0})
+
+        roi_table = self.metadata._parse_roi_table([self._raw_roi((0.0, 0.0, 1.0), (100.0, 1.0, 0.5)),
+                                                    self._raw_roi((50.0, -1.0, 2.0))])
+
+        np.testing.assert_array_equal(roi_table['roi'], [0, 0, 1])
+        np.testing.assert_array_equal(roi_table['timepoint'], [0.0, 100.0, 50.0])
+        np.testing.assert_array_equal(roi_table['position'], [[100.0, 50.0, 1.0], [200.0, 50.0, 1.0],
+                                                              [0.0, 50.0, 1.0]])
+        np.testing.assert_array_equal(roi_table['size'], [[50.0, 25.0, 2.0], [25.0, 25.0, 2.0],
+                                                          [100.0, 25.0, 2.0]])
+
+        positions = interpolate_roi_positions(roi_table, [0.0, 50.0, 200.0])
+        self.assertEqual(positions.shape, (2, 3, 3))
+        np.testing.assert_array_equal(positions[0, :, 0], [100.0, 150.0, 200.0])
+        np.testing.assert_array_equal(positions[1, :, 0], [0.0, 0.0, 0.0])
+
+    def test_loop_order(self):
+        self.assertEqual(self.metadata.get_loop_order(), ['t', 'v', 'z'])
+
+        with ArtificialND2('test_data/test_nd2_raw_metadata_loops.nd2', sizes={'t': 2, 'v': 3, 'z': 2},
+                           loop_order='vzt') as artificial:
+            metadata = RawMetadata(artificial.file_handle, LabelMap(artificial.raw_text))
+            self.assertEqual(metadata.get_loop_order(), ['v', 'z', 't'])
+
+        # axes without a loop are appended
+        with ArtificialND2('test_data/test_nd2_raw_metadata_loops.nd2', sizes={'v': 3, 'z': 2},
+                           loop_order='zvt') as artificial:
+            metadata = RawMetadata(artificial.file_handle, LabelMap(artificial.raw_text))
+            self.assertEqual(metadata.get_loop_order(), ['z', 'v', 't'])
+
+        # discrete XY position loops and manual time loops
+        with ArtificialND2('test_data/test_nd2_raw_metadata_loops.nd2', sizes={'t': 2, 'v': 3, 'z': 2},
+                           loop_order='vzt', loop_types={'t': 9, 'v': 3}) as artificial:
+            metadata = RawMetadata(artificial.file_handle, LabelMap(artificial.raw_text))
+            self.assertEqual(metadata.get_loop_order(), ['v', 'z', 't'])
+
+        # loops of an unknown type fall back to the default order
+        with ArtificialND2('test_data/test_nd2_raw_metadata_loops.nd2', sizes={'t': 2, 'v': 3, 'z': 2},
+                           loop_order='zvt', loop_types={'v': 7}) as artificial:
+            metadata = RawMetadata(artificial.file_handle, LabelMap(artificial.raw_text))
+            self.assertEqual(metadata.get_loop_order(), ['t', 'v', 'z'])
+
+    def test_xml_data(self):
+        with ArtificialND2('test_data/test_nd2_raw_metadata_xml.nd2', sizes={'t': 2}) as nd2:
+            metadata = RawMetadata(nd2.file_handle, LabelMap(nd2.raw_text))
+
+            self.assertEqual(metadata.get_xml_data('app_info', parse=False),
+                             six.b('<variant><NISVersion>5.20.00</NISVersion></variant>'))
+            self.assertEqual(metadata.app_info['variant']['NISVersion'], '5.20.00')
+            self.assertIs(metadata.app_info, metadata.app_info)
+            self.assertRaises(ValueError, metadata.get_xml_data, 'image_attributes')
@@ -1,3 +1,6 @@
+import io
+import multiprocessing
+import pickle
 import unittest
 import numpy as np
 import struct
@@ -9,6 +12,11 @@ from nd2reader.reader import ND2Reader
 from nd2reader.parser import Parser
 
 
+def read_frame_sum(reader_and_coords):
+    reader, coords = reader_and_coords
+    return int(reader.get_frame_2D(**coords).sum())
+
+
 class TestReader(unittest.TestCase):
     def test_invalid_file_extension(self):
         self.assertRaises(InvalidFileType, lambda: ND2Reader('test_data/invalid_extension_file.inv'))
@@ -77,3 +85,345 @@ class TestReader(unittest.TestCase):
                     frame = reader.get_frame_2D(c=0, t=0, z=0, x=0, y=0, v=0)
 
                 self.assertIn('unpack', str(exception.exception))
+
+    def test_out(self):
+        sizes = {'t': 2, 'c': 3, 'y': 4, 'x': 5}
+        with ArtificialND2('test_data/test_nd2_reader_out.nd2', sizes=sizes) as artificial:
+            with ND2Reader('test_data/test_nd2_reader_out.nd2') as reader:
+                out = np.zeros((4, 5), dtype=np.uint16)
+                self.assertIs(reader.get_frame_2D(c=2, t=1, out=out), out)
+                np.testing.assert_array_equal(out, artificial.image_data[1, 2])
+
+                # frames are still copied out of the reused chunk buffer
+                frame = reader.get_frame_2D(c=1, t=0)
+                reader.get_frame_2D(c=0, t=1)
+                np.testing.assert_array_equal(frame, artificial.image_data[0, 1])
+
+                out = np.zeros((3, 4, 5), dtype=np.float64)
+                self.assertIs(reader.get_image_group(t=1, out=out), out)
+                np.testing.assert_array_equal(out, artificial.image_data[1])
+                np.testing.assert_array_equal(reader.get_image_group(t=0), artificial.image_data[0])
+
+                self.assertRaises(ValueError, reader.get_frame_2D, out=np.zeros((5, 4)))
+                self.assertRaises(ValueError, reader.get_image_group, out=np.zeros((2, 4, 5)))
+
+    def test_bundled_frames(self):
+        sizes = {'t': 2, 'z': 3, 'c': 2, 'y': 4, 'x': 5}
+        with ArtificialND2('test_data/test_nd2_reader_bundled.nd2', sizes=sizes) as artificial:
+            with ND2Reader('test_data/test_nd2_reader_bundled.nd2') as reader:
+                groups = artificial.image_data.reshape(2, 3, 2, 4, 5)
+
+                reader.iter_axes = 't'
+                reader.bundle_axes = 'czyx'
+                frame = reader[1]
+                self.assertEqual(frame.shape, (2, 3, 4, 5))
+                self.assertEqual(frame.dtype, np.float64)
+                self.assertTrue(frame.flags['C_CONTIGUOUS'])
+                np.testing.assert_array_equal(frame, groups[1].transpose(1, 0, 2, 3))
+
+                reader.bundle_axes = 'zcyx'
+                np.testing.assert_array_equal(reader[0], groups[0])
+
+                reader.bundle_axes = 'zyx'
+                reader.default_coords['c'] = 1
+                np.testing.assert_array_equal(reader[1], groups[1, :, 1])
+
+                reads = []
+                read_image_group = reader._parser._read_image_group
+                reader._parser._read_image_group = lambda number: reads.append(number) or read_image_group(number)
+
+                reader.bundle_axes = 'cyx'
+                reader.default_coords['z'] = 2
+                np.testing.assert_array_equal(reader[0], groups[0, 2])
+                self.assertEqual(reads, [2])
+
+                reader.bundle_axes = 'tcyx'
+                reader.iter_axes = 'z'
+                np.testing.assert_array_equal(reader[1], groups[:, 1])
+                self.assertEqual(reader[1].metadata['width'], 5)
+
+    def test_get_volume(self):
+        sizes = {'t': 2, 'v': 2, 'z': 3, 'c': 2, 'y': 4, 'x': 5}
+        with ArtificialND2('test_data/test_nd2_reader_volume.nd2', sizes=sizes) as artificial:
+            with ND2Reader('test_data/test_nd2_reader_volume.nd2') as reader:
+                groups = artificial.image_data.reshape(2, 2, 3, 2, 4, 5)
+
+                volume = reader.get_volume(t=1, v=1)
+                self.assertEqual(volume.shape, (2, 3, 4, 5))
+                np.testing.assert_array_equal(volume, groups[1, 1].transpose(1, 0, 2, 3))
+
+                out = np.zeros((3, 4, 5), dtype=np.float32)
+                self.assertIs(reader.get_volume(t=0, v=1, c=1, out=out), out)
+                np.testing.assert_array_equal(out, groups[0, 1, :, 1])
+                self.assertRaises(ValueError, reader.get_volume, out=np.zeros((2, 4, 5)))
+
+                # the stack is fetched with one read
+                seeks = []
+                seek = reader._fh.seek
+                reader._fh.seek = lambda *args: seeks.append(args) or seek(*args)
+                reader.get_volume(t=1, v=0)
+                self.assertEqual(len(seeks), 2)
+
+                # non-adjacent image groups are read separately
+                reader._fh.seek = seek
+                numbers = [11, 0, 5]
+                positions = []
+                for position, data in reader._parser._read_image_groups(numbers, max_read_size=1):
+                    positions.append(position)
+                    self.assertEqual(data[4:].tobytes(),
+                                     artificial.image_data[numbers[position]].transpose(1, 2, 0).tobytes())
+                self.assertEqual(positions, [1, 2, 0])
+
+    def test_iter_disk_order(self):
+        sizes = {'t': 3, 'v': 2, 'z': 2, 'c': 2, 'y': 4, 'x': 5}
+        with ArtificialND2('test_data/test_nd2_reader_disk_order.nd2', sizes=sizes) as artificial:
+            with ND2Reader('test_data/test_nd2_reader_disk_order.nd2') as reader:
+                groups = artificial.image_data.reshape(3, 2, 2, 2, 4, 5)
+
+                def check(items):
+                    for coords, frame in items:
+                        np.testing.assert_array_equal(frame, groups[coords['t'], coords['v'], coords['z'],
+                                                                    coords['c']])
+                    return [tuple(coords[axis] for axis in 'tvzc') for coords, frame in items]
+
+                # the image groups are stored in t, v, z order
+                order = check(list(reader.iter_disk_order()))
+                self.assertEqual(order, [(t, v, z, c) for t in range(3) for v in range(2) for z in range(2)
+                                         for c in range(2)])
+
+                order = check(list(reader.iter_disk_order(axes='vt', c=1, z=[1])))
+                self.assertEqual(order, [(t, v, 1, 1) for t in range(3) for v in range(2)])
+
+                expected = [(t, v, 0, 0) for v in range(2) for t in range(3)]
+                order = check(list(reader.iter_disk_order(axes='vt', ordered=True)))
+                self.assertEqual(order, expected)
+
+                order = check(list(reader.iter_disk_order(axes='vt', ordered=True, max_buffer_bytes=0)))
+                self.assertEqual(order, expected)
+
+                self.assertRaises(ValueError, list, reader.iter_disk_order(axes='x'))
+
+                # image groups that are read into the chunk buffer of the parser (like chunks that are larger than
+                # expected) are not overwritten by the direct reads of a full reorder buffer
+                parser = reader.parser
+                parser._read_image_groups = lambda numbers, max_read_size=None: (
+                    (i, parser._read_image_group(numbers[i])[1]) for i in np.argsort(numbers))
+                expected = [(t, v, 0, c) for v in range(2) for t in range(3) for c in range(2)]
+                order = check(list(reader.iter_disk_order(axes='vtc', ordered=True, max_buffer_bytes=0)))
+                self.assertEqual(order, expected)
+
+    def test_init_from_buffer(self):
+        sizes = {'t': 2, 'c': 2, 'y': 4, 'x': 5}
+        with ArtificialND2('test_data/test_nd2_reader_buffer.nd2', sizes=sizes) as artificial:
+            with open('test_data/test_nd2_reader_buffer.nd2', 'rb') as fh:
+                data = fh.read()
+            groups = artificial.image_data.reshape(2, 2, 4, 5)
+            file_data = np.frombuffer(data, dtype=np.uint8)
+
+            for buffer in [data, memoryview(data), io.BytesIO(data)]:
+                with ND2Reader(buffer) as reader:
+                    self.cmp_two_readers(artificial, reader)
+                    frame = reader.get_frame_2D(c=1, t=1)
+                    np.testing.assert_array_equal(frame, groups[1, 1])
+                    if not isinstance(buffer, io.BytesIO):
+                        # the frame is a view of the buffer
+                        self.assertTrue(np.shares_memory(frame, file_data))
+
+                    for coords, frame in reader.iter_disk_order():
+                        np.testing.assert_array_equal(frame, groups[coords['t'], coords['c']])
+
+    def test_shard(self):
+        sizes = {'t': 5, 'v': 2, 'c': 2, 'y': 4, 'x': 5}
+        with ArtificialND2('test_data/test_nd2_reader_shard.nd2', sizes=sizes) as artificial:
+            with ND2Reader('test_data/test_nd2_reader_shard.nd2') as reader:
+                groups = artificial.image_data.reshape(5, 2, 2, 4, 5)
+                shards = [reader.shard(rank, 3) for rank in range(3)]
+
+                # the shards are disjoint, balanced and contiguous in the file
+                self.assertEqual([len(shard) for shard in shards], [8, 6, 6])
+                self.assertEqual(sum(shards, []), [{'t': t, 'v': v, 'c': c} for t in range(5) for v in range(2)
+                                                   for c in range(2)])
+
+                shard = reader.shard(1, 2, axes='t', v=1, c=[1])
+                self.assertEqual(shard, [{'t': t, 'v': 1, 'c': 1} for t in range(3, 5)])
+                for coords, frame in reader.iter_frames(shard):
+                    np.testing.assert_array_equal(frame, groups[coords['t'], 1, 1])
+
+                self.assertEqual(reader.shard(3, 4, t=[0]), [])
+                self.assertRaises(ValueError, reader.shard, 2, 2)
+
+    def test_iter_blocks(self):
+        sizes = {'t': 5, 'v': 2, 'c': 2, 'y': 4, 'x': 5}
+        with ArtificialND2('test_data/test_nd2_reader_blocks.nd2', sizes=sizes) as artificial:
+            with ND2Reader('test_data/test_nd2_reader_blocks.nd2') as reader:
+                groups = artificial.image_data.reshape(5, 2, 2, 4, 5)
+
+                blocks = [block.copy() for block in reader.iter_blocks('t', block_size=2, v=1)]
+                self.assertEqual([block.shape for block in blocks], [(2, 2, 4, 5), (2, 2, 4, 5), (1, 2, 4, 5)])
+                np.testing.assert_array_equal(np.concatenate(blocks), groups[:, 1])
+
+                # the memory budget fits three single channel frames
+                blocks = [block.copy() for block in reader.iter_blocks('t', memory_budget=3 * 40, c=1)]
+                self.assertEqual([len(block) for block in blocks], [3, 2])
+                np.testing.assert_array_equal(np.concatenate(blocks), groups[:, 0, 1])
+
+                # an explicit block size is not limited by the default memory budget
+                reader.BLOCK_MEMORY_BUDGET = 40
+                blocks = [block.copy() for block in reader.iter_blocks('t', block_size=4, c=1)]
+                self.assertEqual([len(block) for block in blocks], [4, 1])
+                blocks = [block.copy() for block in reader.iter_blocks('t', block_size=4, memory_budget=2 * 40, c=1)]
+                self.assertEqual([len(block) for block in blocks], [2, 2, 1])
+                self.assertEqual([len(block) for block in reader.iter_blocks('t', c=1)], [1] * 5)
+                del reader.BLOCK_MEMORY_BUDGET
+
+                blocks = list(reader.iter_blocks('v', t=4, c=0))
+                self.assertEqual(len(blocks), 1)
+                np.testing.assert_array_equal(blocks[0], groups[4, :, 0])
+
+                self.assertRaises(ValueError, list, reader.iter_blocks('c'))
+
+    def test_loop_order(self):
+        sizes = {'t': 3, 'v': 2, 'z': 2, 'c': 2, 'y': 4, 'x': 5}
+        for loop_order in ('vtz', 'zvt'):
+            with ArtificialND2('test_data/test_nd2_reader_loops.nd2', sizes=sizes, loop_order=loop_order) as artificial:
+                with ND2Reader('test_data/test_nd2_reader_loops.nd2') as reader:
+                    coordinates = artificial.image_group_coordinates
+                    t, v, z = coordinates.T
+                    np.testing.assert_array_equal(reader.parser.calculate_image_group_numbers(t, v, z),
+                                                  np.arange(12))
+                    np.testing.assert_array_equal(reader.parser.calculate_image_group_numbers([0, 1], 1),
+                                                  [np.flatnonzero((t == frame) & (v == 1) & (z == 0))[0]
+                                                   for frame in (0, 1)])
+
+                    for number, (frame, field_of_view, z_level) in enumerate(coordinates):
+                        np.testing.assert_array_equal(
+                            reader.get_frame_2D(c=1, t=frame, v=field_of_view, z=z_level),
+                            artificial.image_data[number, 1])
+
+                    table = reader.frame_table()
+                    np.testing.assert_array_equal(table['t'][::2], t)
+                    np.testing.assert_array_equal(table['v'][::2], v)
+
+                    volume = reader.get_volume(t=2, v=1, c=0)
+                    for z_level in range(2):
+                        number = np.flatnonzero((t == 2) & (v == 1) & (z == z_level))[0]
+                        np.testing.assert_array_equal(volume[z_level], artificial.image_data[number, 0])
+
+    def test_frame_table(self):
+        sizes = {'t': 3, 'v': 2, 'z': 2, 'c': 2, 'y': 4, 'x': 5}
+        with ArtificialND2('test_data/test_nd2_reader_sized.nd2', sizes=sizes) as artificial:
+            with ND2Reader('test_data/test_nd2_reader_sized.nd2') as reader:
+                table = reader.frame_table()
+
+                self.assertEqual(len(table['t']), 24)
+                self.assertEqual(list(table.keys())[:5], ['t', 'v', 'z', 'c', 'time'])
+                np.testing.assert_array_equal(table['c'][:4], [0, 1, 0, 1])
+                np.testing.assert_array_equal(table['z'][:4], [0, 0, 1, 1])
+                np.testing.assert_array_equal(table['v'][:8], [0, 0, 0, 0, 1, 1, 1, 1])
+                np.testing.assert_array_equal(table['time'][::2], artificial.acquisition_times)
+                np.testing.assert_array_equal(table['stage_x'][::4], [0, 10, 0, 10, 0, 10])
+                np.testing.assert_array_equal(table['pfs_offset'][::4], [1, 1, 2, 2, 3, 3])
+                self.assertFalse(np.any(table['gap']))
+
+                offsets = [artificial.locations['image_frame_%d' % i][0] for i in range(12)]
+                np.testing.assert_array_equal(table['offset'][::2], offsets)
+
+                frame = reader.get_frame_2D(t=2, v=1, z=1, c=1)
+                np.testing.assert_array_equal(frame, artificial.image_data[11, 1])
+
+    def test_frames_between_and_around_event(self):
+        sizes = {'t': 4, 'v': 2, 'c': 1, 'y': 4, 'x': 4}
+        events = [(250.0, 16), (500.0, 1), (650.0, 16)]
+        with ArtificialND2('test_data/test_nd2_reader_events.nd2', sizes=sizes, events=events):
+            with ND2Reader('test_data/test_nd2_reader_events.nd2') as reader:
+                self.assertEqual([event['name'] for event in reader.events],
+                                 ['External Stimulation', 'Autofocus', 'External Stimulation'])
+                np.testing.assert_array_equal(reader.metadata['event_table']['time'], [250.0, 500.0, 650.0])
+                np.testing.assert_array_equal(reader.metadata['event_table']['type'], [16, 1, 16])
+
+                # image groups are acquired every 100 ms
+                window = reader.frames_between(200, 400)
+                np.testing.assert_array_equal(window['time'], [200, 300, 400])
+                np.testing.assert_array_equal(window['t'], [1, 1, 2])
+                np.testing.assert_array_equal(window['v'], [0, 1, 0])
+
+                window = reader.frames_around_event(reader.events[1], 100, 0)
+                np.testing.assert_array_equal(window['time'], [400, 500])
+
+                window = reader.frames_around_event('External Stimulation', 60, 60)
+                np.testing.assert_array_equal(window['time'], [200, 300, 600, 700])
+
+                self.assertEqual(len(reader.frames_around_event('User 1', 60, 60)['t']), 0)
+
+    def test_pickle(self):
+        sizes = {'t': 3, 'c': 2, 'y': 4, 'x': 5}
+        with ArtificialND2('test_data/test_nd2_reader_pickle.nd2', sizes=sizes) as artificial:
+            with ND2Reader('test_data/test_nd2_reader_pickle.nd2') as reader:
+                reader.bundle_axes = 'cyx'
+                reader.default_coords['t'] = 2
+
+                with pickle.loads(pickle.dumps(reader)) as unpickled:
+                    # the index is reused and the file is only opened on the first read
+                    self.assertIsNone(unpickled._fh)
+                    self.assertEqual(unpickled.metadata['channels'], reader.metadata['channels'])
+                    self.assertEqual(unpickled.bundle_axes, ['c', 'y', 'x'])
+                    self.assertEqual(unpickled.default_coords['t'], 2)
+                    np.testing.assert_array_equal(unpickled.get_frame_2D(t=1, c=1), artificial.image_data[1, 1])
+
+                reader.pickle_index = False
+                with pickle.loads(pickle.dumps(reader)) as unpickled:
+                    self.assertIsNotNone(unpickled._fh)
+                    self.assertEqual(unpickled.sizes, reader.sizes)
+
+            with open('test_data/test_nd2_reader_pickle.nd2', 'rb') as fh:
+                with ND2Reader(fh) as reader:
+                    self.assertRaises(TypeError, pickle.dumps, reader)
+
+    def test_reopen_after_fork(self):
+        sizes = {'t': 4, 'y': 4, 'x': 5}
+        with ArtificialND2('test_data/test_nd2_reader_fork.nd2', sizes=sizes) as artificial:
+            with ND2Reader('test_data/test_nd2_reader_fork.nd2') as reader:
+                file_handle = reader._fh
+
+                # simulate a fork by changing the PID the handle was opened in
+                reader._pid = -1
+                reader.get_frame_2D(t=0)
+                self.assertIsNot(reader._fh, file_handle)
+                self.assertTrue(file_handle.closed)
+
+                expected = [int(artificial.image_data[t, 0].sum()) for t in range(4)]
+                for start_method in ['fork', 'spawn']:
+                    if start_method not in multiprocessing.get_all_start_methods():
+                        continue
+                    with multiprocessing.get_context(start_method).Pool(2) as pool:
+                        sums = pool.map(read_frame_sum, [(reader, {'t': t}) for t in range(4)])
+                    self.assertEqual(sums, expected)
+
+    def test_clone(self):
+        sizes = {'t': 3, 'z': 2, 'y': 4, 'x': 5}
+        with ArtificialND2('test_data/test_nd2_reader_clone.nd2', sizes=sizes) as artificial:
+            with ND2Reader('test_data/test_nd2_reader_clone.nd2') as reader:
+                reader.iter_axes = 'z'
+                reader.default_coords['t'] = 1
+
+                with reader.clone() as clone:
+                    self.assertIsNot(clone._fh, reader._fh)
+                    self.assertIs(clone.index, reader.index)
+                    self.assertIs(clone.metadata, reader.metadata)
+                    self.assertEqual(clone.iter_axes, ['z'])
+                    self.assertEqual(clone.default_coords['t'], 1)
+                    np.testing.assert_array_equal(clone[1], artificial.image_data[3, 0])
+
+                    clone.iter_axes = 't'
+                    self.assertEqual(reader.iter_axes, ['z'])
+
+                # a closed reader that shares an index does not (re)open its file
+                self.assertRaises(ValueError, clone.get_frame_2D)
+                shared = ND2Reader('test_data/test_nd2_reader_clone.nd2', index=reader.index)
+                shared.close()
+                self.assertRaises(ValueError, shared.get_frame_2D)
+                self.assertRaises(ValueError, lambda: shared[0])
+
+            with open('test_data/test_nd2_reader_clone.nd2', 'rb') as fh:
+                with ND2Reader(fh) as reader:
+                    self.assertRaises(TypeError, reader.clone)
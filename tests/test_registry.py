@@ -0,0 +1,55 @@
+import gc
+import unittest
+
+from nd2reader import registry
+from nd2reader.artificial import ArtificialND2
+from nd2reader.reader import ND2Reader
+
+
+class TestRegistry(unittest.TestCase):
+    def setUp(self):
+        registry.enable()
+
+    def tearDown(self):
+        registry.disable()
+
+    def test_reuse_index(self):
+        with ArtificialND2('test_data/test_nd2_registry.nd2', sizes={'t': 2}):
+            with ND2Reader('test_data/test_nd2_registry.nd2') as first:
+                with ND2Reader('test_data/test_nd2_registry.nd2') as second:
+                    self.assertIs(first.index, second.index)
+
+                registry.invalidate('test_data/test_nd2_registry.nd2')
+                with ND2Reader('test_data/test_nd2_registry.nd2') as third:
+                    self.assertIsNot(first.index, third.index)
+
+                registry.clear()
+                with ND2Reader('test_data/test_nd2_registry.nd2') as fourth:
+                    self.assertIsNot(first.index, fourth.index)
+
+    def test_changed_file_is_parsed_again(self):
+        with ArtificialND2('test_data/test_nd2_registry.nd2', sizes={'t': 2}):
+            reader = ND2Reader('test_data/test_nd2_registry.nd2')
+
+        with ArtificialND2('test_data/test_nd2_registry.nd2', sizes={'t': 3}):
+            with ND2Reader('test_data/test_nd2_registry.nd2') as changed:
+                self.assertIsNot(changed.index, reader.index)
+                self.assertEqual(changed.sizes['t'], 3)
+        reader.close()
+
+    def test_weak_references(self):
+        with ArtificialND2('test_data/test_nd2_registry.nd2', sizes={'t': 2}):
+            with ND2Reader('test_data/test_nd2_registry.nd2') as reader:
+                key = registry.file_key('test_data/test_nd2_registry.nd2')
+                self.assertIs(registry.get_index(key), reader.index)
+
+            del reader
+            gc.collect()
+            self.assertIsNone(registry.get_index(key))
+
+    def test_disabled(self):
+        registry.disable()
+        with ArtificialND2('test_data/test_nd2_registry.nd2', sizes={'t': 2}):
+            with ND2Reader('test_data/test_nd2_registry.nd2') as first:
+                with ND2Reader('test_data/test_nd2_registry.nd2') as second:
+                    self.assertIsNot(first.index, second.index)
@@ -0,0 +1,175 @@
+import io
+import os
+import re
+import threading
+import unittest
+from http.server import HTTPServer, SimpleHTTPRequestHandler
+
+import numpy as np
+
+from nd2reader.artificial import ArtificialND2
+from nd2reader.reader import ND2Reader
+from nd2reader.sources import BufferSource, FileSource, HTTPSource, MmapSource, SourceFile
+
+
+class RangeRequestHandler(SimpleHTTPRequestHandler):
+    """Serves files with support for single range requests, and counts the requests"""
+    requests = []
+
+    def send_head(self):
+        self.requests.append((self.command, self.headers.get('Range')))
+        match = re.match(r'bytes=(\d+)-(\d+)', self.headers.get('Range') or '')
+        if match is None:
+            return SimpleHTTPRequestHandler.send_head(self)
+
+        with open(self.translate_path(self.path), 'rb') as fh:
+            data = fh.read()
+        start, stop = int(match.group(1)), min(int(match.group(2)) + 1, len(data))
+        self.send_response(206)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Range', 'bytes %d-%d/%d' % (start, stop - 1, len(data)))
+        self.send_header('Content-Length', str(stop - start))
+        self.end_headers()
+        return io.BytesIO(data[start:stop])
+
+    def log_message(self, *args):
+        pass
+
+
+class TestSources(unittest.TestCase):
+    def setUp(self):
+        self.data = bytes(range(256)) * 40
+        with open('test_data/test_sources.bin', 'wb') as fh:
+            fh.write(self.data)
+
+    def tearDown(self):
+        os.remove('test_data/test_sources.bin')
+
+    def test_read_at(self):
+        for source in [FileSource('test_data/test_sources.bin'), MmapSource('test_data/test_sources.bin'),
+                       BufferSource(self.data), BufferSource(io.BytesIO(self.data))]:
+            with source:
+                self.assertEqual(source.size(), len(self.data))
+                self.assertEqual(bytes(source.read_at(10, 5)), self.data[10:15])
+                self.assertEqual(bytes(source.read_at(len(self.data) - 2, 10)), self.data[-2:])
+                self.assertEqual(bytes(source.read_at(len(self.data) + 5, 10)), b'')
+            self.assertRaises(ValueError, source.read_at, 0, 1)
+
+    def test_release_bytes_io(self):
+        data = io.BytesIO(self.data)
+        source = BufferSource(data)
+        view = np.frombuffer(source.read_at(0, 10), dtype=np.uint8)
+        self.assertRaises(BufferError, data.write, b'x')
+
+        # the views that are still alive keep the buffer exported after closing
+        source.close()
+        self.assertRaises(BufferError, data.write, b'x')
+        del view
+        data.seek(0, 2)
+        data.write(b'x')
+        data.truncate(10)
+
+    def test_source_file(self):
+        with SourceFile(BufferSource(self.data)) as fh:
+            self.assertEqual(fh.seek(10), 10)
+            self.assertEqual(fh.read(5), self.data[10:15])
+            self.assertEqual(fh.tell(), 15)
+
+            view = fh.read_view(10)
+            self.assertIsInstance(view, memoryview)
+            self.assertEqual(bytes(view), self.data[15:25])
+
+            target = bytearray(4)
+            self.assertEqual(fh.readinto(target), 4)
+            self.assertEqual(bytes(target), self.data[25:29])
+
+            fh.seek(-2, 2)
+            self.assertEqual(fh.read(), self.data[-2:])
+            self.assertEqual(fh.read(10), b'')
+        self.assertTrue(fh.closed)
+        self.assertTrue(fh.source.closed)
+        self.assertRaises(ValueError, fh.read)
+
+    def test_zero_copy(self):
+        sizes = {'t': 2, 'c': 2, 'y': 4, 'x': 5}
+        with ArtificialND2('test_data/test_nd2_zero_copy.nd2', sizes=sizes) as artificial:
+            groups = artificial.image_data.reshape(2, 2, 4, 5)
+
+            # frames of sources that are not zero-copy are writable copies
+            with ND2Reader(FileSource('test_data/test_nd2_zero_copy.nd2')) as reader:
+                frame = reader.get_frame_2D(c=1, t=1)
+                np.testing.assert_array_equal(frame, groups[1, 1])
+                frame += 1
+                np.testing.assert_array_equal(reader.get_frame_2D(c=1, t=1), groups[1, 1])
+
+            # frames of zero-copy sources are read-only views
+            with ND2Reader(MmapSource('test_data/test_nd2_zero_copy.nd2')) as reader:
+                frame = reader.get_frame_2D(c=1, t=1)
+                np.testing.assert_array_equal(frame, groups[1, 1])
+                self.assertFalse(frame.flags.writeable)
+                del frame
+
+
+class TestHTTPSource(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = HTTPServer(('127.0.0.1', 0), RangeRequestHandler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def url(self, path):
+        return 'http://127.0.0.1:%d/%s' % (self.server.server_address[1], path)
+
+    def test_block_cache(self):
+        data = bytes(range(256)) * 40
+        with open('test_data/test_http_source.bin', 'wb') as fh:
+            fh.write(data)
+
+        try:
+            with HTTPSource(self.url('test_data/test_http_source.bin'), block_size=1024, cache_size=4096,
+                            max_gap=1024) as source:
+                self.assertEqual(source.size(), len(data))
+                self.assertEqual(source.request_count, 1)
+
+                # the blocks of a read are fetched with a single request, and cached
+                self.assertEqual(source.read_at(100, 3000), data[100:3100])
+                self.assertEqual(source.request_count, 2)
+                self.assertEqual(source.read_at(1500, 100), data[1500:1600])
+                self.assertEqual(source.request_count, 2)
+
+                # two missing runs that are separated by a single cached block are merged
+                source._blocks.pop(0)
+                source._blocks.pop(2)
+                self.assertEqual(source.read_at(0, 3072), data[:3072])
+                self.assertEqual(source.request_count, 3)
+
+                # the least recently used blocks are evicted
+                self.assertEqual(source.read_at(8000, 2240), data[8000:])
+                self.assertEqual(len(source._blocks), 4)
+                self.assertEqual(source.read_at(0, 10), data[:10])
+                self.assertEqual(source.request_count, 5)
+        finally:
+            os.remove('test_data/test_http_source.bin')
+
+    def test_reader(self):
+        sizes = {'t': 3, 'c': 2, 'y': 4, 'x': 5}
+        with ArtificialND2('test_data/test_nd2_http.nd2', sizes=sizes) as artificial:
+            groups = artificial.image_data.reshape(3, 2, 4, 5)
+            del RangeRequestHandler.requests[:]
+
+            with ND2Reader(self.url('test_data/test_nd2_http.nd2')) as reader:
+                self.assertEqual(reader.filename, self.url('test_data/test_nd2_http.nd2'))
+                self.assertEqual(reader.sizes['t'], 3)
+                frame = reader.get_frame_2D(c=1, t=2)
+                np.testing.assert_array_equal(frame, groups[2, 1])
+                self.assertTrue(frame.flags.writeable)
+                for coords, frame in reader.iter_disk_order():
+                    np.testing.assert_array_equal(frame, groups[coords['t'], coords['c']])
+
+            # the small file fits into one block
+            self.assertEqual([command for command, _ in RangeRequestHandler.requests], ['HEAD', 'GET'])